@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+容忍度掃描：準確率對容忍度曲線（NumPy 向量化）
+Accuracy Curves: vectorized accuracy over a whole grid of relative-error tolerances
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_TOLERANCES = np.round(np.linspace(0.0, 0.5, 51), 4)
+REPORT_TOLERANCES = (0.01, 0.05, 0.10, 0.15, 0.20)
+FORMATS = ('linear', 'nonlinear')
+LEVEL_ORDER = ('simple', 'medium', 'challenging')
+
+
+def relative_errors(extracted: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """|x − e| / |e| (|x| where e = 0); NaN where there is no numerical answer"""
+    extracted = np.asarray(extracted, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(expected != 0, np.abs(extracted - expected) / np.abs(expected), np.abs(extracted))
+
+
+def accuracy_grid(extracted: np.ndarray, expected: np.ndarray, tolerances: np.ndarray = DEFAULT_TOLERANCES,
+                  unit_match: Optional[np.ndarray] = None) -> np.ndarray:
+    """Boolean (trials × tolerances) matrix: value within tolerance and (optionally) unit matched"""
+    within = relative_errors(extracted, expected)[:, None] <= np.asarray(tolerances, dtype=float)[None, :]
+    if unit_match is not None:
+        within &= np.asarray(unit_match, dtype=bool)[:, None]
+    return within
+
+
+def trial_arrays(records: List[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays of the fields the accuracy computations need, built in one pass
+
+    Trials without a numerical answer or reference (symbolic answers)
+    keep their recorded verdict at every tolerance.
+    """
+    count = len(records)
+    arrays = {
+        'level': np.empty(count, dtype=object),
+        'format_type': np.empty(count, dtype=object),
+        'numeric': np.zeros(count, dtype=bool),
+        'extracted': np.full(count, np.nan),
+        'expected': np.full(count, np.nan),
+        'unit_match': np.zeros(count, dtype=bool),
+        'accurate': np.zeros(count, dtype=bool)
+    }
+    for i, record in enumerate(records):
+        extracted = record.get('extracted_answer') or {}
+        accuracy = record.get('accuracy_analysis') or {}
+        value = accuracy.get('converted_value', extracted.get('value'))  # in the expected unit
+        expected = accuracy.get('expected_value')
+        arrays['level'][i] = record.get('difficulty_level')
+        arrays['format_type'][i] = record['format_type']
+        arrays['unit_match'][i] = bool(accuracy.get('unit_match'))
+        arrays['accurate'][i] = bool(accuracy.get('accurate'))
+        if extracted.get('success') and isinstance(value, (int, float)) and isinstance(expected, (int, float)):
+            arrays['numeric'][i] = True
+            arrays['extracted'][i] = value
+            arrays['expected'][i] = expected
+    return arrays
+
+
+def accuracy_rate(arrays: Dict[str, np.ndarray], format_type: str, level: Optional[str] = None) -> float:
+    """Share of recorded accurate verdicts for a format (and level)"""
+    mask = arrays['format_type'] == format_type
+    if level is not None:
+        mask &= arrays['level'] == level
+    return float(arrays['accurate'][mask].mean()) if mask.any() else 0.0
+
+
+def accuracy_curves(arrays: Dict[str, np.ndarray], tolerances: np.ndarray = DEFAULT_TOLERANCES) -> Dict:
+    """Accuracy-vs-tolerance curve per difficulty level and format
+
+    Returns {level: {format: {'tolerances': [...], 'accuracy': [...], 'trials': n}}}.
+    """
+    tolerances = np.asarray(tolerances, dtype=float)
+    grid = accuracy_grid(arrays['extracted'], arrays['expected'], tolerances, arrays['unit_match'])
+    # Non-numerical trials: recorded verdict at every tolerance
+    grid = np.where(arrays['numeric'][:, None], grid, arrays['accurate'][:, None])
+
+    curves = {}
+    levels = {level for level in arrays['level'] if level is not None}
+    for level in sorted(levels, key=lambda level: (LEVEL_ORDER.index(level) if level in LEVEL_ORDER else len(LEVEL_ORDER), level)):
+        curves[level] = {}
+        for format_type in FORMATS:
+            mask = (arrays['level'] == level) & (arrays['format_type'] == format_type)
+            if mask.any():
+                curves[level][format_type] = {
+                    'tolerances': tolerances.tolist(),
+                    'accuracy': grid[mask].mean(axis=0).tolist(),
+                    'trials': int(mask.sum())
+                }
+    return curves
+
+
+def curve_at(curve: Dict, tolerance: float) -> float:
+    """Accuracy of a curve at the grid point nearest to ``tolerance``"""
+    index = int(np.abs(np.asarray(curve['tolerances']) - tolerance).argmin())
+    return curve['accuracy'][index]
+
+
+def curves_markdown(curves: Dict, tolerances=REPORT_TOLERANCES) -> str:
+    """Markdown table of accuracy at selected tolerances per level and format"""
+    header = "| Level | Format | Trials | " + " | ".join(f"≤{t:.0%}" for t in tolerances) + " |\n"
+    header += "|-------|--------|--------|" + "|".join("------" for _ in tolerances) + "|\n"
+    rows = ""
+    for level, by_format in curves.items():
+        for format_type, curve in by_format.items():
+            cells = " | ".join(f"{curve_at(curve, t):.1%}" for t in tolerances)
+            rows += f"| {level} | {format_type} | {curve['trials']} | {cells} |\n"
+    return header + rows if rows else ""
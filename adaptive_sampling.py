@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+適應性抽樣：依線性/非線性差異的確定程度決定每題的執行次數
+Adaptive Sampling: Bayesian sequential stopping for the linear vs non-linear comparison of each problem
+
+Every problem first gets its profile's ``runs_per_problem`` paired runs
+(one linear and one non-linear trial per run).  After each round, a
+problem keeps being sampled only while its thinking-time difference is
+still uncertain:
+
+- decisive     P(non-linear faster) ≥ confidence, or ≤ 1 − confidence
+- equivalent   the whole credible interval of the difference lies within
+               ±``equivalence`` of the mean time
+- futile       even at ``max_runs`` the current difference would not
+               reach the decision threshold (expected final z below
+               ``futility_z``): more runs are unlikely to settle it
+- exhausted    ``max_runs`` reached
+
+The posterior of the mean difference uses the normal approximation with a
+flat prior (Welch standard error).  Accuracy is compared by Beta-binomial
+posteriors and reported, but does not drive stopping: with a handful of
+runs the accuracy rates of both formats are usually equal.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from running_stats import FORMATS, AccuracyCounter, RunningStats
+from trial_journal import record_cell
+
+SETTLED_STATES = ('linear_faster', 'nonlinear_faster', 'equivalent', 'futile', 'exhausted')
+
+
+class AdaptiveSampler:
+    """Per-problem paired comparison state and the next runs to schedule"""
+
+    def __init__(self, max_runs: int = 10, confidence: float = 0.95, equivalence: float = 0.05,
+                 futility_z: float = 1.0, posterior_draws: int = 4000, seed: int = 0):
+        self.max_runs = max_runs
+        self.confidence = confidence
+        self.equivalence = equivalence
+        self.futility_z = futility_z
+        self.posterior_draws = posterior_draws
+        self.rng = np.random.default_rng(seed)
+        self.z = NormalDist().inv_cdf(confidence)
+        self.problems: Dict[int, Dict] = {}
+
+    def _problem(self, problem_id: int) -> Dict:
+        if problem_id not in self.problems:
+            self.problems[problem_id] = {
+                'runs': 0,
+                'times': {format_type: RunningStats() for format_type in FORMATS},
+                'accuracy': {format_type: AccuracyCounter() for format_type in FORMATS}
+            }
+        return self.problems[problem_id]
+
+    def push(self, result: Dict):
+        """Record one completed trial (failed trials only count as a used run)"""
+        problem = self._problem(result['problem_id'])
+        problem['runs'] = max(problem['runs'], record_cell(result)[2])
+        if result['success']:
+            problem['times'][result['format_type']].push(result['thinking_time'])
+            problem['accuracy'][result['format_type']].push((result.get('accuracy_analysis') or {}).get('accurate'))
+
+    def accuracy_posterior(self, problem_id: int) -> float:
+        """P(non-linear accuracy > linear accuracy) under uniform Beta priors"""
+        accuracy = self._problem(problem_id)['accuracy']
+        draws = {format_type: self.rng.beta(1 + counter.hits, 1 + counter.trials - counter.hits, self.posterior_draws)
+                 for format_type, counter in accuracy.items()}
+        return float((draws['nonlinear'] > draws['linear']).mean())
+
+    def decision(self, problem_id: int, min_runs: int) -> Dict:
+        """Current state of one problem's comparison"""
+        problem = self._problem(problem_id)
+        linear, nonlinear = problem['times']['linear'], problem['times']['nonlinear']
+        decision = {'runs': problem['runs'], 'state': 'sampling', 'p_nonlinear_faster': None,
+                    'p_nonlinear_more_accurate': self.accuracy_posterior(problem_id)}
+        if min(linear.count, nonlinear.count) < max(2, min_runs):
+            if problem['runs'] >= self.max_runs:
+                decision['state'] = 'exhausted'
+            return decision
+
+        difference = linear.mean - nonlinear.mean   # > 0: non-linear faster
+        standard_error = math.sqrt(linear.variance / linear.count + nonlinear.variance / nonlinear.count)
+        decision['time_difference'] = difference
+        if standard_error == 0:
+            decision['p_nonlinear_faster'] = 0.5 if difference == 0 else float(difference > 0)
+        else:
+            decision['p_nonlinear_faster'] = NormalDist().cdf(difference / standard_error)
+
+        scale = max(linear.mean, nonlinear.mean)
+        projected_error = standard_error * math.sqrt(min(linear.count, nonlinear.count) / self.max_runs)
+        if decision['p_nonlinear_faster'] >= self.confidence:
+            decision['state'] = 'nonlinear_faster'
+        elif decision['p_nonlinear_faster'] <= 1 - self.confidence:
+            decision['state'] = 'linear_faster'
+        elif scale > 0 and abs(difference) + self.z * standard_error <= self.equivalence * scale:
+            decision['state'] = 'equivalent'
+        elif problem['runs'] >= self.max_runs:
+            decision['state'] = 'exhausted'
+        elif abs(difference) < self.futility_z * projected_error:
+            decision['state'] = 'futile'
+        return decision
+
+    def next_runs(self, problems: List[Dict], min_runs: Dict[int, int]) -> List[Tuple[Dict, int]]:
+        """(problem, run number) of the next paired run of every problem still being sampled"""
+        return [(problem, self._problem(problem['id'])['runs'] + 1) for problem in problems
+                if self.decision(problem['id'], min_runs[problem['id']])['state'] == 'sampling']
+
+    def summary(self, min_runs: Dict[int, int]) -> Dict:
+        """Decision per problem plus the total number of runs used"""
+        decisions = {problem_id: self.decision(problem_id, min_runs.get(problem_id, 0)) for problem_id in sorted(self.problems)}
+        return {
+            'max_runs': self.max_runs,
+            'confidence': self.confidence,
+            'equivalence': self.equivalence,
+            'futility_z': self.futility_z,
+            'total_runs': sum(decision['runs'] for decision in decisions.values()),
+            'decisions': decisions
+        }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+答案一致性：以 NumPy 分組一次計算每個 (問題, 格式) 的穩定性指標
+Answer Consistency: batch stability measures over the extracted answers of every (problem, format) group
+
+Stability is measured on the answer the extractor already recorded
+(``extracted_answer['value']``, in the expected unit when the accuracy
+analysis converted it), not on the first number of the raw response,
+which is often a given value restated from the problem.  All groups are
+reduced together with ``np.bincount`` / ``np.add.at`` over integer group
+ids, so the cost is a few array passes regardless of the group count.
+
+Measures per group:
+
+- cv           standard deviation / |mean| of the numerical answers (0 when
+               they are all zero)
+- stability    max(0, 1 − cv); undefined (NaN / None) when the CV is, i.e.
+               for groups with fewer than two numerical answers such as
+               symbolic problems, whose agreement ``exact_match`` measures
+- exact_match  share of answers equal to the most common answer (numbers
+               compared at ``EXACT_DIGITS`` significant digits, symbolic
+               answers as whitespace-free text)
+- entropy      Shannon entropy (bits) of the distinct answers; 0 when all agree
+"""
+
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+EXACT_DIGITS = 4
+
+
+def answer_fields(record: Dict) -> Tuple[Optional[float], Optional[str]]:
+    """(numerical answer in the expected unit, normalized text of a non-numerical answer) of one trial"""
+    extracted = record.get('extracted_answer') or {}
+    if not extracted.get('success'):
+        return None, None
+    accuracy = record.get('accuracy_analysis') or {}
+    value = accuracy.get('converted_value', extracted.get('value'))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value), None
+    value = extracted.get('value')
+    if value is None:
+        return None, None
+    return None, ''.join(str(value).split()).lower()
+
+
+def answer_codes(values: np.ndarray, texts: np.ndarray) -> np.ndarray:
+    """Integer code of every answer (equal answers share a code), -1 where there is none"""
+    codes = np.full(len(values), -1, dtype=np.intp)
+    numeric = ~np.isnan(values)
+    if numeric.any():
+        number = values[numeric]
+        with np.errstate(divide='ignore'):
+            magnitude = np.floor(np.log10(np.abs(number)))
+        scale = 10.0 ** np.where(np.isfinite(magnitude), magnitude - (EXACT_DIGITS - 1), 0)
+        _, codes[numeric] = np.unique(np.round(number / scale) * scale, return_inverse=True)
+    textual = np.array([text is not None for text in texts], dtype=bool)
+    if textual.any():
+        _, inverse = np.unique(texts[textual].astype(str), return_inverse=True)
+        codes[textual] = inverse + codes.max() + 1
+    return codes
+
+
+def group_consistency(groups: np.ndarray, values: np.ndarray, codes: np.ndarray, group_count: int) -> Dict[str, np.ndarray]:
+    """Consistency measures of every group, each an array of length ``group_count``
+
+    ``groups`` holds each answer's group id, ``values`` its numerical
+    answer (NaN when not numerical) and ``codes`` its ``answer_codes``.
+    """
+    numeric = ~np.isnan(values)
+    count = np.bincount(groups[numeric], minlength=group_count)
+    total = np.bincount(groups[numeric], weights=values[numeric], minlength=group_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_mean = total / np.maximum(count, 1)
+        deviation = values[numeric] - group_mean[groups[numeric]]
+        variance = np.bincount(groups[numeric], weights=deviation * deviation, minlength=group_count) / np.maximum(count - 1, 1)
+        cv = np.where(group_mean != 0, np.sqrt(variance) / np.abs(group_mean), np.where(variance == 0, 0.0, np.nan))
+        cv = np.where(count >= 2, cv, np.nan)
+    stability = np.where(np.isnan(cv), np.nan, np.maximum(0.0, 1 - cv))
+
+    # Counts of every distinct (group, answer) pair
+    answered = codes >= 0
+    width = int(codes.max()) + 1 if answered.any() else 1
+    pairs, pair_counts = np.unique(groups[answered] * width + codes[answered], return_counts=True)
+    pair_groups = pairs // width
+    answers = np.bincount(pair_groups, weights=pair_counts, minlength=group_count)
+    mode = np.zeros(group_count)
+    np.maximum.at(mode, pair_groups, pair_counts)
+    share = pair_counts / answers[pair_groups]
+    entropy = np.zeros(group_count)
+    np.add.at(entropy, pair_groups, -share * np.log2(share))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        exact_match = np.where(answers > 0, mode / np.maximum(answers, 1), np.nan)
+
+    return {
+        'answers': answers.astype(int),
+        'numeric': count,
+        'distinct': np.bincount(pair_groups, minlength=group_count),
+        'cv': cv,
+        'stability': stability,
+        'exact_match': exact_match,
+        'entropy': np.abs(entropy)
+    }
+
+
+def consistency_table(answers: Dict[Hashable, Tuple[List[Optional[float]], List[Optional[str]]]]) -> Dict[Hashable, Dict]:
+    """{group key: measures} for {group key: (numerical answers, answer texts)} in one batch
+
+    Measures that are undefined for a group (no answers, fewer than two
+    numerical answers) are None, so callers can leave them out of averages.
+    """
+    keys = list(answers)
+    if not keys:
+        return {}
+    lengths = [len(answers[key][0]) for key in keys]
+    groups = np.repeat(np.arange(len(keys)), lengths)
+    values = np.array([np.nan if value is None else value
+                       for key in keys for value in answers[key][0]], dtype=float)
+    texts = np.empty(len(values), dtype=object)
+    texts[:] = [text for key in keys for text in answers[key][1]]
+    measures = group_consistency(groups, values, answer_codes(values, texts), len(keys))
+
+    table = {}
+    for row, key in enumerate(keys):
+        cv, stability, exact_match = measures['cv'][row], measures['stability'][row], measures['exact_match'][row]
+        table[key] = {
+            'answers': int(measures['answers'][row]),
+            'numeric': int(measures['numeric'][row]),
+            'distinct': int(measures['distinct'][row]),
+            'cv': None if np.isnan(cv) else float(cv),
+            'stability': None if np.isnan(stability) else float(stability),
+            'exact_match': None if np.isnan(exact_match) else float(exact_match),
+            'entropy': float(measures['entropy'][row])
+        }
+    return table
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+答案提取引擎：預編譯樣式、表格驅動、單次掃描
+Answer Extraction: precompiled, table-driven answer extraction with at most one scan per response
+"""
+
+import re
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from symbolic_verification import SYMBOLIC_PROBLEM_IDS, verify_symbolic
+from unit_registry import conversion_factor
+
+# ==================== PATTERNS ====================
+
+NUMBER_PATTERN = r'[+-]?(?:[0-9][0-9,]*\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?'
+# "× 10⁶", "x 10^-3", "* 10^(5)"
+POWER_OF_TEN_PATTERN = r'(?:\s*[×x*]\s*10\s*(?:\^\s*\(?(?P<exponent>[+-]?[0-9]+)\)?|(?P<superscript>[⁺⁻]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+)))?'
+UNIT_PATTERN = r'[a-zA-Z/%²³°]+'
+
+# A value token: number, optional × 10ⁿ and optional unit (never an "Answer:" label that follows)
+VALUE_TOKEN = re.compile(
+    rf'(?P<value>{NUMBER_PATTERN}){POWER_OF_TEN_PATTERN}(?:\s*(?!Answer:)(?P<unit>{UNIT_PATTERN}))?'
+)
+ANSWER_LABEL = 'Answer:'
+LABELLED_VALUE_TOKEN = re.compile(r'\s*' + VALUE_TOKEN.pattern)
+SUPERSCRIPT_DIGITS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻', '0123456789+-')
+
+# ==================== TABLES ====================
+
+# Problems 21-30 with a numerical reference answer
+NUMERICAL_ANSWER_PROBLEMS = {23: 3.0, 24: 2.7, 26: 1215, 29: 47.9}
+
+FORMULA_INDICATORS = ['=', '√', 'sin', 'cos', 'ln', '²', '³', 'π', 'α', 'ω', 'θ']
+
+
+# ==================== SCAN ====================
+
+def token_value(token: Tuple[str, str, str, str]) -> float:
+    """Float value of a (value, exponent, superscript, unit) token, including any × 10ⁿ factor"""
+    value, exponent, superscript, _ = token
+    value = float(value.replace(',', ''))
+    if not exponent and superscript:
+        exponent = superscript.translate(SUPERSCRIPT_DIGITS)
+    if exponent:
+        value *= 10 ** int(exponent)
+    return value
+
+
+def first_answer(text: str, require_unit: bool = True) -> Optional[Tuple[str, str, str, str]]:
+    """First "Answer:" label directly followed by a value token (with a unit if ``require_unit``)
+
+    Labels are found by literal search and the token is matched in place,
+    so responses with an answer line are never scanned in full.
+    """
+    start = text.find(ANSWER_LABEL)
+    while start != -1:
+        match = LABELLED_VALUE_TOKEN.match(text, start + len(ANSWER_LABEL))
+        if match is not None and (match.group('unit') is not None or not require_unit):
+            return match.groups('')
+        start = text.find(ANSWER_LABEL, start + len(ANSWER_LABEL))
+    return None
+
+
+def last_tokens(text: str) -> Dict:
+    """Single pass over ``text``: the last value token with a unit and the last one overall"""
+    tokens = VALUE_TOKEN.findall(text)
+    last_with_unit = next((token for token in reversed(tokens) if token[3]), None)
+    return {'last_with_unit': last_with_unit, 'last_number': tokens[-1] if tokens else None}
+
+
+def _extracted(token: Tuple[str, str, str, str], response_text: str, **extra) -> Dict:
+    result = {
+        'success': True,
+        'value': token_value(token),
+        'unit': token[3],
+        'raw_text': response_text
+    }
+    result.update(extra)
+    return result
+
+
+# ==================== EXTRACTORS ====================
+
+def extract_last_number(response_text: str, problem: Dict = None) -> Dict:
+    """Extract numerical answer - last value (+unit) in the text"""
+    tokens = last_tokens(response_text)
+    match = tokens['last_with_unit'] or tokens['last_number']
+    if match is not None:
+        return _extracted(match, response_text)
+
+    return {
+        'success': False,
+        'value': None,
+        'unit': None,
+        'raw_text': response_text
+    }
+
+
+def extract_answer_line(response_text: str, problem: Dict = None) -> Dict:
+    """提取並驗證數值答案（優先 "Answer: XX.X unit"，否則取最後一個數值+單位）"""
+    match = first_answer(response_text)
+    if match is not None:
+        return _extracted(match, response_text)
+
+    # 備用：最後一個數值+單位
+    match = last_tokens(response_text)['last_with_unit']
+    if match is not None:
+        return _extracted(match, response_text, backup_extraction=True)
+
+    return {
+        'success': False,
+        'value': None,
+        'unit': None,
+        'raw_text': response_text,
+        'error': 'Could not extract numerical answer'
+    }
+
+
+def extract_answer_advanced(response_text: str, problem: Dict) -> Dict:
+    """提取高級問題的答案（包含符號解）"""
+    problem_id = problem['id']
+
+    # 對於需要數值答案的問題
+    if problem_id in NUMERICAL_ANSWER_PROBLEMS:
+        match = first_answer(response_text, require_unit=False)
+        if match is not None:
+            return _extracted(match, response_text, type='numerical')
+
+    # 對於符號解答案，解析為運算式樹並與參考答案做數值等價檢查
+    if problem_id in SYMBOLIC_PROBLEM_IDS:
+        verification = verify_symbolic(response_text, problem_id)
+        if verification['parsed']:
+            return {
+                'success': True,
+                'value': verification['expression'],
+                'unit': 'symbolic',
+                'raw_text': response_text,
+                'type': 'symbolic',
+                'symbolic_match': verification['symbolic_match'],
+                'parts_matched': verification['parts_matched'],
+                'parts_total': verification['parts_total']
+            }
+
+    # 備用：檢查是否包含任何物理公式
+    formula_score = sum(1 for indicator in FORMULA_INDICATORS if indicator in response_text)
+
+    if formula_score >= 3:
+        return {
+            'success': True,
+            'value': f'formula_attempt_{formula_score}',
+            'unit': 'attempt',
+            'raw_text': response_text,
+            'type': 'attempt',
+            'formula_score': formula_score
+        }
+
+    return {
+        'success': False,
+        'value': None,
+        'unit': None,
+        'raw_text': response_text,
+        'type': 'failed',
+        'error': 'Could not extract meaningful answer'
+    }
+
+
+EXTRACTORS = {
+    'last_number': extract_last_number,
+    'answer_line': extract_answer_line,
+    'advanced': extract_answer_advanced
+}
+
+
+def extract_batch(response_texts: Iterable[str], extractor: Union[str, Callable] = 'last_number',
+                  problems: Optional[Iterable[Dict]] = None) -> List[Dict]:
+    """Extract answers from many stored responses in one call
+
+    ``extractor`` is a name from ``EXTRACTORS`` or an extractor function;
+    ``problems`` pairs each response with its problem where the extractor
+    needs one.  Repeated (response, problem) pairs, common across runs at
+    low temperature, are extracted once and copied.
+    """
+    extract = EXTRACTORS[extractor] if isinstance(extractor, str) else extractor
+    if problems is None:
+        pairs = ((text, None) for text in response_texts)
+    else:
+        pairs = zip(response_texts, problems)
+
+    seen = {}
+    extracted = []
+    for text, problem in pairs:
+        key = (text, problem['id'] if problem is not None else None)
+        if key not in seen:
+            seen[key] = extract(text) if problem is None else extract(text, problem)
+        extracted.append(dict(seen[key]))
+    return extracted
+
+
+# ==================== UNITS ====================
+
+def unit_alias_table(unit_variants: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+    """Lower-cased accepted spellings per expected unit, precomputed once per profile"""
+    return {unit: frozenset(variant.lower() for variant in variants) for unit, variants in unit_variants.items()}
+
+
+def unit_matches(unit: str, expected_unit: str, alias_table: Dict[str, FrozenSet[str]]) -> bool:
+    """Whether an extracted unit is an accepted spelling of ``expected_unit``"""
+    accepted = alias_table.get(expected_unit)
+    if accepted is None:
+        return unit.lower() == expected_unit.lower()
+    return unit.lower() in accepted
+
+
+def unit_conversion(unit: str, expected_unit: str, alias_table: Dict[str, FrozenSet[str]]) -> Optional[float]:
+    """Factor taking a value in ``unit`` to ``expected_unit``, or None if the units are incompatible
+
+    Accepted spellings from the alias table give 1.0; any other unit is
+    converted through the dimensional registry ("7.5 kN" → 7500 N).
+    """
+    if unit_matches(unit, expected_unit, alias_table):
+        return 1.0
+    return conversion_factor(unit, expected_unit)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+非同步試驗分派器
+Async Trial Dispatcher: keeps several ChatCompletion requests in flight at once
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+from baseline_service import BaselineService
+from llm_backend import ChatBackend, get_backend
+from rate_limiter import RateLimiter, estimate_request_tokens, get_shared_rate_limiter
+from retry_policy import RetryPolicy
+from timing_spans import SpanRecorder, record_span
+
+
+class AsyncTrialDispatcher:
+    """Concurrent execution engine for experiment trials
+
+    Each trial is a dict carrying a ``request`` entry with the keyword
+    arguments for ``ChatCompletion.acreate`` on ``backend``.  At most
+    ``max_concurrency`` requests are in flight; latency is measured per
+    request from the moment it leaves the queue, so waiting for a free slot
+    or for rate-limit capacity never counts towards ``raw_time``.  Transient
+    failures are retried by ``retry_policy`` and only the final attempt is
+    timed.  With ``stream=True`` responses are streamed and carry
+    time-to-first-token and inter-token timing in ``stream_timing``; a
+    trial's optional ``stop_when`` predicate cancels its stream early.
+    When a trial carries a ``spans`` recorder, every phase below (slot
+    wait, rate-limit wait, attempts, HTTP phases, backoff) is timed into it.
+    With a ``baseline`` service, probe requests are interleaved with the
+    trials for as long as the dispatch runs.
+    """
+
+    def __init__(self, max_concurrency: int = 8, request_timeout: float = 60.0,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 backend: Optional[ChatBackend] = None, stream: bool = False,
+                 baseline: Optional[BaselineService] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.backend = backend or get_backend()
+        self.stream = stream
+        self.baseline = baseline
+
+    async def _dispatch_one(self, semaphore: asyncio.Semaphore, trial: Dict,
+                            on_complete: Optional[Callable[[Dict], None]]) -> Dict:
+        """Run a single trial with its span recorder active"""
+        # Each trial runs in its own task, so the recorder is scoped to this trial
+        with (trial.get('spans') or SpanRecorder()).active():
+            return await self._run_trial(semaphore, trial, on_complete)
+
+    async def _run_trial(self, semaphore: asyncio.Semaphore, trial: Dict,
+                         on_complete: Optional[Callable[[Dict], None]]) -> Dict:
+        """Run a single trial once a concurrency slot and rate-limit capacity are free"""
+        queued_ns = time.perf_counter_ns()
+        async with semaphore:
+            record_span('concurrency_wait', queued_ns, time.perf_counter_ns())
+            estimated_tokens = estimate_request_tokens(trial['request'])
+
+            async def acquire_capacity():
+                await self.rate_limiter.acquire(estimated_tokens)
+
+            async def send_request():
+                if self.stream:
+                    return await self.backend.acreate_streamed(
+                        stop_when=trial.get('stop_when'),
+                        request_timeout=self.request_timeout,
+                        **trial['request']
+                    )
+                return await self.backend.acreate(
+                    request_timeout=self.request_timeout,
+                    **trial['request']
+                )
+
+            outcome = await self.retry_policy.arun(send_request, acquire_capacity,
+                                                 self.rate_limiter.observe_error)
+            outcome['trial'] = trial
+            if outcome['error'] is None:
+                self.rate_limiter.record_usage(estimated_tokens, outcome['response'].usage.total_tokens)
+
+        if on_complete:
+            on_complete(outcome)
+        return outcome
+
+    async def dispatch_all(self, trials: List[Dict],
+                           on_complete: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Dispatch all trials concurrently, returning outcomes in submission order"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Successful responses also report the live quota (x-ratelimit-* headers) to the limiter
+        async with self.backend.session(on_headers=self.rate_limiter.update_from_headers):
+            stop_probes = asyncio.Event()
+            probes = asyncio.ensure_future(self.baseline.run_interleaved(stop_probes)) if self.baseline else None
+            try:
+                tasks = [self._dispatch_one(semaphore, trial, on_complete) for trial in trials]
+                return await asyncio.gather(*tasks)
+            finally:
+                if probes:
+                    stop_probes.set()
+                    await probes
+
+    def run(self, trials: List[Dict],
+            on_complete: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Synchronous entry point for the experiment runners"""
+        return asyncio.run(self.dispatch_all(trials, on_complete))
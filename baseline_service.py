@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+滾動基準線校正
+Baseline Service: interleaved probe requests and a rolling, robust network baseline
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from paired_bootstrap import percentile_interval, resample_indices
+from rate_limiter import RateLimiter, estimate_request_tokens
+
+BASELINE_ESTIMATORS = ('median', 'trimmed_mean')
+# One fixed probe, so every probe has the same prompt and completion length
+PROBE_PROMPT = "hello"
+
+
+def robust_estimate(latencies: List[float], estimator: str = 'median', trim: float = 0.2) -> float:
+    """Median, or mean after dropping ``trim`` of the samples from each end"""
+    if not latencies:
+        return 0.0
+    if estimator == 'median':
+        return statistics.median(latencies)
+    ordered = sorted(latencies)
+    cut = int(len(ordered) * trim)
+    kept = ordered[cut:len(ordered) - cut] or ordered
+    return statistics.mean(kept)
+
+
+def reject_outliers_mad(latencies: List[float], threshold: float = 3.5) -> Tuple[List[float], List[float]]:
+    """Split latencies into (kept, rejected) by modified z-score 0.6745·|x − median| / MAD"""
+    if len(latencies) < 3:
+        return list(latencies), []
+    median = statistics.median(latencies)
+    mad = statistics.median([abs(latency - median) for latency in latencies])
+    if mad == 0:
+        return list(latencies), []
+    kept, rejected = [], []
+    for latency in latencies:
+        (rejected if 0.6745 * abs(latency - median) / mad > threshold else kept).append(latency)
+    return kept, rejected
+
+
+def bootstrap_ci(latencies: List[float], estimator: str = 'median', trim: float = 0.2, confidence: float = 0.95,
+                 resamples: int = 2000, seed: int = 0) -> Tuple[float, float]:
+    """Percentile bootstrap confidence interval of the robust estimate (resampling shared with paired_bootstrap)"""
+    if len(latencies) < 2:
+        value = robust_estimate(latencies, estimator, trim)
+        return value, value
+    values = np.asarray(latencies, dtype=float)
+    indices, _ = resample_indices([len(values)], resamples, seed)
+    draws = np.sort(values[indices[0]], axis=1)
+    if estimator == 'median':
+        estimates = np.median(draws, axis=1)
+    else:
+        cut = int(len(values) * trim)
+        estimates = draws[:, cut:len(values) - cut].mean(axis=1) if len(values) > 2 * cut else draws.mean(axis=1)
+    return percentile_interval(estimates, confidence)
+
+
+def baseline_at(series: List[Dict], at: float, window_seconds: float = 120.0, estimator: str = 'median',
+                trim: float = 0.2, min_samples: int = 3) -> float:
+    """Robust baseline from the probes within ``window_seconds`` centred on ``at``
+
+    When the window holds fewer than ``min_samples`` probes, the
+    ``min_samples`` probes nearest in time are used instead.  Probes marked
+    as outliers during calibration are ignored.
+    """
+    series = [sample for sample in series if not sample.get('outlier')]
+    if not series:
+        return 0.0
+    nearby = [sample for sample in series if abs(sample['time'] - at) <= window_seconds / 2]
+    if len(nearby) < min_samples:
+        nearby = sorted(series, key=lambda sample: abs(sample['time'] - at))[:min_samples]
+    return robust_estimate([sample['latency'] for sample in nearby], estimator, trim)
+
+
+def correct_record(record: Dict, series: List[Dict], **options) -> Dict:
+    """Re-derive ``baseline_time`` / ``thinking_time`` of a trial record from a baseline series"""
+    if record.get('success') and record.get('request_time') is not None and series:
+        record['baseline_time'] = baseline_at(series, record['request_time'], **options)
+        record['thinking_time'] = max(0, record['raw_time'] - record['baseline_time'])
+    return record
+
+
+class BaselineService:
+    """Rolling network baseline from short probe requests interleaved with the trials
+
+    Probes ("hello", max_tokens=10) are timed on perf_counter_ns and stored
+    with their wall-clock position; each trial is corrected against a
+    median (or trimmed mean) of the probes within ``window_seconds`` of
+    its own request, so drift over a long sweep no longer leaks into
+    ``thinking_time``.  While trials are dispatched, ``run_interleaved``
+    sends one probe every ``probe_interval`` seconds.  ``calibrate`` is the
+    fast start-up alternative to sequential probes: N probes in flight at
+    once, MAD outlier rejection and a bootstrap confidence interval.
+    """
+
+    def __init__(self, backend, rate_limiter: RateLimiter, model: str = 'gpt-3.5-turbo',
+                 window_seconds: float = 120.0, estimator: str = 'median', trim: float = 0.2,
+                 probe_interval: float = 15.0, min_samples: int = 3, request_timeout: float = 60.0):
+        if estimator not in BASELINE_ESTIMATORS:
+            raise ValueError(f"estimator must be one of {BASELINE_ESTIMATORS}")
+        self.backend = backend
+        self.rate_limiter = rate_limiter
+        self.model = model
+        self.window_seconds = window_seconds
+        self.estimator = estimator
+        self.trim = trim
+        self.probe_interval = probe_interval
+        self.min_samples = min_samples
+        self.request_timeout = request_timeout
+        self.samples = []
+        self.failed_probes = 0
+        self.calibration = None
+
+    def probe_request(self) -> Dict:
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": PROBE_PROMPT}],
+            'max_tokens': 10,
+            'temperature': 0.0
+        }
+
+    def record(self, latency: float, at: float = None) -> Dict:
+        sample = {'time': time.time() if at is None else at, 'latency': latency}
+        self.samples.append(sample)
+        return sample
+
+    def probe(self) -> Optional[Dict]:
+        """One synchronous probe; returns the sample (with the response text) or None on failure"""
+        request = self.probe_request()
+        self.rate_limiter.acquire_sync(estimate_request_tokens(request))
+        at = time.time()
+        start_ns = time.perf_counter_ns()
+        try:
+            response = self.backend.create(**request)
+        except Exception as e:
+            self.rate_limiter.observe_error(e)
+            self.failed_probes += 1
+            print(f"   Baseline probe failed: {e}")
+            return None
+        sample = self.record((time.perf_counter_ns() - start_ns) / 1e9, at)
+        return dict(sample, reply=response.choices[0].message.content.strip())
+
+    async def aprobe(self) -> Optional[Dict]:
+        """Async probe sharing the dispatcher's rate limiter and connections"""
+        request = self.probe_request()
+        await self.rate_limiter.acquire(estimate_request_tokens(request))
+        at = time.time()
+        start_ns = time.perf_counter_ns()
+        try:
+            await self.backend.acreate(request_timeout=self.request_timeout, **request)
+        except Exception as e:
+            self.rate_limiter.observe_error(e)
+            self.failed_probes += 1
+            return None
+        return self.record((time.perf_counter_ns() - start_ns) / 1e9, at)
+
+    async def acalibrate(self, num_samples: int = 20, max_concurrency: int = 10, mad_threshold: float = 3.5,
+                         confidence: float = 0.95) -> Dict:
+        """Fire ``num_samples`` probes concurrently (within the rate limit) and summarize them"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def limited_probe():
+            async with semaphore:
+                return await self.aprobe()
+
+        start_ns = time.perf_counter_ns()
+        async with self.backend.session(on_headers=self.rate_limiter.update_from_headers):
+            probes = [sample for sample in await asyncio.gather(*[limited_probe() for _ in range(num_samples)])
+                      if sample is not None]
+        wall_time = (time.perf_counter_ns() - start_ns) / 1e9
+
+        kept, rejected = reject_outliers_mad([sample['latency'] for sample in probes], mad_threshold)
+        rejected_remaining = list(rejected)
+        for sample in probes:
+            if sample['latency'] in rejected_remaining:
+                rejected_remaining.remove(sample['latency'])
+                sample['outlier'] = True
+
+        ci_low, ci_high = bootstrap_ci(kept, self.estimator, self.trim, confidence)
+        self.calibration = {
+            'baseline': robust_estimate(kept, self.estimator, self.trim),
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'confidence': confidence,
+            'samples': len(probes),
+            'failed': num_samples - len(probes),
+            'rejected': rejected,
+            'mad_threshold': mad_threshold,
+            'max_concurrency': max_concurrency,
+            'wall_time': wall_time
+        }
+        return self.calibration
+
+    def calibrate(self, num_samples: int = 20, max_concurrency: int = 10, **options) -> Dict:
+        """Synchronous entry point for ``acalibrate``"""
+        return asyncio.run(self.acalibrate(num_samples, max_concurrency, **options))
+
+    async def run_interleaved(self, stop: asyncio.Event):
+        """Probe every ``probe_interval`` seconds until ``stop`` is set"""
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.probe_interval)
+            except asyncio.TimeoutError:
+                await self.aprobe()
+
+    def estimate_at(self, at: float = None) -> float:
+        """Baseline for a request issued at wall-clock time ``at`` (default: now)"""
+        return baseline_at(self.samples, time.time() if at is None else at, **self.options())
+
+    def options(self) -> Dict:
+        return {
+            'window_seconds': self.window_seconds,
+            'estimator': self.estimator,
+            'trim': self.trim,
+            'min_samples': self.min_samples
+        }
+
+    def correct(self, record: Dict) -> Dict:
+        """Re-correct a finished trial against the full series (probes before and after it)"""
+        return correct_record(record, self.samples, **self.options())
+
+    def info(self) -> Dict:
+        """Settings and the full probe series, stored in experiment_info for later re-correction"""
+        info = self.options()
+        info['probe_interval'] = self.probe_interval
+        info['failed_probes'] = self.failed_probes
+        info['calibration'] = self.calibration
+        info['series'] = list(self.samples)
+        return info
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+欄式試驗資料庫：Parquet 分割儲存、欄位投影與條件下推
+Columnar Store: trials as a Parquet dataset partitioned by level / format / date, read with
+column projection and predicate pushdown
+
+    python columnar_store.py export problem_*_results_*.jsonl --root trials_parquet
+    python columnar_store.py summary --root trials_parquet --level medium
+"""
+
+import argparse
+import glob
+import os
+import time
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from trial_store import TrialReader
+
+DEFAULT_ROOT = 'trials_parquet'
+
+# Scalar trial fields; nested fields (spans, extraction details) stay in the JSON Lines files
+TRIAL_SCHEMA = pa.schema([
+    ('run_id', pa.string()),
+    ('problem_id', pa.int32()),
+    ('run', pa.int32()),
+    ('success', pa.bool_()),
+    ('raw_time', pa.float64()),
+    ('baseline_time', pa.float64()),
+    ('thinking_time', pa.float64()),
+    ('time_to_first_token', pa.float64()),
+    ('tokens_used', pa.int32()),
+    ('cache_hit', pa.bool_()),
+    ('attempts', pa.int32()),
+    ('timestamp', pa.string()),
+    ('response', pa.string()),
+    ('accurate', pa.bool_()),
+    ('unit_match', pa.bool_()),
+    ('relative_error', pa.float64()),
+    ('extracted_value', pa.float64()),
+    ('expected_value', pa.float64()),
+    # partition columns (directory levels, not stored in the files)
+    ('difficulty_level', pa.string()),
+    ('format_type', pa.string()),
+    ('run_date', pa.string()),
+])
+PARTITIONING = ds.partitioning(
+    pa.schema([('difficulty_level', pa.string()), ('format_type', pa.string()), ('run_date', pa.string())]),
+    flavor='hive'
+)
+ANALYSIS_COLUMNS = ['problem_id', 'format_type', 'thinking_time', 'accurate', 'tokens_used']
+ACCURACY_COLUMNS = ('accurate', 'unit_match', 'relative_error', 'extracted_value', 'expected_value')
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) and value != float('inf') else None
+
+
+def flatten_record(record: Dict, run_id: str, level: Optional[str] = None) -> Dict:
+    """One trial record as a flat row of TRIAL_SCHEMA"""
+    accuracy = record.get('accuracy_analysis') or {}
+    timestamp = record.get('timestamp') or ''
+    return {
+        'run_id': run_id,
+        'problem_id': record['problem_id'],
+        'run': record['run_number'] if 'run_number' in record else record.get('run'),
+        'success': bool(record.get('success')),
+        'raw_time': _number(record.get('raw_time')),
+        'baseline_time': _number(record.get('baseline_time')),
+        'thinking_time': _number(record.get('thinking_time')),
+        'time_to_first_token': _number(record.get('time_to_first_token')),
+        'tokens_used': record.get('tokens_used'),
+        'cache_hit': bool(record.get('cache_hit')),
+        'attempts': record.get('attempts', 1),
+        'timestamp': timestamp,
+        'response': record.get('response'),
+        'accurate': bool(accuracy.get('accurate')),
+        'unit_match': bool(accuracy.get('unit_match')),
+        'relative_error': _number(accuracy.get('relative_error')),
+        'extracted_value': _number(accuracy.get('converted_value', accuracy.get('extracted_value'))),
+        'expected_value': _number(accuracy.get('expected_value')),
+        'difficulty_level': record.get('difficulty_level') or level or 'unknown',
+        'format_type': record['format_type'],
+        'run_date': timestamp[:10] or 'unknown',
+    }
+
+
+def export_file(path: str, root: str = DEFAULT_ROOT, level: Optional[str] = None) -> int:
+    """Append the trials of one result file to the dataset at ``root``; returns the row count
+
+    Rows are tagged with a run id derived from the file name and written
+    to files named after it, so re-exporting a file overwrites its earlier
+    rows and exports of different files never collide.
+    """
+    run_id = os.path.splitext(os.path.basename(path))[0]
+    rows = [flatten_record(record, run_id, level) for record in TrialReader(path)]
+    if not rows:
+        return 0
+    table = pa.Table.from_pylist(rows, schema=TRIAL_SCHEMA)
+    ds.write_dataset(table, root, format='parquet', partitioning=PARTITIONING,
+                     basename_template=f'{run_id}-{{i}}.parquet', existing_data_behavior='overwrite_or_ignore')
+    return len(rows)
+
+
+def trial_dataset(root: str = DEFAULT_ROOT) -> ds.Dataset:
+    return ds.dataset(root, format='parquet', partitioning=PARTITIONING, schema=TRIAL_SCHEMA)
+
+
+def trial_filter(level: Optional[str] = None, format_type: Optional[str] = None, since: Optional[str] = None,
+                 run_id: Optional[str] = None, successful_only: bool = False):
+    """Dataset filter expression; level / format / date prune whole partitions before any file is opened"""
+    conditions = []
+    if level is not None:
+        conditions.append(ds.field('difficulty_level') == level)
+    if format_type is not None:
+        conditions.append(ds.field('format_type') == format_type)
+    if since is not None:
+        conditions.append(ds.field('run_date') >= since)
+    if run_id is not None:
+        conditions.append(ds.field('run_id') == run_id)
+    if successful_only:
+        conditions.append(ds.field('success'))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_table(root: str = DEFAULT_ROOT, columns: Optional[List[str]] = None, **filters) -> pa.Table:
+    """Only ``columns`` of the trials matching ``filters`` (see ``trial_filter``)"""
+    return trial_dataset(root).to_table(columns=columns or ANALYSIS_COLUMNS, filter=trial_filter(**filters))
+
+
+def read_records(root: str = DEFAULT_ROOT, columns: Optional[List[str]] = None, **filters) -> List[Dict]:
+    """Rows in the trial-record shape the analysis scripts use (accuracy fields under accuracy_analysis)"""
+    records = []
+    for row in read_table(root, columns, **filters).to_pylist():
+        # fields a trial never had (e.g. TTFT of non-streamed runs) are absent, as in the JSON records
+        row = {column: value for column, value in row.items() if value is not None}
+        accuracy = {column: row.pop(column) for column in ACCURACY_COLUMNS if column in row}
+        if accuracy:
+            row['accuracy_analysis'] = accuracy
+        if 'extracted_value' in accuracy:
+            # stored in the expected unit
+            accuracy['converted_value'] = accuracy['extracted_value']
+            row['extracted_answer'] = {'success': True, 'value': accuracy['extracted_value']}
+        records.append(row)
+    return records
+
+
+def problem_summary(table: pa.Table) -> Dict:
+    """Per-(problem, format) means computed in Arrow: {(problem_id, format): {...}}"""
+    aggregates = [(column, 'mean') for column in ('thinking_time', 'tokens_used') if column in table.column_names]
+    if 'accurate' in table.column_names:
+        table = table.append_column('accurate_rate', pc.cast(table['accurate'], pa.float64()))
+        aggregates.append(('accurate_rate', 'mean'))
+    grouped = table.group_by(['problem_id', 'format_type']).aggregate(aggregates + [([], 'count_all')])
+    summary = {}
+    for row in grouped.to_pylist():
+        key = (row.pop('problem_id'), row.pop('format_type'))
+        row['trials'] = row.pop('count_all')
+        summary[key] = row
+    return summary
+
+
+def main():
+    """主執行函數"""
+    parser = argparse.ArgumentParser(description="Columnar (Parquet) trial store")
+    parser.add_argument('command', choices=['export', 'summary'])
+    parser.add_argument('paths', nargs='*', help="result files to export (globs allowed)")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help=f"dataset directory (default {DEFAULT_ROOT})")
+    parser.add_argument('--level', help="difficulty level (export: for files without one; summary: filter)")
+    parser.add_argument('--format-type', choices=['linear', 'nonlinear'], help="summary: format filter")
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help="summary: only runs on or after this date")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if args.command == 'export':
+        paths = sorted({path for pattern in args.paths for path in (glob.glob(pattern) or [pattern])})
+        total = 0
+        for path in paths:
+            rows = export_file(path, args.root, args.level)
+            total += rows
+            print(f"   🔸 {path}: {rows} trials")
+        print(f"✅ Exported {total} trials to {args.root} ({time.perf_counter() - start_time:.2f}s)")
+        return
+
+    table = read_table(args.root, level=args.level, format_type=args.format_type, since=args.since)
+    for (problem_id, format_type), row in sorted(problem_summary(table).items()):
+        print(f"   Problem {problem_id:>2} {format_type:<9} trials {row['trials']:>4}  "
+              f"thinking {row['thinking_time_mean'] or 0:.3f}s  accuracy {row['accurate_rate_mean'] or 0:.1%}  "
+              f"tokens {row['tokens_used_mean'] or 0:.0f}")
+    print(f"✅ {table.num_rows} trials read ({time.perf_counter() - start_time:.3f}s)")
+
+if __name__ == "__main__":
+    main()
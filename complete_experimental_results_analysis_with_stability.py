@@ -4,103 +4,87 @@
 Generate complete experimental results and analysis report for 30 experiments (with stability analysis)
 """
 
-import json
 import statistics
 import os
-import re
 
-def load_all_experimental_data():
-    """載入所有experiment數據"""
-    files = {
-        'simple': 'new_problem_1_10_results_FIXED_20250915_182047_THINKING_FIXED_20250915_182744.json',
-        'medium': 'problem_11_20_results_20250915_174331_THINKING_FIXED_20250915_182744.json',
-        'challenging': 'problem_21_30_results_20250915_175637_THINKING_FIXED_20250915_182744.json'
-    }
-    
-    all_data = {}
-    for level, file_path in files.items():
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                all_data[level] = json.load(f)
-        except FileNotFoundError:
-            print(f"❌ 找不到文件: {file_path}")
-            all_data[level] = None
-    
-    return all_data
+from accuracy_curves import curves_markdown
+from experiment_catalog import get_experiment_catalog, parse_pins
+from incremental_analysis import by_level, get_analysis_cache, level_consistency, level_curves, mean, stats_from_records
+from paired_bootstrap import bootstrap_intervals, format_interval, paired_samples
 
-def calculate_stability(responses):
-    """計算穩定性指標 - 基於答案一致性"""
-    if len(responses) < 2:
-        return 0.0
-    
-    # Extract numerical answer
-    numerical_answers = []
-    for response in responses:
-        try:
-            # 提取數值部分
-            match = re.search(r'(\d+\.?\d*)', response)
-            if match:
-                numerical_answers.append(float(match.group(1)))
-        except:
-            continue
-    
-    if len(numerical_answers) < 2:
-        return 0.0
-    
-    # 計算變異係數的倒數作為穩定性指標
-    mean_val = statistics.mean(numerical_answers)
-    if mean_val == 0:
-        return 0.0
-    
-    std_dev = statistics.stdev(numerical_answers)
-    cv = std_dev / mean_val  # 變異係數
+# 欄式資料庫中本報告需要的欄位
+STORE_COLUMNS = ['problem_id', 'format_type', 'difficulty_level', 'run', 'success', 'thinking_time', 'time_to_first_token',
+                 'response', 'accurate', 'unit_match', 'relative_error', 'extracted_value', 'expected_value']
+
+def load_all_experimental_data(store_root=None, pins=None, directories=None):
+    """載入所有experiment數據（每個難度一組 (problem_id, format_type) 充分統計量）
+
+    結果檔的統計量依內容雜湊快取（incremental_analysis.py），未變更的檔案不再解析；
+    指定 ``store_root`` 時從 Parquet 欄式資料庫讀取，只載入所需欄位並依難度下推過濾。
+    ``pins`` 指定某些難度使用的執行（run id 或路徑），``directories`` 為要索引的結果目錄。
+    """
+    if store_root:
+        from columnar_store import read_records
+        return {level: by_level(stats_from_records(read_records(store_root, STORE_COLUMNS, level=level))).get(level)
+                for level in ['simple', 'medium', 'challenging']}
+    
+    # 由實驗目錄解析每個難度的最新執行結果
+    files = get_experiment_catalog(directories=directories).latest_runs_by_level(pins=pins)
+    for level, file_path in files.items():
+        print(f"📂 {level}: {file_path}" if file_path else f"❌ 實驗目錄中沒有 {level} 的結果")
     
-    # 穩定性 = 1 - 變異係數，範圍0-1，越高越穩定
-    stability = max(0, 1 - cv)
-    return round(stability, 3)
+    return get_analysis_cache().level_stats(files)
+
+def none_or_round(value, digits):
+    """四捨五入；無定義（None）時保持 None"""
+    return None if value is None else round(value, digits)
+
+def format_stability(value, signed=False):
+    """穩定性欄位文字；無定義時為 -"""
+    if value is None:
+        return "-"
+    return f"{value:+.3f}" if signed else f"{value:.3f}"
 
-def extract_problem_data(data, problem_id):
-    """提取單個問題的數據（包含穩定性）"""
+def extract_problem_data(data, problem_id, consistency=None):
+    """提取單個問題的數據（包含穩定性）；``data`` 為一個難度的充分統計量
+
+    ``consistency`` 為 ``level_consistency(data)`` 的結果；逐題呼叫時請先算好傳入，
+    省略時為整個難度重新計算。
+    """
     if not data:
         return None
     
-    # 獲取結果數據
-    if 'linear' in data and 'nonlinear' in data:
-        linear_results = data['linear']
-        nonlinear_results = data['nonlinear']
-    elif 'results' in data:
-        linear_results = data['results']['linear']
-        nonlinear_results = data['results']['nonlinear']
-    else:
-        return None
-    
-    # 找到對應問題的結果
-    linear_problem = [r for r in linear_results if r['problem_id'] == problem_id]
-    nonlinear_problem = [r for r in nonlinear_results if r['problem_id'] == problem_id]
+    # 找到對應問題的統計量
+    linear_problem = data.get((problem_id, 'linear'))
+    nonlinear_problem = data.get((problem_id, 'nonlinear'))
     
     if not linear_problem or not nonlinear_problem:
         return None
     
     # Calculate accuracy
-    linear_accurate = sum(1 for r in linear_problem if r['accuracy_analysis']['accurate'])
-    nonlinear_accurate = sum(1 for r in nonlinear_problem if r['accuracy_analysis']['accurate'])
-    
-    linear_accuracy = linear_accurate / len(linear_problem) * 100
-    nonlinear_accuracy = nonlinear_accurate / len(nonlinear_problem) * 100
+    linear_accuracy = linear_problem['accurate'] / linear_problem['trials'] * 100
+    nonlinear_accuracy = nonlinear_problem['accurate'] / nonlinear_problem['trials'] * 100
     
     # 計算平均時間
-    linear_times = [r['thinking_time'] for r in linear_problem if 'thinking_time' in r]
-    nonlinear_times = [r['thinking_time'] for r in nonlinear_problem if 'thinking_time' in r]
-    
-    linear_avg_time = statistics.mean(linear_times) if linear_times else 0
-    nonlinear_avg_time = statistics.mean(nonlinear_times) if nonlinear_times else 0
-    
-    # 計算穩定性
-    linear_responses = [r['response'] for r in linear_problem if 'response' in r]
-    nonlinear_responses = [r['response'] for r in nonlinear_problem if 'response' in r]
-    
-    linear_stability = calculate_stability(linear_responses)
-    nonlinear_stability = calculate_stability(nonlinear_responses)
+    linear_avg_time = mean(linear_problem, 'time') or 0
+    nonlinear_avg_time = mean(nonlinear_problem, 'time') or 0
+    
+    # 首個token時間（僅串流測試有此欄位）
+    linear_ttft = mean(linear_problem, 'ttft')
+    nonlinear_ttft = mean(nonlinear_problem, 'ttft')
+    
+    ttft_improvement = None
+    if linear_ttft and nonlinear_ttft:
+        ttft_improvement = (linear_ttft - nonlinear_ttft) / linear_ttft * 100
+    
+    # 計算穩定性（已擷取答案的變異係數，整個難度以 NumPy 分組一次計算）
+    if consistency is None:
+        consistency = level_consistency(data)
+    linear_consistency = consistency[(problem_id, 'linear')]
+    nonlinear_consistency = consistency[(problem_id, 'nonlinear')]
+    # 少於兩個數值答案（如符號答案）時穩定性無定義，為 None，不計入平均
+    linear_stability = none_or_round(linear_consistency['stability'], 3)
+    nonlinear_stability = none_or_round(nonlinear_consistency['stability'], 3)
     
     # 計算改進百分比
     speed_improvement = 0
@@ -108,7 +92,9 @@ def extract_problem_data(data, problem_id):
         speed_improvement = (linear_avg_time - nonlinear_avg_time) / linear_avg_time * 100
     
     accuracy_improvement = nonlinear_accuracy - linear_accuracy
-    stability_improvement = nonlinear_stability - linear_stability
+    stability_improvement = None
+    if linear_stability is not None and nonlinear_stability is not None:
+        stability_improvement = nonlinear_stability - linear_stability
     
     return {
         'linear_time': linear_avg_time,
@@ -117,95 +103,180 @@ def extract_problem_data(data, problem_id):
         'nonlinear_accuracy': nonlinear_accuracy,
         'linear_stability': linear_stability,
         'nonlinear_stability': nonlinear_stability,
+        'linear_exact_match': linear_consistency['exact_match'],
+        'nonlinear_exact_match': nonlinear_consistency['exact_match'],
+        'linear_entropy': linear_consistency['entropy'],
+        'nonlinear_entropy': nonlinear_consistency['entropy'],
+        'linear_ttft': linear_ttft,
+        'nonlinear_ttft': nonlinear_ttft,
+        'ttft_improvement': ttft_improvement,
         'speed_improvement': speed_improvement,
         'accuracy_improvement': accuracy_improvement,
         'stability_improvement': stability_improvement
     }
 
 def generate_experimental_tables(data):
-    """生成experiment結果表格（包含穩定性）"""
+    """生成experiment結果表格（包含穩定性與配對 bootstrap 95% 信賴區間）"""
     tables = []
     
+    # 所有問題與難度的信賴區間一次批次計算（10,000 次重抽樣）
+    intervals = bootstrap_intervals({level: paired_samples(level_data) for level, level_data in data.items() if level_data})
+    consistency = {level: level_consistency(level_data) for level, level_data in data.items() if level_data}
+    
     # 簡單問題表格 (1-10)
     simple_table = "## Table 1: Easy Problems (Problem 1-10)\n\n"
-    simple_table += "| ID | Linear Time (sec) | Non-linear Time (sec) | Linear Acc. (%) | Non-linear Acc. (%) | Linear Stability | Non-linear Stability | Speed Impr. (%) | Acc. Impr. (%) | Stability Impr. |\n"
+    simple_table += "| ID | Linear Time (sec) | Non-linear Time (sec) | Linear Acc. (%) | Non-linear Acc. (%) | Linear Stability | Non-linear Stability | Speed Impr. (%) [95% CI] | Acc. Impr. (%) [95% CI] | Stability Impr. [95% CI] |\n"
     simple_table += "|----|------------------|----------------------|-----------------|-------------------|------------------|-------------------|-----------------|----------------|----------------|\n"
     
     simple_stats = {'linear_times': [], 'nonlinear_times': [], 'linear_accs': [], 'nonlinear_accs': [], 'linear_stabilities': [], 'nonlinear_stabilities': [], 'speed_imprs': [], 'acc_imprs': [], 'stability_imprs': []}
     
     for problem_id in range(1, 11):
-        problem_data = extract_problem_data(data['simple'], problem_id)
+        problem_data = extract_problem_data(data['simple'], problem_id, consistency.get('simple'))
         if problem_data:
-            simple_table += f"| {problem_id} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['linear_accuracy']:.1f} | {problem_data['nonlinear_accuracy']:.1f} | {problem_data['linear_stability']:.3f} | {problem_data['nonlinear_stability']:.3f} | {problem_data['speed_improvement']:+.1f} | {problem_data['accuracy_improvement']:+.1f} | {problem_data['stability_improvement']:+.3f} |\n"
+            ci = intervals.get('simple', {}).get('problems', {}).get(problem_id, {})
+            simple_table += f"| {problem_id} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['linear_accuracy']:.1f} | {problem_data['nonlinear_accuracy']:.1f} | {format_stability(problem_data['linear_stability'])} | {format_stability(problem_data['nonlinear_stability'])} | {problem_data['speed_improvement']:+.1f} {format_interval(ci.get('speed_improvement'))} | {problem_data['accuracy_improvement']:+.1f} {format_interval(ci.get('accuracy_improvement'))} | {format_stability(problem_data['stability_improvement'], signed=True)} {format_interval(ci.get('stability_improvement'), 3)} |\n"
             
             # 收集統計數據
             simple_stats['linear_times'].append(problem_data['linear_time'])
             simple_stats['nonlinear_times'].append(problem_data['nonlinear_time'])
             simple_stats['linear_accs'].append(problem_data['linear_accuracy'])
             simple_stats['nonlinear_accs'].append(problem_data['nonlinear_accuracy'])
-            simple_stats['linear_stabilities'].append(problem_data['linear_stability'])
-            simple_stats['nonlinear_stabilities'].append(problem_data['nonlinear_stability'])
+            if problem_data['linear_stability'] is not None:
+                simple_stats['linear_stabilities'].append(problem_data['linear_stability'])
+            if problem_data['nonlinear_stability'] is not None:
+                simple_stats['nonlinear_stabilities'].append(problem_data['nonlinear_stability'])
             simple_stats['speed_imprs'].append(problem_data['speed_improvement'])
             simple_stats['acc_imprs'].append(problem_data['accuracy_improvement'])
-            simple_stats['stability_imprs'].append(problem_data['stability_improvement'])
+            if problem_data['stability_improvement'] is not None:
+                simple_stats['stability_imprs'].append(problem_data['stability_improvement'])
     
+    simple_table += level_interval_line(intervals, 'simple')
     simple_table += f"\n**Table 1: Performance comparison for easy problems (Problem 1-10)**\n"
     tables.append(('simple', simple_table, simple_stats))
     
     # 中等問題表格 (11-20)
     medium_table = "## Table 2: Medium Problems (Problem 11-20)\n\n"
-    medium_table += "| ID | Linear Time (sec) | Non-linear Time (sec) | Linear Acc. (%) | Non-linear Acc. (%) | Linear Stability | Non-linear Stability | Speed Impr. (%) | Acc. Impr. (%) | Stability Impr. |\n"
+    medium_table += "| ID | Linear Time (sec) | Non-linear Time (sec) | Linear Acc. (%) | Non-linear Acc. (%) | Linear Stability | Non-linear Stability | Speed Impr. (%) [95% CI] | Acc. Impr. (%) [95% CI] | Stability Impr. [95% CI] |\n"
     medium_table += "|----|------------------|----------------------|-----------------|-------------------|------------------|-------------------|-----------------|----------------|----------------|\n"
     
     medium_stats = {'linear_times': [], 'nonlinear_times': [], 'linear_accs': [], 'nonlinear_accs': [], 'linear_stabilities': [], 'nonlinear_stabilities': [], 'speed_imprs': [], 'acc_imprs': [], 'stability_imprs': []}
     
     for problem_id in range(11, 21):
-        problem_data = extract_problem_data(data['medium'], problem_id)
+        problem_data = extract_problem_data(data['medium'], problem_id, consistency.get('medium'))
         if problem_data:
-            medium_table += f"| {problem_id} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['linear_accuracy']:.1f} | {problem_data['nonlinear_accuracy']:.1f} | {problem_data['linear_stability']:.3f} | {problem_data['nonlinear_stability']:.3f} | {problem_data['speed_improvement']:+.1f} | {problem_data['accuracy_improvement']:+.1f} | {problem_data['stability_improvement']:+.3f} |\n"
+            ci = intervals.get('medium', {}).get('problems', {}).get(problem_id, {})
+            medium_table += f"| {problem_id} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['linear_accuracy']:.1f} | {problem_data['nonlinear_accuracy']:.1f} | {format_stability(problem_data['linear_stability'])} | {format_stability(problem_data['nonlinear_stability'])} | {problem_data['speed_improvement']:+.1f} {format_interval(ci.get('speed_improvement'))} | {problem_data['accuracy_improvement']:+.1f} {format_interval(ci.get('accuracy_improvement'))} | {format_stability(problem_data['stability_improvement'], signed=True)} {format_interval(ci.get('stability_improvement'), 3)} |\n"
             
             # 收集統計數據
             medium_stats['linear_times'].append(problem_data['linear_time'])
             medium_stats['nonlinear_times'].append(problem_data['nonlinear_time'])
             medium_stats['linear_accs'].append(problem_data['linear_accuracy'])
             medium_stats['nonlinear_accs'].append(problem_data['nonlinear_accuracy'])
-            medium_stats['linear_stabilities'].append(problem_data['linear_stability'])
-            medium_stats['nonlinear_stabilities'].append(problem_data['nonlinear_stability'])
+            if problem_data['linear_stability'] is not None:
+                medium_stats['linear_stabilities'].append(problem_data['linear_stability'])
+            if problem_data['nonlinear_stability'] is not None:
+                medium_stats['nonlinear_stabilities'].append(problem_data['nonlinear_stability'])
             medium_stats['speed_imprs'].append(problem_data['speed_improvement'])
             medium_stats['acc_imprs'].append(problem_data['accuracy_improvement'])
-            medium_stats['stability_imprs'].append(problem_data['stability_improvement'])
+            if problem_data['stability_improvement'] is not None:
+                medium_stats['stability_imprs'].append(problem_data['stability_improvement'])
     
+    medium_table += level_interval_line(intervals, 'medium')
     medium_table += f"\n**Table 2: Performance comparison for medium problems (Problem 11-20)**\n"
     tables.append(('medium', medium_table, medium_stats))
     
     # 高難度問題表格 (21-30)
     challenging_table = "## Table 3: Hard Problems (Problem 21-30)\n\n"
-    challenging_table += "| ID | Linear Time (sec) | Non-linear Time (sec) | Linear Acc. (%) | Non-linear Acc. (%) | Linear Stability | Non-linear Stability | Speed Impr. (%) | Acc. Impr. (%) | Stability Impr. |\n"
+    challenging_table += "| ID | Linear Time (sec) | Non-linear Time (sec) | Linear Acc. (%) | Non-linear Acc. (%) | Linear Stability | Non-linear Stability | Speed Impr. (%) [95% CI] | Acc. Impr. (%) [95% CI] | Stability Impr. [95% CI] |\n"
     challenging_table += "|----|------------------|----------------------|-----------------|-------------------|------------------|-------------------|-----------------|----------------|----------------|\n"
     
     challenging_stats = {'linear_times': [], 'nonlinear_times': [], 'linear_accs': [], 'nonlinear_accs': [], 'linear_stabilities': [], 'nonlinear_stabilities': [], 'speed_imprs': [], 'acc_imprs': [], 'stability_imprs': []}
     
     for problem_id in range(21, 31):
-        problem_data = extract_problem_data(data['challenging'], problem_id)
+        problem_data = extract_problem_data(data['challenging'], problem_id, consistency.get('challenging'))
         if problem_data:
-            challenging_table += f"| {problem_id} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['linear_accuracy']:.1f} | {problem_data['nonlinear_accuracy']:.1f} | {problem_data['linear_stability']:.3f} | {problem_data['nonlinear_stability']:.3f} | {problem_data['speed_improvement']:+.1f} | {problem_data['accuracy_improvement']:+.1f} | {problem_data['stability_improvement']:+.3f} |\n"
+            ci = intervals.get('challenging', {}).get('problems', {}).get(problem_id, {})
+            challenging_table += f"| {problem_id} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['linear_accuracy']:.1f} | {problem_data['nonlinear_accuracy']:.1f} | {format_stability(problem_data['linear_stability'])} | {format_stability(problem_data['nonlinear_stability'])} | {problem_data['speed_improvement']:+.1f} {format_interval(ci.get('speed_improvement'))} | {problem_data['accuracy_improvement']:+.1f} {format_interval(ci.get('accuracy_improvement'))} | {format_stability(problem_data['stability_improvement'], signed=True)} {format_interval(ci.get('stability_improvement'), 3)} |\n"
             
             # 收集統計數據
             challenging_stats['linear_times'].append(problem_data['linear_time'])
             challenging_stats['nonlinear_times'].append(problem_data['nonlinear_time'])
             challenging_stats['linear_accs'].append(problem_data['linear_accuracy'])
             challenging_stats['nonlinear_accs'].append(problem_data['nonlinear_accuracy'])
-            challenging_stats['linear_stabilities'].append(problem_data['linear_stability'])
-            challenging_stats['nonlinear_stabilities'].append(problem_data['nonlinear_stability'])
+            if problem_data['linear_stability'] is not None:
+                challenging_stats['linear_stabilities'].append(problem_data['linear_stability'])
+            if problem_data['nonlinear_stability'] is not None:
+                challenging_stats['nonlinear_stabilities'].append(problem_data['nonlinear_stability'])
             challenging_stats['speed_imprs'].append(problem_data['speed_improvement'])
             challenging_stats['acc_imprs'].append(problem_data['accuracy_improvement'])
-            challenging_stats['stability_imprs'].append(problem_data['stability_improvement'])
+            if problem_data['stability_improvement'] is not None:
+                challenging_stats['stability_imprs'].append(problem_data['stability_improvement'])
     
+    challenging_table += level_interval_line(intervals, 'challenging')
     challenging_table += f"\n**Table 3: Performance comparison for hard problems (Problem 21-30)**\n"
     tables.append(('challenging', challenging_table, challenging_stats))
     
     return tables
 
+def level_interval_line(intervals, level):
+    """難度平均改進的 bootstrap 信賴區間（表格下方一行）"""
+    level_ci = intervals.get(level, {}).get('level')
+    if not level_ci:
+        return ""
+    return (f"\n95% bootstrap CI of the level mean: speed {format_interval(level_ci['speed_improvement'])} %, "
+            f"accuracy {format_interval(level_ci['accuracy_improvement'])} pp, "
+            f"stability {format_interval(level_ci['stability_improvement'], 3) or '-'}\n")
+
+def generate_ttft_table(data):
+    """生成首個token時間（TTFT）比較表；沒有串流數據時回傳空字串"""
+    rows = ""
+    for level, problem_ids in [('simple', range(1, 11)), ('medium', range(11, 21)), ('challenging', range(21, 31))]:
+        consistency = level_consistency(data[level]) if data[level] else None
+        for problem_id in problem_ids:
+            problem_data = extract_problem_data(data[level], problem_id, consistency)
+            if problem_data and problem_data['ttft_improvement'] is not None:
+                rows += f"| {problem_id} | {problem_data['linear_ttft']:.3f} | {problem_data['nonlinear_ttft']:.3f} | {problem_data['linear_time']:.3f} | {problem_data['nonlinear_time']:.3f} | {problem_data['ttft_improvement']:+.1f} |\n"
+    
+    if not rows:
+        return ""
+    
+    table = "## Table 4: Time to First Token (streamed trials)\n\n"
+    table += "| ID | Linear TTFT (sec) | Non-linear TTFT (sec) | Linear Time (sec) | Non-linear Time (sec) | TTFT Impr. (%) |\n"
+    table += "|----|-------------------|-----------------------|-------------------|-----------------------|----------------|\n"
+    table += rows
+    table += f"\n**Table 4: Time to first token separates prefill latency from generation time**\n"
+    return table
+
+def generate_consistency_table(data):
+    """生成答案一致性表格：變異係數之外的完全一致率與相異答案熵；沒有擷取答案時回傳空字串"""
+    rows = ""
+    for level, problem_ids in [('simple', range(1, 11)), ('medium', range(11, 21)), ('challenging', range(21, 31))]:
+        if not data[level]:
+            continue
+        consistency = level_consistency(data[level])
+        for problem_id in problem_ids:
+            linear, nonlinear = consistency.get((problem_id, 'linear')), consistency.get((problem_id, 'nonlinear'))
+            if not linear or not nonlinear or not (linear['answers'] or nonlinear['answers']):
+                continue
+            cells = []
+            for measures in (linear, nonlinear):
+                cells.append(f"{measures['cv']:.3f}" if measures['cv'] is not None else "-")
+            for measures in (linear, nonlinear):
+                cells.append(f"{measures['exact_match'] * 100:.1f}" if measures['exact_match'] is not None else "-")
+            for measures in (linear, nonlinear):
+                cells.append(f"{measures['entropy']:.2f}")
+            rows += f"| {problem_id} | " + " | ".join(cells) + " |\n"
+    
+    if not rows:
+        return ""
+    
+    table = "## Table 6: Answer Consistency\n\n"
+    table += "| ID | Linear CV | Non-linear CV | Linear Exact Match (%) | Non-linear Exact Match (%) | Linear Entropy (bits) | Non-linear Entropy (bits) |\n"
+    table += "|----|-----------|---------------|------------------------|----------------------------|-----------------------|---------------------------|\n"
+    table += rows
+    table += f"\n**Table 6: Agreement of the extracted answers across runs (exact match = share of the most common answer)**\n"
+    return table
+
 def generate_summary_analysis(tables):
     """生成總結分析（包含穩定性）"""
     analysis = "\n## 📊 Overall Performance Summary\n\n"
@@ -237,18 +308,18 @@ def generate_summary_analysis(tables):
     avg_nonlinear_time = statistics.mean(all_nonlinear_times) if all_nonlinear_times else 0
     avg_linear_acc = statistics.mean(all_linear_accs) if all_linear_accs else 0
     avg_nonlinear_acc = statistics.mean(all_nonlinear_accs) if all_nonlinear_accs else 0
-    avg_linear_stability = statistics.mean(all_linear_stabilities) if all_linear_stabilities else 0
-    avg_nonlinear_stability = statistics.mean(all_nonlinear_stabilities) if all_nonlinear_stabilities else 0
+    avg_linear_stability = statistics.mean(all_linear_stabilities) if all_linear_stabilities else None
+    avg_nonlinear_stability = statistics.mean(all_nonlinear_stabilities) if all_nonlinear_stabilities else None
     avg_speed_impr = statistics.mean(all_speed_imprs) if all_speed_imprs else 0
     avg_acc_impr = statistics.mean(all_acc_imprs) if all_acc_imprs else 0
-    avg_stability_impr = statistics.mean(all_stability_imprs) if all_stability_imprs else 0
+    avg_stability_impr = statistics.mean(all_stability_imprs) if all_stability_imprs else None
     
     analysis += f"### Overall Averages Across All 30 Problems\n\n"
     analysis += f"| Metric | Linear | Non-linear | Improvement |\n"
     analysis += f"|--------|--------|------------|-------------|\n"
     analysis += f"| **Average Time (sec)** | {avg_linear_time:.3f} | {avg_nonlinear_time:.3f} | {avg_speed_impr:+.1f}% |\n"
     analysis += f"| **Average Accuracy (%)** | {avg_linear_acc:.1f} | {avg_nonlinear_acc:.1f} | {avg_acc_impr:+.1f}% |\n"
-    analysis += f"| **Average Stability** | {avg_linear_stability:.3f} | {avg_nonlinear_stability:.3f} | {avg_stability_impr:+.3f} |\n\n"
+    analysis += f"| **Average Stability** | {format_stability(avg_linear_stability)} | {format_stability(avg_nonlinear_stability)} | {format_stability(avg_stability_impr, signed=True)} |\n\n"
     
     # 按難度級別分析
     analysis += f"### Performance by Difficulty Level\n\n"
@@ -261,13 +332,13 @@ def generate_summary_analysis(tables):
         avg_nonlinear_time = statistics.mean(stats['nonlinear_times']) if stats['nonlinear_times'] else 0
         avg_linear_acc = statistics.mean(stats['linear_accs']) if stats['linear_accs'] else 0
         avg_nonlinear_acc = statistics.mean(stats['nonlinear_accs']) if stats['nonlinear_accs'] else 0
-        avg_linear_stability = statistics.mean(stats['linear_stabilities']) if stats['linear_stabilities'] else 0
-        avg_nonlinear_stability = statistics.mean(stats['nonlinear_stabilities']) if stats['nonlinear_stabilities'] else 0
+        avg_linear_stability = statistics.mean(stats['linear_stabilities']) if stats['linear_stabilities'] else None
+        avg_nonlinear_stability = statistics.mean(stats['nonlinear_stabilities']) if stats['nonlinear_stabilities'] else None
         avg_speed_impr = statistics.mean(stats['speed_imprs']) if stats['speed_imprs'] else 0
         avg_acc_impr = statistics.mean(stats['acc_imprs']) if stats['acc_imprs'] else 0
-        avg_stability_impr = statistics.mean(stats['stability_imprs']) if stats['stability_imprs'] else 0
+        avg_stability_impr = statistics.mean(stats['stability_imprs']) if stats['stability_imprs'] else None
         
-        analysis += f"| {level_name} | {avg_linear_time:.3f} | {avg_nonlinear_time:.3f} | {avg_speed_impr:+.1f}% | {avg_linear_acc:.1f}% | {avg_nonlinear_acc:.1f}% | {avg_acc_impr:+.1f}% | {avg_linear_stability:.3f} | {avg_nonlinear_stability:.3f} | {avg_stability_impr:+.3f} |\n"
+        analysis += f"| {level_name} | {avg_linear_time:.3f} | {avg_nonlinear_time:.3f} | {avg_speed_impr:+.1f}% | {avg_linear_acc:.1f}% | {avg_nonlinear_acc:.1f}% | {avg_acc_impr:+.1f}% | {format_stability(avg_linear_stability)} | {format_stability(avg_nonlinear_stability)} | {format_stability(avg_stability_impr, signed=True)} |\n"
     
     return analysis
 
@@ -295,8 +366,10 @@ def generate_detailed_analysis(tables):
     acc_win_rate = positive_acc_impr / total_problems * 100
     
     # 穩定性改進分析
+    # 穩定性只計有定義的問題（符號答案的問題沒有變異係數）
     positive_stability_impr = sum(1 for x in all_stability_imprs if x > 0)
-    stability_win_rate = positive_stability_impr / total_problems * 100
+    stability_problems = len(all_stability_imprs)
+    stability_win_rate = positive_stability_impr / stability_problems * 100 if stability_problems else 0
     
     analysis += f"### 1. Speed Performance Analysis\n\n"
     analysis += f"- **Non-linear format wins in speed**: {positive_speed_impr}/{total_problems} problems ({speed_win_rate:.1f}%)\n"
@@ -311,10 +384,12 @@ def generate_detailed_analysis(tables):
     analysis += f"- **Minimum accuracy improvement**: {min(all_acc_imprs):+.1f}%\n\n"
     
     analysis += f"### 3. Stability Performance Analysis\n\n"
-    analysis += f"- **Non-linear format wins in stability**: {positive_stability_impr}/{total_problems} problems ({stability_win_rate:.1f}%)\n"
-    analysis += f"- **Average stability improvement**: {statistics.mean(all_stability_imprs):+.3f}\n"
-    analysis += f"- **Maximum stability improvement**: {max(all_stability_imprs):+.3f}\n"
-    analysis += f"- **Minimum stability improvement**: {min(all_stability_imprs):+.3f}\n\n"
+    analysis += f"- **Non-linear format wins in stability**: {positive_stability_impr}/{stability_problems} problems with numerical answers ({stability_win_rate:.1f}%)\n"
+    if all_stability_imprs:
+        analysis += f"- **Average stability improvement**: {statistics.mean(all_stability_imprs):+.3f}\n"
+        analysis += f"- **Maximum stability improvement**: {max(all_stability_imprs):+.3f}\n"
+        analysis += f"- **Minimum stability improvement**: {min(all_stability_imprs):+.3f}\n"
+    analysis += "\n"
     
     # 難度級別趨勢分析
     analysis += f"### 4. Difficulty Level Trends\n\n"
@@ -331,7 +406,7 @@ def generate_detailed_analysis(tables):
         analysis += f"#### {level_name} Problems\n"
         analysis += f"- **Speed improvement**: {avg_speed_impr:+.1f}% (wins: {speed_wins}/10)\n"
         analysis += f"- **Accuracy improvement**: {avg_acc_impr:+.1f}% (wins: {acc_wins}/10)\n"
-        analysis += f"- **Stability improvement**: {avg_stability_impr:+.3f} (wins: {stability_wins}/10)\n"
+        analysis += f"- **Stability improvement**: {avg_stability_impr:+.3f} (wins: {stability_wins}/{len(stats['stability_imprs'])})\n"
         analysis += f"- **Overall performance**: {'Non-linear dominant' if avg_speed_impr > 0 and avg_acc_impr > 0 and avg_stability_impr > 0 else 'Mixed results'}\n\n"
     
     # 關鍵發現
@@ -339,7 +414,7 @@ def generate_detailed_analysis(tables):
     analysis += f"1. **Non-linear format shows consistent advantages**: Wins in {speed_win_rate:.1f}% of speed tests, {acc_win_rate:.1f}% of accuracy tests, and {stability_win_rate:.1f}% of stability tests\n"
     analysis += f"2. **Speed improvements are most consistent**: Average {statistics.mean(all_speed_imprs):+.1f}% improvement across all problems\n"
     analysis += f"3. **Accuracy improvements vary by difficulty**: More pronounced in complex problems\n"
-    analysis += f"4. **Stability improvements are significant**: Average {statistics.mean(all_stability_imprs):+.3f} improvement in answer consistency\n"
+    analysis += f"4. **Stability improvements are significant**: Average {statistics.mean(all_stability_imprs) if all_stability_imprs else 0:+.3f} improvement in answer consistency\n"
     analysis += f"5. **Performance gap widens with complexity**: Non-linear format advantages increase with problem difficulty\n\n"
     
     # 結論
@@ -354,14 +429,34 @@ def generate_detailed_analysis(tables):
     
     return analysis
 
+def generate_tolerance_table(data):
+    """生成準確率對容忍度表格（由快取的各容忍度命中數計算）；沒有數值答案時回傳空字串"""
+    curves = {level: level_curves(level_data) for level, level_data in data.items() if level_data}
+    rows = curves_markdown({level: by_format for level, by_format in curves.items() if by_format})
+    if not rows:
+        return ""
+    
+    table = "## Table 5: Accuracy vs. Tolerance\n\n"
+    table += rows
+    table += f"\n**Table 5: Share of accurate answers when the relative-error tolerance is varied (symbolic answers keep their verdict)**\n"
+    return table
+
 def main():
     """主執行函數"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Complete experimental results report with stability analysis")
+    parser.add_argument('--store', metavar='ROOT', help="read trials from a Parquet store (columnar_store.py) instead of the result files")
+    parser.add_argument('--pin', action='append', metavar='LEVEL=RUN', help="use this run id or result file for a level instead of the latest run")
+    parser.add_argument('--results-dir', action='append', metavar='DIR', help="directory of result files to index (repeatable; default EXPERIMENT_RESULTS_DIRS or .)")
+    args = parser.parse_args()
+    
     print("=== 生成30次experiment完整數據和結論分析報告（包含穩定性） ===")
     print("創建包含表格和詳細分析的完整報告")
     print()
     
     # 載入所有experiment數據
-    data = load_all_experimental_data()
+    data = load_all_experimental_data(args.store, parse_pins(args.pin), args.results_dir)
     
     # 生成experiment表格
     tables = generate_experimental_tables(data)
@@ -381,6 +476,18 @@ def main():
     for level, table, stats in tables:
         report += table + "\n\n"
     
+    ttft_table = generate_ttft_table(data)
+    if ttft_table:
+        report += ttft_table + "\n\n"
+    
+    tolerance_table = generate_tolerance_table(data)
+    if tolerance_table:
+        report += tolerance_table + "\n\n"
+    
+    consistency_table = generate_consistency_table(data)
+    if consistency_table:
+        report += consistency_table + "\n\n"
+    
     # 添加分析
     report += summary
     report += detailed_analysis
@@ -396,8 +503,9 @@ def main():
     report += "- **Total comparisons**: 180 (90 × 2 formats)\n\n"
     
     report += "### Stability Calculation\n"
-    report += "- **Method**: Coefficient of variation (CV) based on numerical answers\n"
-    report += "- **Formula**: Stability = max(0, 1 - CV)\n"
+    report += "- **Method**: Coefficient of variation (CV) of the extracted answers, in the expected unit\n"
+    report += "- **Formula**: Stability = max(0, 1 - CV), CV = standard deviation / |mean|\n"
+    report += "- **Also reported**: exact-match rate (share of the most common answer, numbers compared at 4 significant digits) and entropy of the distinct answers\n"
     report += "- **Range**: 0-1 (higher = more stable)\n"
     report += "- **Purpose**: Measure consistency of AI responses\n\n"
     
@@ -430,12 +538,13 @@ def main():
     speed_wins = sum(1 for x in all_speed_imprs if x > 0) if all_speed_imprs else 0
     acc_wins = sum(1 for x in all_acc_imprs if x > 0) if all_acc_imprs else 0
     stability_wins = sum(1 for x in all_stability_imprs if x > 0) if all_stability_imprs else 0
+    stability_problems = len(all_stability_imprs)
     
     total_problems = len(all_speed_imprs) if all_speed_imprs else 0
     
     print(f"速度改進獲勝: {speed_wins}/{total_problems} 問題 ({speed_wins/total_problems*100:.1f}%)" if total_problems > 0 else "速度改進獲勝: 0/0 問題")
     print(f"準確性改進獲勝: {acc_wins}/{total_problems} 問題 ({acc_wins/total_problems*100:.1f}%)" if total_problems > 0 else "準確性改進獲勝: 0/0 問題")
-    print(f"穩定性改進獲勝: {stability_wins}/{total_problems} 問題 ({stability_wins/total_problems*100:.1f}%)" if total_problems > 0 else "穩定性改進獲勝: 0/0 問題")
+    print(f"穩定性改進獲勝: {stability_wins}/{stability_problems} 問題 ({stability_wins/stability_problems*100:.1f}%)" if stability_problems > 0 else "穩定性改進獲勝: 0/0 問題")
     print(f"平均速度改進: {statistics.mean(all_speed_imprs):+.1f}%" if all_speed_imprs else "平均速度改進: 0.0%")
     print(f"平均準確性改進: {statistics.mean(all_acc_imprs):+.1f}%" if all_acc_imprs else "平均準確性改進: 0.0%")
     print(f"平均穩定性改進: {statistics.mean(all_stability_imprs):+.3f}" if all_stability_imprs else "平均穩定性改進: 0.000")
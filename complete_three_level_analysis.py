@@ -4,51 +4,56 @@
 Complete Three-Level Analysis: Simple vs Medium vs Challenging
 """
 
-import json
-import statistics
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 
-def load_all_three_levels():
-    """載入三個難度級別的完整數據"""
-    # 簡單題數據 (Problem 1~10)
-    with open('corrected_experiment_results_20250914_220130.json', 'r', encoding='utf-8') as f:
-        simple_data = json.load(f)
-    
-    # 中等題數據 (Problem 11~20)  
-    with open('problem_11_20_results_20250914_221245.json', 'r', encoding='utf-8') as f:
-        medium_data = json.load(f)
-    
-    # 高難度數據 (Problem 21~30)
-    with open('problem_21_30_results_20250914_222856.json', 'r', encoding='utf-8') as f:
-        challenging_data = json.load(f)
-    
-    return simple_data, medium_data, challenging_data
+from experiment_catalog import get_experiment_catalog, parse_pins
+from incremental_analysis import by_level, format_totals, get_analysis_cache, stats_from_records
+
+# 欄式資料庫中本分析需要的欄位
+STORE_COLUMNS = ['format_type', 'success', 'thinking_time', 'time_to_first_token', 'accurate']
+
+def load_all_three_levels(store_root=None, pins=None, directories=None):
+    """載入三個難度級別的充分統計量（快取於 incremental_analysis；指定 ``store_root`` 時只從 Parquet 讀取所需欄位）"""
+    if store_root:
+        from columnar_store import read_records
+        return tuple(by_level(stats_from_records(read_records(store_root, STORE_COLUMNS, level=level,
+                                                              successful_only=True))).get(level, {})
+                     for level in ['simple', 'medium', 'challenging'])
+    
+    # 由實驗目錄解析每個難度的最新執行結果（簡單 1~10、中等 11~20、高難度 21~30）
+    # ``pins`` 可指定某難度使用的執行（run id 或路徑），``directories`` 為要索引的結果目錄
+    files = get_experiment_catalog(directories=directories).latest_runs_by_level(pins=pins)
+    missing = [level for level, path in files.items() if path is None]
+    if missing:
+        raise FileNotFoundError(f"實驗目錄中沒有以下難度的結果: {', '.join(missing)}")
+    
+    level_stats = get_analysis_cache().level_stats(files)
+    return tuple(level_stats[level] or {} for level in files)
 
 def extract_metrics_by_level(data, level_name):
-    """提取每個難度級別的核心指標"""
-    linear_data = [r for r in data['results']['linear'] if r['success']]
-    nonlinear_data = [r for r in data['results']['nonlinear'] if r['success']]
+    """提取每個難度級別的核心指標（只計成功的測試）"""
+    linear_data = format_totals(data, 'linear')
+    nonlinear_data = format_totals(data, 'nonlinear')
     
     # 思考時間
-    linear_times = [r['thinking_time'] for r in linear_data]
-    nonlinear_times = [r['thinking_time'] for r in nonlinear_data]
-    
-    linear_avg_time = statistics.mean(linear_times) if linear_times else 0
-    nonlinear_avg_time = statistics.mean(nonlinear_times) if nonlinear_times else 0
+    linear_avg_time = linear_data['success_time_sum'] / linear_data['success'] if linear_data['success'] else 0
+    nonlinear_avg_time = nonlinear_data['success_time_sum'] / nonlinear_data['success'] if nonlinear_data['success'] else 0
     
     time_improvement = ((linear_avg_time - nonlinear_avg_time) / linear_avg_time) * 100 if linear_avg_time > 0 else 0
     
     # 準確率
-    linear_accuracies = [r['accuracy_analysis']['accurate'] for r in linear_data]
-    nonlinear_accuracies = [r['accuracy_analysis']['accurate'] for r in nonlinear_data]
-    
-    linear_accuracy = sum(linear_accuracies) / len(linear_accuracies) if linear_accuracies else 0
-    nonlinear_accuracy = sum(nonlinear_accuracies) / len(nonlinear_accuracies) if nonlinear_accuracies else 0
+    linear_accuracy = linear_data['success_accurate'] / linear_data['success'] if linear_data['success'] else 0
+    nonlinear_accuracy = nonlinear_data['success_accurate'] / nonlinear_data['success'] if nonlinear_data['success'] else 0
     
     accuracy_improvement = nonlinear_accuracy - linear_accuracy
     
+    # 首個token時間（僅串流測試有此欄位）
+    linear_ttft = linear_data['success_ttft_sum'] / linear_data['success_ttft_n'] if linear_data['success_ttft_n'] else None
+    nonlinear_ttft = nonlinear_data['success_ttft_sum'] / nonlinear_data['success_ttft_n'] if nonlinear_data['success_ttft_n'] else None
+    ttft_improvement = ((linear_ttft - nonlinear_ttft) / linear_ttft) * 100 if linear_ttft and nonlinear_ttft else None
+    
     return {
         'level': level_name,
         'linear_time': linear_avg_time,
@@ -57,17 +62,20 @@ def extract_metrics_by_level(data, level_name):
         'linear_accuracy': linear_accuracy,
         'nonlinear_accuracy': nonlinear_accuracy,
         'accuracy_improvement': accuracy_improvement,
-        'test_count': len(linear_data) + len(nonlinear_data)
+        'linear_ttft': linear_ttft,
+        'nonlinear_ttft': nonlinear_ttft,
+        'ttft_improvement': ttft_improvement,
+        'test_count': linear_data['success'] + nonlinear_data['success']
     }
 
-def analyze_three_levels():
+def analyze_three_levels(store_root=None, pins=None, directories=None):
     """分析三個難度級別的趨勢"""
     print("=" * 80)
     print("                  完整三級難度認知效率分析")
     print("       Complete Three-Level Cognitive Efficiency Analysis")
     print("=" * 80)
     
-    simple_data, medium_data, challenging_data = load_all_three_levels()
+    simple_data, medium_data, challenging_data = load_all_three_levels(store_root, pins, directories)
     
     # 提取三個級別的指標
     simple_metrics = extract_metrics_by_level(simple_data, "簡單題 (1~10)")
@@ -93,6 +101,11 @@ def analyze_three_levels():
     
     print("└─────────────┴─────────────┴─────────────┴─────────────┴─────────────┴─────────────┘")
     
+    # 串流數據：首個token時間
+    for m in metrics:
+        if m['ttft_improvement'] is not None:
+            print(f"   ⏱️ {m['level']} TTFT: 線性 {m['linear_ttft']:.3f}秒 vs 非線性 {m['nonlinear_ttft']:.3f}秒 (提升{m['ttft_improvement']:.1f}%)")
+    
     # 趨勢分析
     print(f"\n🔍 核心趨勢分析：")
     
@@ -239,9 +252,17 @@ def save_complete_analysis(metrics):
 
 def main():
     """主執行函數"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Three-level difficulty analysis")
+    parser.add_argument('--store', metavar='ROOT', help="read trials from a Parquet store (columnar_store.py) instead of the result files")
+    parser.add_argument('--pin', action='append', metavar='LEVEL=RUN', help="use this run id or result file for a level instead of the latest run")
+    parser.add_argument('--results-dir', action='append', metavar='DIR', help="directory of result files to index (repeatable; default EXPERIMENT_RESULTS_DIRS or .)")
+    args = parser.parse_args()
+    
     print("Starting完整三級難度分析...")
     
-    metrics = analyze_three_levels()
+    metrics = analyze_three_levels(args.store, parse_pins(args.pin), args.results_dir)
     save_complete_analysis(metrics)
     
     print("\n" + "=" * 80)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+實驗目錄：以 SQLite 索引所有執行與試驗
+Experiment Catalog: SQLite index of every run and trial, so analysis resolves its inputs by query
+
+    python experiment_catalog.py index "*_results_*.json*"
+    python experiment_catalog.py latest --pin medium=problem_11_20_results_20250915_174331
+    python experiment_catalog.py query --level medium --problem 13
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from experiment_problems import problem_level
+from trial_store import TrialReader
+
+RESULT_PATTERNS = ('*_results_*.jsonl', '*_results_*.json')
+# Post-processed files (re-timed thinking, corrected scoring) share the start time of their raw run and win over it
+CORRECTED_MARKERS = ('_THINKING_FIXED_', 'corrected_')
+TRIAL_COLUMNS = ('run_id', 'problem_id', 'format_type', 'run', 'level', 'model', 'timestamp', 'success',
+                 'accurate', 'thinking_time', 'raw_time', 'tokens_used', 'time_to_first_token')
+
+
+def record_level(record: Dict) -> str:
+    """Difficulty level of a trial record (older records carry none: derived from the problem id)"""
+    return record.get('difficulty_level') or problem_level(record['problem_id'])
+
+
+def is_corrected(path: str) -> bool:
+    """Whether a result file is a corrected copy of a run (``CORRECTED_MARKERS`` in its name)"""
+    name = os.path.basename(path)
+    return any(marker in name for marker in CORRECTED_MARKERS)
+
+
+def run_order(run: Dict) -> tuple:
+    """Sort key of a run, newest first: start time, then corrected files, then file mtime and index time"""
+    return (run['started_at'] or '', is_corrected(run['path']), run['file_mtime'], run['indexed_at'])
+
+
+def parse_pins(values: Optional[List[str]]) -> Dict[str, str]:
+    """{level: run id or path} from ``LEVEL=RUN`` arguments"""
+    pins = {}
+    for value in values or []:
+        level, separator, run = value.partition('=')
+        if not separator or not level or not run:
+            raise ValueError(f"pin must look like LEVEL=RUN_ID_OR_PATH: {value!r}")
+        pins[level] = run
+    return pins
+
+
+def level_records(path: str, level: str) -> List[Dict]:
+    """Trials of one difficulty level from a result file, tagged with their level"""
+    return [dict(record, difficulty_level=record_level(record)) for record in TrialReader(path)
+            if record_level(record) == level]
+
+
+class ExperimentCatalog:
+    """Runs and trials of every indexed result file, keyed by run id, model, level, problem, format and time
+
+    A result file is one run (its id is the file name without extension).
+    Files are re-indexed only when their size or modification time
+    changes, so indexing a directory on every analysis costs a few stat
+    calls.  Trial rows hold the scalar fields needed for cross-run
+    queries; full records stay in the result files.
+    """
+
+    def __init__(self, path: str = 'experiment_catalog.sqlite'):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    model TEXT,
+                    started_at TEXT,
+                    schema_version INTEGER,
+                    trials INTEGER NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    file_mtime REAL NOT NULL,
+                    indexed_at REAL NOT NULL,
+                    experiment_info TEXT
+                );
+                CREATE TABLE IF NOT EXISTS run_levels (
+                    run_id TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    trials INTEGER NOT NULL,
+                    PRIMARY KEY (run_id, level)
+                );
+                CREATE TABLE IF NOT EXISTS trials (
+                    run_id TEXT NOT NULL,
+                    problem_id INTEGER NOT NULL,
+                    format_type TEXT NOT NULL,
+                    run INTEGER,
+                    level TEXT,
+                    model TEXT,
+                    timestamp TEXT,
+                    success INTEGER,
+                    accurate INTEGER,
+                    thinking_time REAL,
+                    raw_time REAL,
+                    tokens_used INTEGER,
+                    time_to_first_token REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_run_levels_level ON run_levels (level);
+                CREATE INDEX IF NOT EXISTS idx_trials_run ON trials (run_id);
+                CREATE INDEX IF NOT EXISTS idx_trials_lookup ON trials (level, problem_id, format_type);
+                CREATE INDEX IF NOT EXISTS idx_trials_model_time ON trials (model, timestamp);
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection, committed and closed on exit"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ==================== INDEXING ====================
+
+    def index_file(self, path: str, force: bool = False) -> Optional[str]:
+        """Index one result file; returns its run id, or None when it was already up to date"""
+        run_id = os.path.splitext(os.path.basename(path))[0]
+        stat = os.stat(path)
+        with self._connect() as conn:
+            row = conn.execute("SELECT file_size, file_mtime FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is not None and not force and (row['file_size'], row['file_mtime']) == (stat.st_size, stat.st_mtime):
+                return None
+
+        reader = TrialReader(path)
+        header = reader.header
+        info = header.get('experiment_info') or {}
+        model = info.get('model')
+        rows, level_counts = [], {}
+        first_timestamp = None
+        for record in reader:
+            level = record_level(record)
+            accuracy = record.get('accuracy_analysis') or {}
+            timestamp = record.get('timestamp')
+            first_timestamp = min(filter(None, [first_timestamp, timestamp]), default=None)
+            level_counts[level] = level_counts.get(level, 0) + 1
+            rows.append((
+                run_id, record['problem_id'], record['format_type'],
+                record['run_number'] if 'run_number' in record else record.get('run'),
+                level, model, timestamp, int(bool(record.get('success'))), int(bool(accuracy.get('accurate'))),
+                record.get('thinking_time'), record.get('raw_time'), record.get('tokens_used'),
+                record.get('time_to_first_token')
+            ))
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM trials WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM run_levels WHERE run_id = ?", (run_id,))
+            conn.execute("""
+                INSERT OR REPLACE INTO runs (run_id, path, model, started_at, schema_version, trials, file_size,
+                                             file_mtime, indexed_at, experiment_info)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (run_id, os.path.abspath(path), model, info.get('start_time') or first_timestamp,
+                  header.get('schema_version', 0), len(rows), stat.st_size, stat.st_mtime, time.time(),
+                  json.dumps(info, ensure_ascii=False)))
+            conn.executemany("INSERT INTO run_levels (run_id, level, trials) VALUES (?, ?, ?)",
+                             [(run_id, level, count) for level, count in level_counts.items()])
+            conn.executemany(f"INSERT INTO trials ({', '.join(TRIAL_COLUMNS)}) "
+                             f"VALUES ({', '.join('?' for _ in TRIAL_COLUMNS)})", rows)
+        return run_id
+
+    def index_paths(self, patterns=RESULT_PATTERNS, force: bool = False, directories=('.',)) -> List[str]:
+        """Index every file matching ``patterns`` in ``directories``; returns the run ids that were (re-)indexed"""
+        paths = sorted({path for directory in directories for pattern in patterns
+                        for path in glob.glob(os.path.join(directory, pattern))})
+        return [run_id for run_id in (self.index_file(path, force) for path in paths) if run_id]
+
+    def prune_missing(self) -> int:
+        """Forget runs whose result file no longer exists"""
+        removed = 0
+        with self._connect() as conn:
+            for row in conn.execute("SELECT run_id, path FROM runs").fetchall():
+                if not os.path.exists(row['path']):
+                    for table in ('trials', 'run_levels', 'runs'):
+                        conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (row['run_id'],))
+                    removed += 1
+        return removed
+
+    # ==================== QUERIES ====================
+
+    def runs(self, level: Optional[str] = None, model: Optional[str] = None) -> List[Dict]:
+        """Indexed runs, newest first
+
+        Runs with the same start time (a raw file and its corrected copy)
+        are ordered by ``run_order``, with the path as the last tiebreak, so
+        the latest run never depends on SQLite's row order.
+        """
+        query = "SELECT DISTINCT r.run_id, r.path, r.model, r.started_at, r.trials, r.file_mtime, r.indexed_at FROM runs r " \
+                "JOIN run_levels l ON l.run_id = r.run_id WHERE 1 = 1"
+        params = []
+        if level is not None:
+            query += " AND l.level = ?"
+            params.append(level)
+        if model is not None:
+            query += " AND r.model = ?"
+            params.append(model)
+        with self._connect() as conn:
+            runs = [dict(row) for row in conn.execute(query + " ORDER BY r.path", params)]
+        return sorted(runs, key=run_order, reverse=True)
+
+    def latest_run(self, level: str, model: Optional[str] = None) -> Optional[Dict]:
+        runs = self.runs(level, model)
+        return runs[0] if runs else None
+
+    def resolve_run(self, run: str) -> str:
+        """Path of a run given by run id or by path"""
+        if os.path.exists(run):
+            return os.path.abspath(run)
+        with self._connect() as conn:
+            row = conn.execute("SELECT path FROM runs WHERE run_id = ?", (run,)).fetchone()
+        if row is None:
+            raise ValueError(f"run {run!r} is neither an indexed run id nor an existing file")
+        return row['path']
+
+    def latest_runs_by_level(self, levels=('simple', 'medium', 'challenging'), model: Optional[str] = None,
+                             pins: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        """{level: path of the newest run covering that level (None when there is none)}
+
+        ``pins`` maps a level to the run id or path to use instead of the newest run.
+        """
+        latest = {}
+        for level in levels:
+            if pins and level in pins:
+                latest[level] = self.resolve_run(pins[level])
+                continue
+            run = self.latest_run(level, model)
+            latest[level] = run['path'] if run else None
+        return latest
+
+    def trials(self, level: Optional[str] = None, problem_id: Optional[int] = None, format_type: Optional[str] = None,
+               model: Optional[str] = None, run_id: Optional[str] = None, since: Optional[str] = None) -> List[Dict]:
+        """Trial rows across runs matching every given key"""
+        conditions, params = [], []
+        for column, value in (('level', level), ('problem_id', problem_id), ('format_type', format_type),
+                              ('model', model), ('run_id', run_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        query = f"SELECT {', '.join(TRIAL_COLUMNS)} FROM trials"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def problem_history(self, level: Optional[str] = None, **filters) -> List[Dict]:
+        """Per-(run, problem, format) accuracy and mean thinking time, computed in SQL"""
+        conditions, params = [], []
+        for column, value in dict(filters, level=level).items():
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        query = """
+            SELECT run_id, problem_id, format_type, COUNT(*) AS trials, AVG(accurate) AS accuracy,
+                   AVG(thinking_time) AS mean_thinking_time, MIN(timestamp) AS started_at
+            FROM trials
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " GROUP BY run_id, problem_id, format_type ORDER BY problem_id, format_type, started_at"
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+
+def result_directories(directories: Optional[List[str]] = None) -> List[str]:
+    """Directories to index: ``directories``, else EXPERIMENT_RESULTS_DIRS (os.pathsep-separated), else the working directory"""
+    if directories:
+        return list(directories)
+    return [directory for directory in os.getenv('EXPERIMENT_RESULTS_DIRS', '').split(os.pathsep) if directory] or ['.']
+
+
+def get_experiment_catalog(index: bool = True, directories: Optional[List[str]] = None) -> ExperimentCatalog:
+    """Catalog at EXPERIMENT_CATALOG_PATH (default experiment_catalog.sqlite), refreshed from ``result_directories``"""
+    catalog = ExperimentCatalog(os.getenv('EXPERIMENT_CATALOG_PATH', 'experiment_catalog.sqlite'))
+    if index:
+        catalog.index_paths(directories=result_directories(directories))
+    return catalog
+
+
+def main():
+    """主執行函數"""
+    parser = argparse.ArgumentParser(description="Experiment catalog (SQLite index of runs and trials)")
+    parser.add_argument('command', choices=['index', 'runs', 'latest', 'query'])
+    parser.add_argument('paths', nargs='*', help="index: result files or globs (default: *_results_* in each results directory)")
+    parser.add_argument('--level', help="difficulty level")
+    parser.add_argument('--model', help="model name")
+    parser.add_argument('--problem', type=int, help="query: problem id")
+    parser.add_argument('--format-type', choices=['linear', 'nonlinear'], help="query: format")
+    parser.add_argument('--force', action='store_true', help="index: re-index unchanged files")
+    parser.add_argument('--results-dir', action='append', metavar='DIR', help="index: directory to search (repeatable; default EXPERIMENT_RESULTS_DIRS or .)")
+    parser.add_argument('--pin', action='append', metavar='LEVEL=RUN', help="latest: use this run id or path for a level")
+    args = parser.parse_args()
+
+    catalog = get_experiment_catalog(index=False)
+    start_time = time.perf_counter()
+
+    if args.command == 'index':
+        indexed = catalog.index_paths(args.paths or RESULT_PATTERNS, args.force, result_directories(args.results_dir))
+        removed = catalog.prune_missing()
+        print(f"✅ Indexed {len(indexed)} runs, removed {removed} missing ({time.perf_counter() - start_time:.2f}s)")
+    elif args.command == 'runs':
+        for run in catalog.runs(args.level, args.model):
+            print(f"   🔸 {run['run_id']}  {run['started_at']}  {run['model']}  {run['trials']} trials")
+    elif args.command == 'latest':
+        for level, path in catalog.latest_runs_by_level(model=args.model, pins=parse_pins(args.pin)).items():
+            print(f"   {level:<12} {path or '-'}")
+    else:
+        for row in catalog.problem_history(args.level, problem_id=args.problem, format_type=args.format_type, model=args.model):
+            print(f"   {row['run_id']}  Problem {row['problem_id']:>2} {row['format_type']:<9} "
+                  f"trials {row['trials']:>3}  accuracy {row['accuracy']:.1%}  thinking {row['mean_thinking_time'] or 0:.3f}s")
+        print(f"   ({time.perf_counter() - start_time:.3f}s)")
+
+if __name__ == "__main__":
+    main()
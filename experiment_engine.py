@@ -0,0 +1,1092 @@
+#!/usr/bin/env python3
+"""
+統一實驗引擎：以難度設定檔驅動 Problem 1~30
+Unified Experiment Engine: one runner for problems 1-30, configured by per-difficulty profiles
+"""
+
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import openai
+import os
+
+from accuracy_curves import REPORT_TOLERANCES, accuracy_curves, accuracy_rate, curve_at, trial_arrays
+from adaptive_sampling import AdaptiveSampler
+from answer_consistency import answer_fields, consistency_table
+from answer_extraction import (extract_answer_advanced, extract_answer_line, extract_batch, extract_last_number,
+                               unit_alias_table, unit_conversion)
+from async_dispatcher import AsyncTrialDispatcher
+from baseline_service import BASELINE_ESTIMATORS, BaselineService
+from experiment_catalog import get_experiment_catalog
+from experiment_problems import load_problems
+from llm_backend import BACKEND_NAMES, ChatBackend, get_backend
+from rate_limiter import RateLimiter, estimate_request_tokens, get_shared_rate_limiter
+from response_cache import CACHE_MODES, ResponseCache, get_response_cache
+from retry_policy import RetryPolicy
+from running_stats import LiveProgress, RunningStats
+from timing_spans import SpanRecorder, export_trace, span, summarize_spans
+from trial_journal import TrialJournal, record_cell, trial_cell
+from trial_store import write_results
+
+MODEL_NAME = 'gpt-3.5-turbo'
+
+
+# ==================== ACCURACY SCORING ====================
+
+def score_numeric(extracted: Dict, problem: Dict, profile: Dict) -> Dict:
+    """Relative-error check against the profile tolerance plus unit-variant matching"""
+    expected_value = problem['expected_value']
+    expected_unit = problem['expected_unit']
+
+    if not extracted['success']:
+        return {
+            'accurate': False,
+            'value_accurate': False,
+            'unit_match': False,
+            'relative_error': float('inf'),
+            'extracted_value': None,
+            'expected_value': expected_value,
+            'extracted_unit': None,
+            'expected_unit': expected_unit,
+            'reason': 'Failed to extract answer'
+        }
+
+    # 單位匹配（常見變體，或經因次換算到預期單位）
+    extracted_value = extracted['value']
+    factor = unit_conversion(extracted['unit'], expected_unit, profile_unit_aliases(profile))
+    unit_match = factor is not None
+    converted_value = extracted_value * factor if unit_match else extracted_value
+
+    # 數值準確性（以預期單位比較）
+    relative_error = abs(converted_value - expected_value) / abs(expected_value) if expected_value != 0 else abs(converted_value)
+    value_accurate = relative_error <= profile['tolerance']
+
+    return {
+        'accurate': value_accurate and unit_match,
+        'value_accurate': value_accurate,
+        'unit_match': unit_match,
+        'relative_error': relative_error,
+        'extracted_value': extracted_value,
+        'converted_value': converted_value,
+        'expected_value': expected_value,
+        'extracted_unit': extracted['unit'],
+        'expected_unit': expected_unit
+    }
+
+
+def score_advanced(extracted: Dict, problem: Dict, profile: Dict) -> Dict:
+    """計算高級問題的準確性（數值、符號與嘗試性回答）"""
+    if not extracted['success']:
+        return score_numeric(extracted, problem, profile)
+
+    # 數值問題的準確性檢查
+    if extracted['type'] == 'numerical' and isinstance(problem['expected_value'], (int, float)):
+        return score_numeric(extracted, problem, profile)
+
+    # 符號問題的準確性檢查：與參考答案數值等價
+    elif extracted['type'] == 'symbolic':
+        parts_ratio = extracted.get('parts_matched', 0) / extracted.get('parts_total', 1)
+        symbolic_accurate = extracted.get('symbolic_match', False)
+
+        return {
+            'accurate': symbolic_accurate,
+            'value_accurate': symbolic_accurate,
+            'unit_match': True,  # 符號解不檢查單位
+            'relative_error': 1.0 - parts_ratio,
+            'parts_ratio': parts_ratio
+        }
+
+    # 嘗試性回答：沒有可驗證的最終答案，不計為準確
+    elif extracted['type'] == 'attempt':
+        attempt_score = extracted.get('formula_score', 0)
+
+        return {
+            'accurate': False,
+            'value_accurate': False,
+            'unit_match': True,
+            'relative_error': max(0, 1.0 - attempt_score / 10),
+            'attempt_score': attempt_score,
+            'reason': 'No verifiable final answer'
+        }
+
+    return {
+        'accurate': False,
+        'value_accurate': False,
+        'unit_match': False,
+        'relative_error': 1.0,
+        'reason': 'Unknown answer type'
+    }
+
+
+def shows_calculation(response_text: str) -> bool:
+    """檢查是否顯示了計算過程"""
+    return any(keyword in response_text.lower() for keyword in
+               ['=', 'calculate', 'multiply', 'divide', 'step', '×', '*', '/', 'formula'])
+
+
+def shows_derivation(response_text: str) -> bool:
+    """檢查是否顯示了推導過程"""
+    derivation_keywords = ['derive', 'conservation', 'energy', 'momentum', 'equation', 'substitute', 'therefore', 'hence']
+    return sum(1 for keyword in derivation_keywords if keyword.lower() in response_text.lower()) >= 2
+
+
+# ==================== DIFFICULTY PROFILES ====================
+
+DIFFICULTY_PROFILES = {
+    'simple': {
+        'display_name': '簡單',
+        'problem_range': '1-10',
+        'system_prompt': "You are a physics expert. Provide precise numerical answers only.",
+        'max_tokens': 50,   # Strictly limit tokens to force concise answers
+        'temperature': 0.1,
+        'tolerance': 0.05,
+        'extractor': extract_last_number,
+        'scorer': score_numeric,
+        'unit_variants': {
+            'km/h': ['km/h', 'kmh', 'km/hr'],
+            'm': ['m', 'meters', 'meter'],
+            'N': ['N', 'newtons', 'newton'],
+            'J': ['J', 'joules', 'joule'],
+            'm/s²': ['m/s²', 'm/s^2', 'm/s2', 'm/s/s'],
+            'L': ['L', 'l', 'liters', 'liter'],
+            's': ['s', 'seconds', 'second']
+        },
+        'formula_label': 'FORMULA',
+        'runs_per_problem': 3,
+        'randomize_order': False,
+        'work_check': None,
+        'consistency': 'value',
+        'early_stop': 'unit',   # prompt asks for "XX.X unit" only
+        'report_notes': [
+            "✅ 基礎物理：直接代入公式計算",
+            "✅ 嚴格限制token：強制簡潔答案",
+            "✅ 5%容忍度"
+        ]
+    },
+    'medium': {
+        'display_name': '中等難度',
+        'problem_range': '11-20',
+        'system_prompt': "You are a physics expert specializing in detailed problem solving. Show all work clearly.",
+        'max_tokens': 400,  # 中等題目需要更多token
+        'temperature': 0.1,
+        'tolerance': 0.10,  # 中等題目允許10%誤差
+        'extractor': extract_answer_line,
+        'scorer': score_numeric,
+        'unit_variants': {
+            'N': ['N', 'newtons', 'newton'],
+            'm/s²': ['m/s²', 'm/s2', 'ms2'],
+            'm/s': ['m/s', 'ms', 'm·s⁻¹'],
+            'atm': ['atm', 'atmosphere', 'atmospheres'],
+            'J': ['J', 'joules', 'joule'],
+            'm': ['m', 'meters', 'metres'],
+            '%': ['%', 'percent', 'efficiency'],
+            'kg': ['kg', 'kilograms']
+        },
+        'formula_label': 'FORMULA',
+        'runs_per_problem': 3,
+        'randomize_order': True,
+        'work_check': ('calculation_shown', shows_calculation),
+        'consistency': 'value',
+        'early_stop': 'answer_line',
+        'report_notes': [
+            "✅ 涵蓋多步驟問題：碰撞、擺、軌道、相變等",
+            "✅ 防記憶污染：隨機順序 + 獨立並行請求",
+            "✅ 更嚴格驗證：多步計算過程檢查",
+            "✅ 允許較大誤差：10%容忍度（vs 簡單題5%）"
+        ]
+    },
+    'challenging': {
+        'display_name': '高難度',
+        'problem_range': '21-30',
+        'system_prompt': "You are an expert theoretical physicist. Solve advanced problems with rigorous mathematical derivations.",
+        'max_tokens': 500,  # 高難度問題需要更多token
+        'temperature': 0.1,
+        'tolerance': 0.15,  # 高難度問題允許15%誤差
+        'extractor': extract_answer_advanced,
+        'scorer': score_advanced,
+        'unit_variants': {
+            'ratio': ['ratio', '', '1', 'dimensionless'],
+            'R': ['R', 'r', 'radius'],
+            'J': ['J', 'joules', 'joule'],
+            '%': ['%', 'percent']
+        },
+        'formula_label': 'FORMULAS',
+        'runs_per_problem': 3,
+        'randomize_order': True,
+        'work_check': ('derivation_shown', shows_derivation),
+        'consistency': 'answer_type',
+        'early_stop': 'answer_line',   # symbolic answers are never cut short
+        'report_notes': [
+            "✅ 涵蓋高級概念：刚体力學、熱力學循環、耦合振動、火箭推進",
+            "✅ 混合數值與符號解答",
+            "✅ 防記憶污染：隨機順序 + 獨立並行請求",
+            "✅ 允許更大誤差：15%容忍度（vs 中等題10%）"
+        ]
+    }
+}
+
+
+def profile_unit_aliases(profile: Dict) -> Dict:
+    """Precomputed unit alias table of a profile (built on first use for custom profiles)"""
+    if 'unit_aliases' not in profile:
+        profile['unit_aliases'] = unit_alias_table(profile['unit_variants'])
+    return profile['unit_aliases']
+
+
+def parse_problem_ids(spec: str) -> List[int]:
+    """Parse a selection such as '1-10,15,21-30' into problem ids"""
+    problem_ids = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            problem_ids.extend(range(int(first), int(last) + 1))
+        else:
+            problem_ids.append(int(part))
+    return problem_ids
+
+
+# ==================== ENGINE ====================
+
+class ExperimentEngine:
+    """Unified experiment engine
+
+    Every level-specific setting (token budget, tolerance, extractor,
+    scorer, unit variants, run count, ordering) comes from
+    ``DIFFICULTY_PROFILES``, so a single pass can run any subset of
+    problems 1-30 through one request/extraction/scoring path.
+    """
+
+    result_prefix = 'experiment'
+
+    def __init__(self, api_key: str = None, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None,
+                 profiles: Dict = None, response_cache: ResponseCache = None, backend: ChatBackend = None,
+                 stream: bool = False, early_stop: bool = False, baseline_service: BaselineService = None,
+                 adaptive: AdaptiveSampler = None):
+        if api_key:
+            openai.api_key = api_key
+        else:
+            openai.api_key = os.getenv('OPENAI_API_KEY')
+
+        self.baseline_time = 0.0
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.profiles = profiles or DIFFICULTY_PROFILES
+        self.backend = backend or get_backend()
+        self.early_stop = early_stop
+        self.stream = stream or early_stop  # early stop works on the token stream
+        # Mock responses must never end up in the shared response cache, even when a cache is passed in
+        if response_cache is None or (self.backend.name == 'mock' and response_cache.mode != 'bypass'):
+            response_cache = get_response_cache(backend=self.backend.name)
+        self.response_cache = response_cache
+        self.baseline_service = baseline_service or BaselineService(self.backend, self.rate_limiter, model=MODEL_NAME)
+        # Optional sequential stopping: extra runs only for problems whose comparison is still uncertain
+        self.adaptive = adaptive
+
+    def establish_baseline(self, num_samples: int = 5, concurrent: bool = False) -> float:
+        """Establish the initial baseline from ``num_samples`` probes
+
+        With ``concurrent=True`` the probes are fired in parallel, outliers
+        are rejected by MAD and the estimate gets a bootstrap confidence
+        interval.  Further probes are interleaved with the trials during
+        ``run``; this estimate is only the starting point of the rolling
+        baseline.
+        """
+        print("🔧 Establishing baseline...")
+
+        if concurrent:
+            calibration = self.baseline_service.calibrate(num_samples)
+            if calibration['samples'] == 0:
+                print("❌ Baseline establishment failed")
+                return 0.0
+            self.baseline_time = calibration['baseline']
+            print(f"   {calibration['samples']} concurrent probes in {calibration['wall_time']:.3f}s, "
+                  f"{len(calibration['rejected'])} outliers rejected")
+            print(f"✅ Baseline established: {self.baseline_time:.3f}s "
+                  f"({calibration['confidence']:.0%} CI {calibration['ci_low']:.3f}–{calibration['ci_high']:.3f}s)")
+            return self.baseline_time
+
+        for i in range(num_samples):
+            sample = self.baseline_service.probe()
+            if sample is not None:
+                print(f"   Baseline sample {i+1}: {sample['latency']:.3f}s → '{sample['reply']}'")
+
+        if self.baseline_service.samples:
+            self.baseline_time = self.baseline_service.estimate_at()
+            print(f"✅ Baseline established: {self.baseline_time:.3f}s ({self.baseline_service.estimator})")
+            return self.baseline_time
+        else:
+            print("❌ Baseline establishment failed")
+            return 0.0
+
+    def baseline_for(self, request_time: float = None) -> float:
+        """Rolling baseline nearest in time to a request (the initial estimate when no probes ran)"""
+        if self.baseline_service.samples:
+            return self.baseline_service.estimate_at(request_time)
+        return self.baseline_time
+
+    def create_linear_prompt(self, problem: Dict) -> str:
+        """Create linear language prompt - unified format"""
+        return f"""
+Solve this physics problem:
+
+{problem['linear_text']}
+
+Provide only the numerical answer with units.
+Format: "XX.X unit"
+"""
+
+    def create_nonlinear_prompt(self, problem: Dict) -> str:
+        """Create nonlinear language prompt - unified format"""
+        formula_label = self.profiles[problem['level']]['formula_label']
+        return f"""
+Solve this physics problem using the structured format:
+
+GIVEN: {problem['given']}
+{formula_label}: {problem['formula']}
+TARGET: {problem['target']}
+
+Provide only the numerical answer with units.
+Format: "XX.X unit"
+"""
+
+    def build_request(self, prompt: str, profile: Dict) -> Dict:
+        """Build ChatCompletion arguments for a trial"""
+        return {
+            'model': MODEL_NAME,
+            'messages': [
+                {"role": "system", "content": profile['system_prompt']},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': profile['max_tokens'],
+            'temperature': profile['temperature']
+        }
+
+    def build_trial(self, problem: Dict, format_type: str, run: int) -> Dict:
+        """One (problem, format, run) cell with its request and timing span recorder"""
+        profile = self.profiles[problem['level']]
+        recorder = SpanRecorder()
+        with recorder.span('prompt_build'):
+            if format_type == 'linear':
+                prompt = self.create_linear_prompt(problem)
+            else:
+                prompt = self.create_nonlinear_prompt(problem)
+            request = self.build_request(prompt, profile)
+        trial = {
+            'problem': problem,
+            'format_type': format_type,
+            'run': run,
+            'request': request,
+            'spans': recorder
+        }
+        if self.early_stop:
+            trial['stop_when'] = lambda text: self.answer_complete(text, problem)
+        return trial
+
+    def answer_complete(self, response_text: str, problem: Dict) -> bool:
+        """Whether a partial response already holds a confident numerical answer in the expected unit
+
+        Only text up to the last whitespace is judged, so a number or unit
+        that is still being streamed is never cut.  'answer_line' profiles
+        additionally require the "Answer:" line rather than a backup match.
+        """
+        profile = self.profiles[problem['level']]
+        mode = profile.get('early_stop')
+        cut = max(response_text.rfind(' '), response_text.rfind('\n'))
+        if mode is None or cut <= 0:
+            return False
+
+        settled = response_text[:cut]
+        if mode == 'answer_line':
+            if 'Answer:' not in settled:
+                return False
+            settled = settled[settled.rindex('Answer:'):]
+
+        extracted = profile['extractor'](settled, problem)
+        if not extracted['success'] or not isinstance(extracted['value'], float) or extracted.get('backup_extraction'):
+            return False
+        return unit_conversion(extracted['unit'], problem['expected_unit'], profile_unit_aliases(profile)) is not None
+
+    def build_trials(self, problems: List[Dict]) -> List[Dict]:
+        """Build every trial; randomized levels get shuffled order and format order (防記憶污染)"""
+        ordered = []
+        randomized = []
+        for problem in problems:
+            profile = self.profiles[problem['level']]
+            for run in range(1, profile['runs_per_problem'] + 1):
+                if profile['randomize_order']:
+                    randomized.append((problem, run))
+                else:
+                    for format_type in ['linear', 'nonlinear']:
+                        ordered.append(self.build_trial(problem, format_type, run))
+
+        random.shuffle(randomized)
+        for problem, run in randomized:
+            format_order = ['linear', 'nonlinear']
+            random.shuffle(format_order)
+            for format_type in format_order:
+                ordered.append(self.build_trial(problem, format_type, run))
+        return ordered
+
+    def build_run_trials(self, runs: List[Tuple[Dict, int]]) -> List[Dict]:
+        """Trials of extra (problem, run) pairs chosen by adaptive sampling, ordered like ``build_trials``"""
+        runs = list(runs)
+        random.shuffle(runs)
+        trials = []
+        for problem, run in runs:
+            format_order = ['linear', 'nonlinear']
+            if self.profiles[problem['level']]['randomize_order']:
+                random.shuffle(format_order)
+            for format_type in format_order:
+                trials.append(self.build_trial(problem, format_type, run))
+        return trials
+
+    def score_response(self, response_text: str, problem: Dict) -> Dict:
+        """Extraction, accuracy and work check for a response under its level profile"""
+        profile = self.profiles[problem['level']]
+        with span('extraction'):
+            extracted = profile['extractor'](response_text, problem)
+        with span('scoring'):
+            scored = {
+                'extracted_answer': extracted,
+                'accuracy_analysis': profile['scorer'](extracted, problem, profile)
+            }
+        if profile['work_check']:
+            field, check = profile['work_check']
+            with span('work_check'):
+                scored[field] = check(response_text)
+        return scored
+
+    def rescore_records(self, records: List[Dict]) -> int:
+        """Re-apply extraction, accuracy and work checks to stored trial records in place
+
+        Records are grouped by difficulty level so each level's extractor
+        runs as one batch; failed trials are left untouched.  Returns the
+        number of records whose accuracy verdict changed.
+        """
+        problems = {problem['id']: problem for problem in load_problems()}
+        by_level = {}
+        for record in records:
+            if record.get('success') and record['problem_id'] in problems:
+                level = record.get('difficulty_level') or problems[record['problem_id']]['level']
+                by_level.setdefault(level, []).append(record)
+
+        changed = 0
+        for level, level_records in by_level.items():
+            profile = self.profiles[level]
+            record_problems = [problems[record['problem_id']] for record in level_records]
+            extracted = extract_batch([record['response'] for record in level_records], profile['extractor'],
+                                      record_problems)
+            for record, problem, answer in zip(level_records, record_problems, extracted):
+                was_accurate = record.get('accuracy_analysis', {}).get('accurate')
+                record['extracted_answer'] = answer
+                record['accuracy_analysis'] = profile['scorer'](answer, problem, profile)
+                if profile['work_check']:
+                    field, check = profile['work_check']
+                    record[field] = check(record['response'])
+                if record['accuracy_analysis']['accurate'] != was_accurate:
+                    changed += 1
+        return changed
+
+    def build_trial_result(self, response, raw_time: float, trial: Dict, request_time: float = None) -> Dict:
+        """Build the trial record from a successful response"""
+        problem = trial['problem']
+        baseline_time = self.baseline_for(request_time)
+        thinking_time = max(0, raw_time - baseline_time)
+        response_text = response.choices[0].message.content.strip()
+
+        result = {
+            'problem_id': problem['id'],
+            'difficulty_level': problem['level'],
+            'run': trial['run'],
+            'randomized_id': f"{problem['id']}_{trial['run']}",
+            'format_type': trial['format_type'],
+            'raw_time': raw_time,
+            'baseline_time': baseline_time,
+            'request_time': request_time,
+            'thinking_time': thinking_time,
+            'response': response_text,
+            'tokens_used': response.usage.total_tokens,
+            'success': True,
+            'timestamp': datetime.now().isoformat()
+        }
+
+        # Streaming splits raw_time into time-to-first-token and generation
+        stream_timing = response.get('stream_timing')
+        if stream_timing:
+            result['time_to_first_token'] = stream_timing['time_to_first_token']
+            result['generation_time'] = stream_timing['generation_time']
+            result['inter_token_intervals'] = stream_timing['inter_token_intervals']
+            result['streamed_chunks'] = stream_timing['chunks']
+            result['early_stopped'] = stream_timing.get('early_stopped', False)
+            if result['early_stopped']:
+                result['truncation_point'] = {
+                    'chunks': stream_timing['chunks'],
+                    'characters': len(response.choices[0].message.content),
+                    'time': stream_timing['total_time']
+                }
+
+        result.update(self.score_response(response_text, problem))
+        return result
+
+    def build_failed_result(self, error: Exception, raw_time: float, trial: Dict) -> Dict:
+        """Build the trial record for a failed request"""
+        problem = trial['problem']
+        result = {
+            'problem_id': problem['id'],
+            'difficulty_level': problem['level'],
+            'run': trial['run'],
+            'randomized_id': f"{problem['id']}_{trial['run']}",
+            'format_type': trial['format_type'],
+            'raw_time': raw_time,
+            'thinking_time': 0,
+            'response': str(error),
+            'tokens_used': 0,
+            'extracted_answer': {'success': False, 'value': None, 'unit': None},
+            'accuracy_analysis': {'accurate': False, 'value_accurate': False, 'unit_match': False},
+            'success': False,
+            'timestamp': datetime.now().isoformat()
+        }
+        work_check = self.profiles[problem['level']]['work_check']
+        if work_check:
+            result[work_check[0]] = False
+        return result
+
+    def outcome_to_result(self, outcome: Dict) -> Dict:
+        """Convert a retry/dispatcher outcome into a trial record"""
+        trial = outcome['trial']
+        recorder = trial.get('spans') or SpanRecorder()
+        with recorder.active():
+            if outcome['error'] is not None:
+                result = self.build_failed_result(outcome['error'], outcome['raw_time'], trial)
+                result['error_class'] = outcome['error_class']
+            else:
+                result = self.build_trial_result(outcome['response'], outcome['raw_time'], trial,
+                                                 outcome.get('request_time'))
+
+        # raw_time covers only the final attempt; retries are reported separately
+        result['attempts'] = outcome['attempts']
+        result['attempt_errors'] = outcome['attempt_errors']
+        result['retry_overhead_time'] = outcome['retry_overhead_time']
+        result['cache_hit'] = outcome.get('cache_hit', False)
+        result['timing_spans'] = recorder.export()
+        return result
+
+    def cached_outcome(self, trial: Dict) -> Optional[Dict]:
+        """Outcome served from the response cache, or None on a miss"""
+        with trial['spans'].span('cache_lookup'):
+            cached = self.response_cache.get(trial['request'], sample=trial['run'], backend=self.backend.name,
+                                             api_base=self.backend.api_base)
+        if cached is None:
+            return None
+        # raw_time is the latency measured when the response was first fetched
+        return {
+            'response': cached['response'],
+            'raw_time': cached['raw_time'],
+            'attempts': 0,
+            'error': None,
+            'error_class': None,
+            'attempt_errors': [],
+            'retry_overhead_time': 0.0,
+            'cache_hit': True,
+            'trial': trial
+        }
+
+    def cache_outcome(self, outcome: Dict):
+        """Store a freshly fetched successful response"""
+        # Early-stopped responses are truncated and must not be served to full runs
+        early_stopped = outcome['error'] is None and outcome['response'].get('stream_timing', {}).get('early_stopped')
+        if outcome['error'] is None and not outcome.get('cache_hit') and not early_stopped:
+            trial = outcome['trial']
+            self.response_cache.put(trial['request'], outcome['response'], outcome['raw_time'], sample=trial['run'],
+                                    backend=self.backend.name, api_base=self.backend.api_base)
+
+    def send_request(self, trial: Dict):
+        """Synchronous ChatCompletion call for a trial (streamed when enabled)"""
+        if self.stream:
+            return self.backend.create_streamed(stop_when=trial.get('stop_when'), **trial['request'])
+        return self.backend.create(**trial['request'])
+
+    def run_single_test(self, problem: Dict, format_type: str, run: int) -> Dict:
+        """Run a single trial synchronously"""
+        trial = self.build_trial(problem, format_type, run)
+        outcome = self.cached_outcome(trial)
+        if outcome is not None:
+            return self.outcome_to_result(outcome)
+
+        estimated_tokens = estimate_request_tokens(trial['request'])
+
+        with trial['spans'].active():
+            outcome = self.retry_policy.run(
+                lambda: self.send_request(trial),
+                before_attempt=lambda: self.rate_limiter.acquire_sync(estimated_tokens),
+                on_error=self.rate_limiter.observe_error
+            )
+        if outcome['error'] is None:
+            self.rate_limiter.record_usage(estimated_tokens, outcome['response'].usage.total_tokens)
+
+        outcome['trial'] = trial
+        self.cache_outcome(outcome)
+        return self.outcome_to_result(outcome)
+
+    def run(self, problem_ids: Optional[List[int]] = None, max_concurrency: int = 8,
+            journal_path: str = None, resume: bool = False, progress_every: int = 10) -> Dict:
+        """Run the selected problems (all 30 by default) in one concurrent pass
+
+        Every completed trial is appended to ``journal_path`` as it finishes.
+        With ``resume=True`` the journal is read first and only the missing
+        (problem_id, format, run) cells are sent to the API.  Requests found
+        in the response cache are answered locally unless the cache is in
+        ``bypass`` mode.  Every ``progress_every`` trials (0: never) the
+        running per-format latency and accuracy are printed with confidence
+        intervals.
+        """
+        problems = load_problems(problem_ids)
+        levels = sorted({problem['level'] for problem in problems}, key=list(self.profiles).index)
+        print(f"🚀 Starting experiment: {len(problems)} problems ({', '.join(levels)})")
+
+        if journal_path is None:
+            journal_path = f"{self.result_prefix}_journal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        journal = TrialJournal(journal_path)
+        completed = journal.completed_records() if resume else {}
+        if completed:
+            print(f"♻️ Resuming from {journal_path}: {len(completed)} trials already completed")
+
+        if self.baseline_time == 0:
+            self.establish_baseline()
+
+        results = {
+            'experiment_info': {
+                'start_time': datetime.now().isoformat(),
+                'problem_ids': [problem['id'] for problem in problems],
+                'total_problems': len(problems),
+                'difficulty_levels': levels,
+                'runs_per_problem': {level: self.profiles[level]['runs_per_problem'] for level in levels},
+                'max_tokens': {level: self.profiles[level]['max_tokens'] for level in levels},
+                'tolerance': {level: self.profiles[level]['tolerance'] for level in levels},
+                'baseline_time': self.baseline_time,
+                'model': MODEL_NAME,
+                'temperature': {level: self.profiles[level]['temperature'] for level in levels},
+                'max_concurrency': max_concurrency,
+                'journal_path': journal_path,
+                'resumed_trials': len(completed),
+                'cache_mode': self.response_cache.mode,
+                'backend': self.backend.name,
+                'stream': self.stream,
+                'early_stop': self.early_stop
+            },
+            'linear': [],
+            'nonlinear': []
+        }
+
+        trials = self.build_trials(problems)
+        records = dict(completed)
+        fresh = []
+        progress = LiveProgress()
+        for result in completed.values():
+            progress.push(result)
+            if self.adaptive is not None:
+                self.adaptive.push(result)
+
+        def record_trial(outcome: Dict):
+            # Journal each trial the moment it completes
+            self.cache_outcome(outcome)
+            result = self.outcome_to_result(outcome)
+            journal.append(result)
+            records[record_cell(result)] = result
+            fresh.append(result)
+
+            status = f"{result['raw_time']:.3f}s" if result['success'] else f"failed: {result['response']}"
+            if result['cache_hit']:
+                status += " (cached)"
+            print(f"   🔸 Problem {result['randomized_id']} {result['format_type']} ({len(records)}/{len(trials)}): {status}")
+
+            progress.push(result)
+            if self.adaptive is not None:
+                self.adaptive.push(result)
+            if progress_every and (len(fresh) % progress_every == 0 or len(records) == len(trials)):
+                print(progress.render())
+
+        dispatcher = AsyncTrialDispatcher(max_concurrency=max_concurrency, rate_limiter=self.rate_limiter,
+                                          retry_policy=self.retry_policy, backend=self.backend, stream=self.stream,
+                                          baseline=self.baseline_service)
+
+        def dispatch(batch: List[Dict]):
+            # Answer cached requests locally; only misses go to the API, concurrently
+            uncached = []
+            for trial in batch:
+                if trial_cell(trial['problem']['id'], trial['format_type'], trial['run']) in completed:
+                    continue
+                outcome = self.cached_outcome(trial)
+                if outcome is not None:
+                    record_trial(outcome)
+                else:
+                    uncached.append(trial)
+            dispatcher.run(uncached, on_complete=record_trial)
+
+        dispatch(trials)
+
+        # Adaptive sampling: one more paired run per round for every problem whose comparison is unsettled
+        if self.adaptive is not None:
+            min_runs = {problem['id']: self.profiles[problem['level']]['runs_per_problem'] for problem in problems}
+            while True:
+                next_runs = self.adaptive.next_runs(problems, min_runs)
+                if not next_runs:
+                    break
+                print(f"🎲 Adaptive sampling: {len(next_runs)} problems still unsettled, "
+                      f"adding run {max(run for _, run in next_runs)}")
+                batch = self.build_run_trials(next_runs)
+                trials.extend(batch)
+                dispatch(batch)
+            results['experiment_info']['adaptive_sampling'] = self.adaptive.summary(min_runs)
+
+        # Journaled thinking times used the probes seen so far; with the full
+        # series each trial is re-corrected against probes on both sides of it
+        for result in fresh:
+            self.baseline_service.correct(result)
+
+        scheduled = set()
+        for trial in trials:
+            cell = trial_cell(trial['problem']['id'], trial['format_type'], trial['run'])
+            scheduled.add(cell)
+            results[records[cell]['format_type']].append(records[cell])
+        # Resumed journals may hold extra runs an earlier adaptive pass added
+        for cell in sorted(set(records) - scheduled):
+            results[records[cell]['format_type']].append(records[cell])
+
+        results['experiment_info']['end_time'] = datetime.now().isoformat()
+        results['experiment_info']['rate_limiter'] = self.rate_limiter.stats()
+        results['experiment_info']['response_cache'] = self.response_cache.stats()
+        results['experiment_info']['baseline'] = self.baseline_service.info()
+        results['experiment_info']['live_stats'] = progress.snapshot()
+        return results
+
+    def analyze_three_metrics(self, results: Dict) -> Dict:
+        """分析三大核心指標"""
+        print("\n📊 分析三大核心指標...")
+
+        linear_data = [r for r in results['linear'] if r['success']]
+        nonlinear_data = [r for r in results['nonlinear'] if r['success']]
+
+        # 1. 校正思考時間分析（Welford 累加器，與執行中的即時統計相同）
+        linear_times = RunningStats.of(r['thinking_time'] for r in linear_data)
+        nonlinear_times = RunningStats.of(r['thinking_time'] for r in nonlinear_data)
+
+        timing_analysis = {
+            'linear_avg_time': linear_times.mean,
+            'nonlinear_avg_time': nonlinear_times.mean,
+            'linear_time_std': linear_times.stdev,
+            'nonlinear_time_std': nonlinear_times.stdev,
+            'linear_time_ci': linear_times.mean_ci(),
+            'nonlinear_time_ci': nonlinear_times.mean_ci(),
+            'time_improvement': 0,
+            'faster_format': 'tie'
+        }
+
+        if timing_analysis['linear_avg_time'] > 0 and timing_analysis['nonlinear_avg_time'] > 0:
+            time_diff = timing_analysis['linear_avg_time'] - timing_analysis['nonlinear_avg_time']
+            timing_analysis['time_improvement'] = (time_diff / timing_analysis['linear_avg_time']) * 100
+            timing_analysis['faster_format'] = 'nonlinear' if time_diff > 0 else 'linear'
+
+        # 2. 錯誤率分析（欄位陣列一次建立，同時計算整條容忍度曲線）
+        arrays = trial_arrays(linear_data + nonlinear_data)
+        linear_accuracy_rate = accuracy_rate(arrays, 'linear')
+        nonlinear_accuracy_rate = accuracy_rate(arrays, 'nonlinear')
+
+        accuracy_analysis = {
+            'linear_accuracy_rate': linear_accuracy_rate,
+            'nonlinear_accuracy_rate': nonlinear_accuracy_rate,
+            'linear_error_rate': 1 - linear_accuracy_rate if linear_data else 0,
+            'nonlinear_error_rate': 1 - nonlinear_accuracy_rate if nonlinear_data else 0,
+            'more_accurate_format': 'tie'
+        }
+
+        if accuracy_analysis['linear_accuracy_rate'] != accuracy_analysis['nonlinear_accuracy_rate']:
+            accuracy_analysis['more_accurate_format'] = 'linear' if accuracy_analysis['linear_accuracy_rate'] > accuracy_analysis['nonlinear_accuracy_rate'] else 'nonlinear'
+
+        # 3. 穩定率分析
+        consistency_analysis = self.analyze_consistency_by_problem(linear_data, nonlinear_data)
+
+        # 失敗的測試不計入上述指標，單獨記錄樣本數與失敗類型
+        sample_sizes = {}
+        for format_type in ['linear', 'nonlinear']:
+            failed = [r for r in results[format_type] if not r['success']]
+            failure_classes = {}
+            for r in failed:
+                error_class = r.get('error_class', 'unknown')
+                failure_classes[error_class] = failure_classes.get(error_class, 0) + 1
+            sample_sizes[format_type] = {
+                'total_trials': len(results[format_type]),
+                'successful_trials': len(results[format_type]) - len(failed),
+                'failure_classes': failure_classes,
+                'total_attempts': sum(r.get('attempts', 1) for r in results[format_type]),
+                'cache_hits': sum(1 for r in results[format_type] if r.get('cache_hit'))
+            }
+
+        analysis = {
+            'timing_analysis': timing_analysis,
+            'sample_sizes': sample_sizes,
+            'accuracy_analysis': accuracy_analysis,
+            'accuracy_curves': accuracy_curves(arrays),
+            'consistency_analysis': consistency_analysis,
+            'overall_summary': {
+                'faster_format': timing_analysis['faster_format'],
+                'more_accurate_format': accuracy_analysis['more_accurate_format'],
+                'more_consistent_format': consistency_analysis['more_consistent_format'],
+                'time_improvement_percent': timing_analysis['time_improvement'],
+                'accuracy_improvement': accuracy_analysis['nonlinear_accuracy_rate'] - accuracy_analysis['linear_accuracy_rate']
+            }
+        }
+
+        # 串流測試：首個token時間與生成時間分開比較
+        ttft_analysis = self.analyze_ttft(linear_data, nonlinear_data)
+        if ttft_analysis:
+            analysis['ttft_analysis'] = ttft_analysis
+            analysis['overall_summary']['faster_first_token_format'] = ttft_analysis['faster_first_token_format']
+        return analysis
+
+    def analyze_ttft(self, linear_data: List, nonlinear_data: List) -> Optional[Dict]:
+        """比較兩種格式的首個token時間（TTFT）與生成時間；無串流數據時回傳 None"""
+        linear_ttft = RunningStats.of(r['time_to_first_token'] for r in linear_data if 'time_to_first_token' in r)
+        nonlinear_ttft = RunningStats.of(r['time_to_first_token'] for r in nonlinear_data if 'time_to_first_token' in r)
+        if not linear_ttft.count or not nonlinear_ttft.count:
+            return None
+
+        linear_generation = [r['generation_time'] for r in linear_data if 'generation_time' in r]
+        nonlinear_generation = [r['generation_time'] for r in nonlinear_data if 'generation_time' in r]
+        linear_intervals = [i for r in linear_data for i in r.get('inter_token_intervals', [])]
+        nonlinear_intervals = [i for r in nonlinear_data for i in r.get('inter_token_intervals', [])]
+
+        ttft_analysis = {
+            'linear_avg_ttft': linear_ttft.mean,
+            'nonlinear_avg_ttft': nonlinear_ttft.mean,
+            'linear_ttft_std': linear_ttft.stdev,
+            'nonlinear_ttft_std': nonlinear_ttft.stdev,
+            'linear_avg_generation_time': statistics.mean(linear_generation),
+            'nonlinear_avg_generation_time': statistics.mean(nonlinear_generation),
+            'linear_avg_inter_token_interval': statistics.mean(linear_intervals) if linear_intervals else 0,
+            'nonlinear_avg_inter_token_interval': statistics.mean(nonlinear_intervals) if nonlinear_intervals else 0,
+            'streamed_trials': linear_ttft.count + nonlinear_ttft.count,
+            'linear_early_stopped': sum(1 for r in linear_data if r.get('early_stopped')),
+            'nonlinear_early_stopped': sum(1 for r in nonlinear_data if r.get('early_stopped')),
+            'ttft_improvement': 0,
+            'faster_first_token_format': 'tie'
+        }
+
+        if ttft_analysis['linear_avg_ttft'] > 0:
+            ttft_diff = ttft_analysis['linear_avg_ttft'] - ttft_analysis['nonlinear_avg_ttft']
+            ttft_analysis['ttft_improvement'] = (ttft_diff / ttft_analysis['linear_avg_ttft']) * 100
+            ttft_analysis['faster_first_token_format'] = 'nonlinear' if ttft_diff > 0 else 'linear'
+        return ttft_analysis
+
+    @staticmethod
+    def answer_type_consistency(problem_results: List[Dict]) -> float:
+        """符號題的一致性：答案類型是否一致"""
+        answer_types = [r['extracted_answer'].get('type', 'failed') for r in problem_results]
+        return 1.0 if len(set(answer_types)) == 1 else 0.5
+
+    def analyze_consistency_by_problem(self, linear_data: List, nonlinear_data: List) -> Dict:
+        """分析按問題分組的一致性（所有 (格式, 問題) 的擷取答案以 NumPy 分組一次計算）"""
+        answers = {}
+        by_problem = {}
+        for result in linear_data + nonlinear_data:
+            key = (result['format_type'], result['problem_id'])
+            value, text = answer_fields(result)
+            values, texts = answers.setdefault(key, ([], []))
+            values.append(value)
+            texts.append(text)
+            by_problem.setdefault(key, []).append(result)
+        table = consistency_table(answers)
+
+        averages = {}
+        for format_type in ('linear', 'nonlinear'):
+            consistencies, exact_matches, entropies = [], [], []
+            for key in sorted(key for key in by_problem if key[0] == format_type):
+                measures = table[key]
+                level = by_problem[key][0].get('difficulty_level')
+                if level and self.profiles[level]['consistency'] == 'answer_type':
+                    consistencies.append(self.answer_type_consistency(by_problem[key]))
+                elif measures['stability'] is not None:
+                    consistencies.append(measures['stability'])
+                if measures['answers'] >= 2:
+                    exact_matches.append(measures['exact_match'])
+                    entropies.append(measures['entropy'])
+            averages[format_type] = {
+                'consistency': statistics.mean(consistencies) if consistencies else 0,
+                'exact_match': statistics.mean(exact_matches) if exact_matches else 0,
+                'entropy': statistics.mean(entropies) if entropies else 0
+            }
+
+        linear_avg_consistency = averages['linear']['consistency']
+        nonlinear_avg_consistency = averages['nonlinear']['consistency']
+
+        return {
+            'linear_consistency_rate': linear_avg_consistency,
+            'nonlinear_consistency_rate': nonlinear_avg_consistency,
+            'linear_exact_match_rate': averages['linear']['exact_match'],
+            'nonlinear_exact_match_rate': averages['nonlinear']['exact_match'],
+            'linear_answer_entropy': averages['linear']['entropy'],
+            'nonlinear_answer_entropy': averages['nonlinear']['entropy'],
+            'more_consistent_format': 'linear' if linear_avg_consistency > nonlinear_avg_consistency else 'nonlinear' if nonlinear_avg_consistency > linear_avg_consistency else 'tie'
+        }
+
+    def save_results(self, results: Dict, analysis: Dict):
+        """保存experiment結果與三項指標摘要"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        results_file = f'{self.result_prefix}_results_{timestamp}.jsonl'
+        summary_file = f'{self.result_prefix}_analysis_{timestamp}.txt'
+
+        levels = results['experiment_info']['difficulty_levels']
+        if len(levels) == 1:
+            profile = self.profiles[levels[0]]
+            title = f"Problem {profile['problem_range'].replace('-', '~')} {profile['display_name']}"
+            notes = profile['report_notes']
+        else:
+            title = "Problem " + ', '.join(self.profiles[level]['problem_range'] for level in levels)
+            notes = [f"✅ {self.profiles[level]['display_name']} (Problem {self.profiles[level]['problem_range']})" for level in levels]
+
+        # 保存完整結果（每行一筆試驗，最後一行為分析），並登錄到實驗目錄
+        write_results(results_file, results, analysis)
+        get_experiment_catalog(index=False).index_file(results_file)
+
+        # 創建摘要報告
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(f"=== {title}三項指標分析 ===\n\n")
+
+            timing = analysis['timing_analysis']
+            accuracy = analysis['accuracy_analysis']
+            consistency = analysis['consistency_analysis']
+            summary = analysis['overall_summary']
+
+            f.write(f"🎯 {title} experiment:\n")
+            for note in notes:
+                f.write(f"{note}\n")
+            f.write("\n")
+
+            f.write("1️⃣ 校正思考時間分析：\n")
+            for format_type, label in [('linear', '線性'), ('nonlinear', '非線性')]:
+                ci = timing.get(f'{format_type}_time_ci')
+                ci_text = f" (95% CI {ci[0]:.3f}~{ci[1]:.3f})" if ci else ""
+                f.write(f"   {label}格式平均思考時間: {timing[f'{format_type}_avg_time']:.3f}秒{ci_text}\n")
+            f.write(f"   速度優勝者: {timing['faster_format']}\n")
+            f.write(f"   效率提升: {timing['time_improvement']:.1f}%\n\n")
+
+            f.write("2️⃣ 錯誤率分析：\n")
+            f.write(f"   線性格式準確率: {accuracy['linear_accuracy_rate']:.1%}\n")
+            f.write(f"   非線性格式準確率: {accuracy['nonlinear_accuracy_rate']:.1%}\n")
+            f.write(f"   線性格式錯誤率: {accuracy['linear_error_rate']:.1%}\n")
+            f.write(f"   非線性格式錯誤率: {accuracy['nonlinear_error_rate']:.1%}\n")
+            f.write(f"   準確度優勝者: {accuracy['more_accurate_format']}\n\n")
+
+            if analysis.get('accuracy_curves'):
+                f.write("📐 準確率對容忍度曲線：\n")
+                for level, by_format in analysis['accuracy_curves'].items():
+                    for format_type, curve in by_format.items():
+                        points = ', '.join(f"≤{t:.0%}: {curve_at(curve, t):.1%}" for t in REPORT_TOLERANCES)
+                        f.write(f"   {level} {format_type}: {points}\n")
+                f.write("\n")
+
+            f.write("3️⃣ 答題穩定率分析：\n")
+            f.write(f"   線性格式穩定率: {consistency['linear_consistency_rate']:.1%}\n")
+            f.write(f"   非線性格式穩定率: {consistency['nonlinear_consistency_rate']:.1%}\n")
+            f.write(f"   完全一致率: 線性 {consistency['linear_exact_match_rate']:.1%} / 非線性 {consistency['nonlinear_exact_match_rate']:.1%}\n")
+            f.write(f"   相異答案熵: 線性 {consistency['linear_answer_entropy']:.2f} / 非線性 {consistency['nonlinear_answer_entropy']:.2f} bits\n")
+            f.write(f"   穩定性優勝者: {consistency['more_consistent_format']}\n\n")
+
+            span_summary = summarize_spans(results['linear'] + results['nonlinear'])
+            if span_summary:
+                f.write("⏲️ 計時區段（各階段總耗時）：\n")
+                for name, entry in sorted(span_summary.items(), key=lambda item: -item[1]['total_time']):
+                    f.write(f"   {name}: {entry['total_time']:.3f}秒 ({entry['count']}次, 平均{entry['mean_time'] * 1000:.2f}毫秒)\n")
+                f.write("\n")
+
+            if 'ttft_analysis' in analysis:
+                ttft = analysis['ttft_analysis']
+                f.write("⏱️ 首個token時間（TTFT）分析：\n")
+                f.write(f"   線性格式平均TTFT: {ttft['linear_avg_ttft']:.3f}秒\n")
+                f.write(f"   非線性格式平均TTFT: {ttft['nonlinear_avg_ttft']:.3f}秒\n")
+                f.write(f"   線性格式平均生成時間: {ttft['linear_avg_generation_time']:.3f}秒\n")
+                f.write(f"   非線性格式平均生成時間: {ttft['nonlinear_avg_generation_time']:.3f}秒\n")
+                f.write(f"   TTFT優勝者: {ttft['faster_first_token_format']} (提升{ttft['ttft_improvement']:.1f}%)\n\n")
+
+            sampling = results['experiment_info'].get('adaptive_sampling')
+            if sampling:
+                states = {}
+                for decision in sampling['decisions'].values():
+                    states[decision['state']] = states.get(decision['state'], 0) + 1
+                f.write("🎲 適應性抽樣：\n")
+                f.write(f"   總執行次數: {sampling['total_runs']} (每題上限 {sampling['max_runs']})\n")
+                f.write(f"   結論分布: {', '.join(f'{state} {count}' for state, count in sorted(states.items()))}\n")
+                for problem_id, decision in sampling['decisions'].items():
+                    p_faster = decision['p_nonlinear_faster']
+                    f.write(f"   Problem {problem_id}: {decision['runs']}次, {decision['state']}"
+                            + (f", P(非線性較快)={p_faster:.2f}" if p_faster is not None else "") + "\n")
+                f.write("\n")
+
+            f.write("🏆 綜合結果：\n")
+            f.write(f"   速度優勝者: {summary['faster_format']}\n")
+            f.write(f"   準確度優勝者: {summary['more_accurate_format']}\n")
+            f.write(f"   穩定性優勝者: {summary['more_consistent_format']}\n")
+            f.write(f"   時間效率提升: {summary['time_improvement_percent']:.1f}%\n")
+            f.write(f"   準確度提升: {summary['accuracy_improvement']:.1%}\n")
+
+        print(f"✅ 結果已保存：{results_file}")
+        print(f"✅ 分析報告：{summary_file}")
+
+
+def main():
+    """主執行函數"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Unified physics language experiment (problems 1-30)")
+    parser.add_argument('--problems', default='1-30', help="problem selection, e.g. '1-10,15,21-30'")
+    parser.add_argument('--concurrency', type=int, default=8, help="requests kept in flight")
+    parser.add_argument('--resume', metavar='JOURNAL', help="resume from a trial journal, running only missing trials")
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, help="response cache: bypass (default, for timing), use to re-score from cached responses, or refresh")
+    parser.add_argument('--backend', choices=BACKEND_NAMES, help="openai (default) or mock for offline runs")
+    parser.add_argument('--stream', action='store_true', help="stream responses and record time-to-first-token")
+    parser.add_argument('--early-stop', action='store_true', help="stream and stop once a confident answer with unit has arrived")
+    parser.add_argument('--adaptive', action='store_true', help="keep sampling problems whose linear/non-linear difference is still uncertain")
+    parser.add_argument('--max-runs', type=int, default=10, help="with --adaptive: run limit per problem and format")
+    parser.add_argument('--progress-every', type=int, default=10, help="print running per-format statistics every N trials (0: off)")
+    parser.add_argument('--trace', metavar='PATH', help="export per-trial timing spans as a Chrome trace (chrome://tracing, Perfetto)")
+    parser.add_argument('--baseline-interval', type=float, default=15.0, help="seconds between baseline probes interleaved with trials")
+    parser.add_argument('--baseline-window', type=float, default=120.0, help="seconds of probes around each trial used for its baseline")
+    parser.add_argument('--baseline-estimator', choices=BASELINE_ESTIMATORS, default='median')
+    parser.add_argument('--baseline-samples', type=int, default=5, help="probes taken to establish the initial baseline")
+    parser.add_argument('--concurrent-baseline', action='store_true', help="fire the initial probes concurrently with MAD outlier rejection and a bootstrap CI")
+    args = parser.parse_args()
+
+    backend = get_backend(args.backend)
+    response_cache = get_response_cache(args.cache_mode, backend=backend.name)
+    rate_limiter = get_shared_rate_limiter()
+    baseline_service = BaselineService(backend, rate_limiter, model=MODEL_NAME, window_seconds=args.baseline_window,
+                                       estimator=args.baseline_estimator, probe_interval=args.baseline_interval)
+    engine = ExperimentEngine(rate_limiter=rate_limiter, response_cache=response_cache, backend=backend,
+                              stream=args.stream, early_stop=args.early_stop, baseline_service=baseline_service,
+                              adaptive=AdaptiveSampler(max_runs=args.max_runs) if args.adaptive else None)
+
+    # Establish baseline
+    if engine.establish_baseline(args.baseline_samples, concurrent=args.concurrent_baseline) == 0:
+        print("❌ 無法Establish baseline，終止experiment")
+        return
+
+    results = engine.run(parse_problem_ids(args.problems), max_concurrency=args.concurrency,
+                         journal_path=args.resume, resume=bool(args.resume), progress_every=args.progress_every)
+    analysis = engine.analyze_three_metrics(results)
+    engine.save_results(results, analysis)
+    if args.trace:
+        export_trace(results, args.trace)
+
+    summary = analysis['overall_summary']
+    print(f"\n⚡ 速度: {summary['faster_format']} 優勝 (提升{summary['time_improvement_percent']:.1f}%)")
+    print(f"🎯 準確度: {summary['more_accurate_format']} 優勝")
+    print(f"📈 穩定性: {summary['more_consistent_format']} 優勝")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+實驗題目資料：三個難度級別的結構化題目
+Experiment Problems: structured linear / nonlinear definitions for problems 1-30
+"""
+
+from typing import Dict, List, Optional
+
+# ==================== SIMPLE LEVEL PROBLEMS (1-10) ====================
+
+SIMPLE_PROBLEMS = [
+    {
+        'id': 1,
+        'linear_text': 'Jessica drives her car from home to school, covering a distance of 120 km. The trip takes exactly 2 hours due to morning traffic. Calculate Jessica\'s average speed during this journey.',
+        'given': 'Distance = 120 km, Time = 2 hours',
+        'formula': 'v = d/t',
+        'target': 'average speed',
+        'expected_value': 60.0,
+        'expected_unit': 'km/h'
+    },
+    {
+        'id': 2,
+        'linear_text': 'During a physics demonstration, Mr. Chen drops a tennis ball from the school roof. The ball falls freely for 3.0 seconds before hitting the ground. Calculate the height of the school building. (Take g = 9.8 m/s²)',
+        'given': 'Time = 3.0 s, g = 9.8 m/s²',
+        'formula': 'h = ½gt²',
+        'target': 'height',
+        'expected_value': 44.1,
+        'expected_unit': 'm'
+    },
+    {
+        'id': 3,
+        'linear_text': 'A delivery truck with mass 1500 kg needs to accelerate at 5.0 m/s² to merge safely into highway traffic. What net force must the engine provide to achieve this acceleration?',
+        'given': 'Mass = 1500 kg, Acceleration = 5.0 m/s²',
+        'formula': 'F = ma',
+        'target': 'net force',
+        'expected_value': 7500.0,
+        'expected_unit': 'N'
+    },
+    {
+        'id': 4,
+        'linear_text': 'In the school laboratory, Sarah compresses a spring with spring constant k = 200 N/m by a distance of 0.10 m using a force meter. Calculate the elastic potential energy stored in the compressed spring.',
+        'given': 'k = 200 N/m, x = 0.10 m',
+        'formula': 'PE = ½kx²',
+        'target': 'elastic potential energy',
+        'expected_value': 1.0,
+        'expected_unit': 'J'
+    },
+    {
+        'id': 5,
+        'linear_text': 'A chemistry student needs to heat 2.0 kg of water from 20°C to 30°C for an experiment. How much thermal energy must be supplied to the water? (Specific heat capacity of water = 4200 J/kg·°C)',
+        'given': 'm = 2.0 kg, ΔT = 10°C, c = 4200 J/kg·°C',
+        'formula': 'Q = mcΔT',
+        'target': 'thermal energy',
+        'expected_value': 84000.0,
+        'expected_unit': 'J'
+    },
+    {
+        'id': 6,
+        'linear_text': 'A hockey puck with mass 0.16 kg slides across the ice with a constant velocity of 8.0 m/s. Calculate the kinetic energy of the moving puck.',
+        'given': 'm = 0.16 kg, v = 8.0 m/s',
+        'formula': 'KE = ½mv²',
+        'target': 'kinetic energy',
+        'expected_value': 5.12,
+        'expected_unit': 'J'
+    },
+    {
+        'id': 7,
+        'linear_text': 'A cyclist starts from rest and accelerates uniformly, reaching a speed of 20 m/s after 4.0 seconds. Calculate the cyclist\'s acceleration during this period.',
+        'given': 'v₀ = 0 m/s, v = 20 m/s, t = 4.0 s',
+        'formula': 'a = (v - v₀)/t',
+        'target': 'acceleration',
+        'expected_value': 5.0,
+        'expected_unit': 'm/s²'
+    },
+    {
+        'id': 8,
+        'linear_text': 'A sealed balloon contains gas at 27°C (300 K) with a volume of 2.0 L. The balloon is heated at constant pressure until the temperature reaches 177°C (450 K). Find the new volume of the gas in the balloon.',
+        'given': 'T₁ = 300 K, V₁ = 2.0 L, T₂ = 450 K',
+        'formula': 'V₁/T₁ = V₂/T₂ (Charles\'s Law)',
+        'target': 'new volume',
+        'expected_value': 3.0,
+        'expected_unit': 'L'
+    },
+    {
+        'id': 9,
+        'linear_text': 'An astronaut\'s equipment has a mass of 15 kg on Earth. Calculate the weight (gravitational force) acting on this equipment at Earth\'s surface. (g = 9.8 m/s²)',
+        'given': 'm = 15 kg, g = 9.8 m/s²',
+        'formula': 'W = mg',
+        'target': 'weight',
+        'expected_value': 147.0,
+        'expected_unit': 'N'
+    },
+    {
+        'id': 10,
+        'linear_text': 'A soccer ball is kicked horizontally from a cliff with an initial speed of 25 m/s. The cliff is 20 m high above the beach below. How long will the ball remain in the air before hitting the sand?',
+        'given': 'v₀ = 25 m/s, h = 20 m, g = 9.8 m/s²',
+        'formula': 'h = ½gt²',
+        'target': 'time of flight',
+        'expected_value': 2.02,
+        'expected_unit': 's'
+    }
+]
+
+# ==================== MEDIUM LEVEL PROBLEMS (11-20) ====================
+
+MEDIUM_PROBLEMS = [
+    {
+        'id': 11,
+        'linear_text': 'Emma is driving her 1500 kg car at 25 m/s when she suddenly sees a red light ahead. She applies the brakes and comes to a complete stop after traveling 50 m. Calculate the average braking force exerted by the car\'s brake system.',
+        'given': 'm = 1500 kg, v₀ = 25 m/s, v = 0 m/s, s = 50 m',
+        'formula': 'v² = v₀² + 2as, F = ma',
+        'target': 'average braking force',
+        'expected_value': 9375,
+        'expected_unit': 'N'
+    },
+    {
+        'id': 12,
+        'linear_text': 'A wooden crate slides down a loading ramp inclined at 30° to the horizontal. The coefficient of kinetic friction between the crate and the ramp is μ = 0.20. Calculate the acceleration of the crate as it slides down the ramp.',
+        'given': 'θ = 30°, μ = 0.20, g = 9.8 m/s²',
+        'formula': 'a = g(sin θ - μ cos θ)',
+        'target': 'acceleration down ramp',
+        'expected_value': 3.2,
+        'expected_unit': 'm/s²'
+    },
+    {
+        'id': 13,
+        'linear_text': 'In a physics lab experiment, two gliders collide on an air track. Glider A (mass = 3.0 kg) moves at 8.0 m/s toward stationary glider B (mass = 7.0 kg). After the perfectly elastic collision, find the final velocity of glider A.',
+        'given': 'm₁ = 3.0 kg, m₂ = 7.0 kg, u₁ = 8.0 m/s, u₂ = 0 m/s',
+        'formula': 'v₁ = ((m₁-m₂)/(m₁+m₂))u₁',
+        'target': 'final velocity of glider A',
+        'expected_value': -2.4,
+        'expected_unit': 'm/s'
+    },
+    {
+        'id': 14,
+        'linear_text': 'During a field trip to study gravity variations, students measure a simple pendulum with length 2.0 m. They find that it completes one full oscillation in 2.8 seconds. Calculate the local acceleration due to gravity at this location.',
+        'given': 'L = 2.0 m, T = 2.8 s',
+        'formula': 'g = 4π²L/T²',
+        'target': 'local gravity acceleration',
+        'expected_value': 10.1,
+        'expected_unit': 'm/s²'
+    },
+    {
+        'id': 15,
+        'linear_text': 'A research laboratory studies gas behavior using a sealed cylinder containing an ideal gas. At 27°C (300 K), the gas occupies 1.0 L at 5.0 atm pressure. The gas is allowed to expand isothermally until its volume becomes 3.0 L. What is the final pressure of the gas?',
+        'given': 'T = 300 K, P₁ = 5.0 atm, V₁ = 1.0 L, V₂ = 3.0 L',
+        'formula': 'P₁V₁ = P₂V₂',
+        'target': 'final pressure',
+        'expected_value': 1.67,
+        'expected_unit': 'atm'
+    },
+    {
+        'id': 16,
+        'linear_text': 'A 2.0 kg mass is attached to a horizontal spring with spring constant k = 800 N/m. The mass oscillates in simple harmonic motion with an amplitude of 5.0 cm. Calculate the maximum speed of the oscillating mass.',
+        'given': 'm = 2.0 kg, k = 800 N/m, A = 0.050 m',
+        'formula': 'v_max = ωA = A√(k/m)',
+        'target': 'maximum speed',
+        'expected_value': 1.0,
+        'expected_unit': 'm/s'
+    },
+    {
+        'id': 17,
+        'linear_text': 'An engineering student designs a theoretical heat engine that operates between a hot reservoir at 327°C (600 K) and a cold reservoir at 27°C (300 K). Calculate the maximum possible efficiency of this heat engine according to thermodynamic principles.',
+        'given': 'T_hot = 600 K, T_cold = 300 K',
+        'formula': 'η = 1 - T_cold/T_hot',
+        'target': 'maximum efficiency',
+        'expected_value': 0.5,
+        'expected_unit': '%'
+    },
+    {
+        'id': 18,
+        'linear_text': 'The International Space Station orbits Earth at an altitude of 400 km above the planet\'s surface. Given that Earth\'s radius is 6400 km and surface gravity is 9.8 m/s², calculate the orbital speed of the space station.',
+        'given': 'h = 400 km, R = 6400 km, g = 9.8 m/s²',
+        'formula': 'v = √(gR²/r), r = R + h',
+        'target': 'orbital speed',
+        'expected_value': 7670,
+        'expected_unit': 'm/s'
+    },
+    {
+        'id': 19,
+        'linear_text': 'A basketball player throws a 0.50 kg ball vertically upward with an initial speed of 15 m/s from a height of 2.0 m above the ground. Calculate the maximum height above the ground that the ball reaches.',
+        'given': 'm = 0.50 kg, v₀ = 15 m/s, h₀ = 2.0 m, g = 9.8 m/s²',
+        'formula': 'h_max = h₀ + v₀²/(2g)',
+        'target': 'maximum height above ground',
+        'expected_value': 13.5,
+        'expected_unit': 'm'
+    },
+    {
+        'id': 20,
+        'linear_text': 'In a power plant, steam at 100°C condenses into water at the same temperature in the cooling towers. Calculate the amount of thermal energy released when 1.0 kg of steam undergoes this phase change. (Latent heat of vaporization for water = 2.26 × 10⁶ J/kg)',
+        'given': 'm = 1.0 kg, L_v = 2.26 × 10⁶ J/kg',
+        'formula': 'Q = mL_v',
+        'target': 'thermal energy released',
+        'expected_value': 2260000,
+        'expected_unit': 'J'
+    }
+]
+
+# ==================== CHALLENGING LEVEL PROBLEMS (21-30) ====================
+
+CHALLENGING_PROBLEMS = [
+    {
+        'id': 21,
+        'linear_text': 'An advanced robotics project involves a rotating system where a uniform metal rod of length L and mass M rotates about one end. An additional component (point mass m) is attached at distance d from the rotation axis. When the entire system rotates with angular velocity ω, determine the total rotational kinetic energy of this composite system.',
+        'given': 'L = rod length, M = rod mass, m = point mass, d = distance from axis, ω = angular velocity',
+        'formula': 'KE_total = ½I_rod ω² + ½I_point ω², I_rod = ⅓ML², I_point = md²',
+        'target': 'total rotational kinetic energy',
+        'expected_value': 'symbolic',  # Will need special handling
+        'expected_unit': 'symbolic'
+    },
+    {
+        'id': 22,
+        'linear_text': 'A solid cylindrical wheel rolls without slipping down a frictionless inclined ramp of angle θ. Using energy conservation principles, derive a general expression for the cylinder\'s linear acceleration down the incline in terms of the angle θ and gravitational acceleration g.',
+        'given': 'θ = incline angle, g = 9.8 m/s², rolling without slipping',
+        'formula': 'Energy: mgh = ½mv² + ½Iω², I = ½mr², v = ωr',
+        'target': 'linear acceleration down incline',
+        'expected_value': 'symbolic',
+        'expected_unit': 'symbolic'
+    },
+    {
+        'id': 23,
+        'linear_text': 'A graduate student analyzes an ideal Carnot cycle where the working gas undergoes isothermal expansion at 400 K from 1.0 L to 4.0 L, followed by adiabatic expansion to 300 K. In the subsequent isothermal compression step at 300 K, determine the volume compression ratio (V_initial/V_final for this step).',
+        'given': 'T_hot = 400 K, V₁ = 1.0 L, V₂ = 4.0 L, T_cold = 300 K',
+        'formula': 'Carnot cycle: TV^(γ-1) = const, γ = 1.4',
+        'target': 'volume compression ratio',
+        'expected_value': 3.0,
+        'expected_unit': 'ratio'
+    },
+    {
+        'id': 24,
+        'linear_text': 'An amusement park designs a loop-the-loop track where a solid sphere of radius R rolls down from rest and enters a circular vertical loop of radius 5R. Calculate the minimum height h from which the sphere must be released to just complete the loop (maintain contact at the top).',
+        'given': 'sphere radius = R, loop radius = 5R, solid sphere I = (2/5)mr²',
+        'formula': 'Energy: mgh = mg(10R) + ½mv² + ½Iω², v = ωr',
+        'target': 'minimum release height',
+        'expected_value': 2.7,  # in units of R
+        'expected_unit': 'R'
+    },
+    {
+        'id': 25,
+        'linear_text': 'In an advanced physics laboratory, two identical pendulums of length L and mass m are weakly coupled by a horizontal spring of spring constant k attached at distance d below their pivot points. For small oscillations, find the two normal mode frequencies of this coupled oscillator system.',
+        'given': 'L = pendulum length, m = mass, k = spring constant, d = spring position',
+        'formula': 'Normal modes: ω₁ = √(g/L), ω₂ = √(g/L + 2kd²/mL²)',
+        'target': 'normal mode frequencies',
+        'expected_value': 'symbolic',
+        'expected_unit': 'symbolic'
+    },
+    {
+        'id': 26,
+        'linear_text': 'A thermodynamics researcher studies a gas that undergoes a polytropic process described by PV^n = constant, where n = 1.3. The gas expands from an initial state of 2.0 L at 5.0 atm to a final volume of 6.0 L. Calculate the work done by the gas during this expansion process.',
+        'given': 'n = 1.3, P₁ = 5.0 atm, V₁ = 2.0 L, V₂ = 6.0 L',
+        'formula': 'W = (P₁V₁ - P₂V₂)/(n-1), P₁V₁ⁿ = P₂V₂ⁿ',
+        'target': 'work done by gas',
+        'expected_value': 1215,
+        'expected_unit': 'J'
+    },
+    {
+        'id': 27,
+        'linear_text': 'A space agency designs a rocket that burns fuel at a constant rate dm/dt = -α (where α is positive) and ejects the burned fuel at speed v_e relative to the rocket. Derive an expression for the rocket\'s acceleration when its instantaneous mass is M, considering both thrust and gravitational effects.',
+        'given': 'dm/dt = -α, v_e = exhaust velocity, M = instantaneous mass, g = 9.8 m/s²',
+        'formula': 'F_thrust = αv_e, F_gravity = Mg, F_net = Ma',
+        'target': 'rocket acceleration',
+        'expected_value': 'symbolic',
+        'expected_unit': 'symbolic'
+    },
+    {
+        'id': 28,
+        'linear_text': 'A theoretical physics problem involves a small bead constrained to slide without friction on a wire bent into the parabolic shape y = x²/(4a), where a is a positive constant. Under the influence of gravity, derive the equation of motion for small oscillations of the bead about the lowest point of the wire.',
+        'given': 'y = x²/(4a), a = positive constant, gravity g',
+        'formula': 'V(x) = mgy = mgx²/(4a), F = -dV/dx',
+        'target': 'equation of motion',
+        'expected_value': 'symbolic',
+        'expected_unit': 'symbolic'
+    },
+    {
+        'id': 29,
+        'linear_text': 'An advanced thermodynamics course examines a three-step cycle for an ideal monatomic gas: (1→2) isothermal expansion at 300 K from 1.0 L to 3.0 L, (2→3) isobaric cooling to 200 K, (3→1) isochoric heating back to initial state. Calculate the thermal efficiency of this heat engine cycle.',
+        'given': 'T₁ = T₂ = 300 K, T₃ = 200 K, V₁ = 1.0 L, V₂ = 3.0 L, monatomic gas',
+        'formula': 'Q = nCₚΔT (isobaric), Q = nCᵥΔT (isochoric), Q = nRT ln(V₂/V₁) (isothermal)',
+        'target': 'thermal efficiency',
+        'expected_value': 47.9,
+        'expected_unit': '%'
+    },
+    {
+        'id': 30,
+        'linear_text': 'A mechanical engineering project involves a uniform thin rod of length L and mass M that can rotate freely about a horizontal axis passing through one end. The rod is initially held in a horizontal position and then released. Using energy conservation, find the angular velocity of the rod when it reaches the vertical position.',
+        'given': 'L = rod length, M = rod mass, I = ⅓ML²',
+        'formula': 'Energy conservation: PE_initial = KE_final, Mg(L/2) = ½Iω²',
+        'target': 'angular velocity at vertical position',
+        'expected_value': 'symbolic',
+        'expected_unit': 'symbolic'
+    }
+]
+
+PROBLEMS_BY_LEVEL = {
+    'simple': SIMPLE_PROBLEMS,
+    'medium': MEDIUM_PROBLEMS,
+    'challenging': CHALLENGING_PROBLEMS
+}
+
+
+def problem_level(problem_id: int) -> str:
+    """Difficulty level of a problem id"""
+    for level, problems in PROBLEMS_BY_LEVEL.items():
+        if any(problem['id'] == problem_id for problem in problems):
+            return level
+    raise ValueError(f"Unknown problem id: {problem_id}")
+
+
+def load_problems(problem_ids: Optional[List[int]] = None) -> List[Dict]:
+    """Copies of the requested problems (all 30 by default), tagged with their level"""
+    selected = []
+    for level, problems in PROBLEMS_BY_LEVEL.items():
+        for problem in problems:
+            if problem_ids is None or problem['id'] in problem_ids:
+                tagged = problem.copy()
+                tagged['level'] = level
+                selected.append(tagged)
+    return selected
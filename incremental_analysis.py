@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+增量分析：以充分統計量快取每個結果檔，只重算新的試驗
+Incremental Analysis: per-(level, problem, format) sufficient statistics cached by file content hash
+
+Every report metric (mean times, accuracy, TTFT and the
+accuracy-vs-tolerance counts) is derived from sums that can be added
+together, so a report over many files is a merge of small per-file
+summaries.  Each entry also keeps its per-trial samples (run number,
+thinking time, verdict, extracted answer) for answer consistency and the
+paired bootstrap; these are a few values per trial and merge by
+concatenation.  A file whose content is unchanged is never parsed again; a
+JSON Lines file that only grew (a journal, a resumed run) is parsed from
+where the previous pass stopped.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from accuracy_curves import DEFAULT_TOLERANCES, FORMATS, accuracy_grid, trial_arrays
+from answer_consistency import answer_fields, consistency_table
+from experiment_catalog import record_level
+from trial_journal import record_cell
+from trial_store import TrialReader, trial_from_line
+
+CHUNK_SIZE = 1 << 20
+# Bumped whenever the entry layout changes; cached statistics of another version are recomputed
+STATS_VERSION = 3
+SAMPLE_FIELDS = ('run', 'time', 'accurate', 'answer', 'answer_text')
+
+Key = Tuple[str, int, str]   # (level, problem_id, format_type)
+
+
+# ==================== SUFFICIENT STATISTICS ====================
+
+def empty_entry() -> Dict:
+    return {
+        'trials': 0, 'accurate': 0,
+        'time_n': 0, 'time_sum': 0.0, 'time_sumsq': 0.0,
+        'ttft_n': 0, 'ttft_sum': 0.0, 'ttft_sumsq': 0.0,
+        'success': 0, 'success_accurate': 0, 'success_time_sum': 0.0, 'success_ttft_n': 0, 'success_ttft_sum': 0.0,
+        'curve_trials': 0, 'curve_hits': [0] * len(DEFAULT_TOLERANCES),
+        'samples': {field: [] for field in SAMPLE_FIELDS}
+    }
+
+
+def add_records(stats: Dict[Key, Dict], records: List[Dict]) -> Dict[Key, Dict]:
+    """Fold trial records into ``stats`` (in place); tolerance hits are computed for the batch at once"""
+    if not records:
+        return stats
+    records = [dict(record, difficulty_level=record_level(record)) for record in records]
+    curve_records = [record for record in records if record.get('success', True)]
+    arrays = trial_arrays(curve_records)
+    grid = accuracy_grid(arrays['extracted'], arrays['expected'], DEFAULT_TOLERANCES, arrays['unit_match'])
+    grid = np.where(arrays['numeric'][:, None], grid, arrays['accurate'][:, None])
+
+    for record in records:
+        entry = stats.setdefault((record['difficulty_level'], record['problem_id'], record['format_type']), empty_entry())
+        accurate = bool((record.get('accuracy_analysis') or {}).get('accurate'))
+        entry['trials'] += 1
+        entry['accurate'] += accurate
+        if 'thinking_time' in record:
+            _add_moment(entry, 'time', record['thinking_time'])
+        if record.get('time_to_first_token') is not None:
+            _add_moment(entry, 'ttft', record['time_to_first_token'])
+        answer, answer_text = answer_fields(record)
+        samples = entry['samples']
+        samples['run'].append(record_cell(record)[2] if 'run' in record or 'run_number' in record else None)
+        samples['time'].append(record.get('thinking_time'))
+        samples['accurate'].append(accurate)
+        samples['answer'].append(answer)
+        samples['answer_text'].append(answer_text)
+        if record.get('success'):
+            entry['success'] += 1
+            entry['success_accurate'] += accurate
+            entry['success_time_sum'] += record.get('thinking_time') or 0.0
+            if record.get('time_to_first_token') is not None:
+                entry['success_ttft_n'] += 1
+                entry['success_ttft_sum'] += record['time_to_first_token']
+
+    for record, hits in zip(curve_records, grid):
+        entry = stats[(record['difficulty_level'], record['problem_id'], record['format_type'])]
+        entry['curve_trials'] += 1
+        entry['curve_hits'] = [total + int(hit) for total, hit in zip(entry['curve_hits'], hits)]
+    return stats
+
+
+def _add_moment(entry: Dict, name: str, value: float):
+    entry[f'{name}_n'] += 1
+    entry[f'{name}_sum'] += value
+    entry[f'{name}_sumsq'] += value * value
+
+
+def merge_stats(parts: Iterable[Dict[Key, Dict]]) -> Dict[Key, Dict]:
+    """Sum of several statistics maps"""
+    merged = {}
+    for part in parts:
+        for key, entry in part.items():
+            total = merged.setdefault(key, empty_entry())
+            for field, value in entry.items():
+                if isinstance(value, dict):
+                    total[field] = {name: total[field][name] + samples for name, samples in value.items()}
+                elif isinstance(value, list):
+                    total[field] = [a + b for a, b in zip(total[field], value)]
+                else:
+                    total[field] = total[field] + value
+    return merged
+
+
+def stats_from_records(records: Iterable[Dict]) -> Dict[Key, Dict]:
+    return add_records({}, list(records))
+
+
+def format_totals(level_stats: Dict[Tuple[int, str], Dict], format_type: str) -> Dict:
+    """One entry summing every problem of a level for one format"""
+    merged = merge_stats({format_type: entry} for (_, entry_format), entry in level_stats.items() if entry_format == format_type)
+    return merged.get(format_type, empty_entry())
+
+
+def by_level(stats: Dict[Key, Dict]) -> Dict[str, Dict[Tuple[int, str], Dict]]:
+    """{level: {(problem_id, format_type): entry}}"""
+    levels = {}
+    for (level, problem_id, format_type), entry in stats.items():
+        levels.setdefault(level, {})[(problem_id, format_type)] = entry
+    return levels
+
+
+# ==================== METRICS FROM STATISTICS ====================
+
+def mean(entry: Dict, name: str) -> Optional[float]:
+    return entry[f'{name}_sum'] / entry[f'{name}_n'] if entry[f'{name}_n'] else None
+
+
+def stdev(entry: Dict, name: str) -> Optional[float]:
+    """Sample standard deviation from count, sum and sum of squares"""
+    n = entry[f'{name}_n']
+    if n < 2:
+        return None
+    return math.sqrt(max(0.0, (entry[f'{name}_sumsq'] - entry[f'{name}_sum'] ** 2 / n) / (n - 1)))
+
+
+def level_consistency(level_stats: Dict[Tuple[int, str], Dict]) -> Dict[Tuple[int, str], Dict]:
+    """Answer consistency of every (problem_id, format_type) of a level, from the extracted-answer samples in one batch"""
+    return consistency_table({key: (entry['samples']['answer'], entry['samples']['answer_text'])
+                              for key, entry in level_stats.items()})
+
+
+def level_curves(level_stats: Dict[Tuple[int, str], Dict], tolerances=DEFAULT_TOLERANCES) -> Dict:
+    """Accuracy-vs-tolerance curves of one level in the ``accuracy_curves`` layout"""
+    curves = {}
+    for format_type in FORMATS:
+        entries = [entry for (_, entry_format), entry in level_stats.items() if entry_format == format_type]
+        trials = sum(entry['curve_trials'] for entry in entries)
+        if trials:
+            hits = np.sum([entry['curve_hits'] for entry in entries], axis=0)
+            curves[format_type] = {'tolerances': list(tolerances), 'accuracy': (hits / trials).tolist(), 'trials': trials}
+    return curves
+
+
+# ==================== CACHE ====================
+
+class AnalysisCache:
+    """SQLite cache of per-file statistics, keyed by the SHA-256 of the file content
+
+    ``files`` remembers each path's size, mtime and content hash, so an
+    unchanged file costs one stat call.  A changed JSON Lines file whose
+    previously parsed prefix is intact is parsed only past that prefix.
+    """
+
+    def __init__(self, path: str = 'analysis_cache.sqlite'):
+        self.path = path
+        self.parsed_trials = 0
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    content_hash TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS file_stats (
+                    content_hash TEXT PRIMARY KEY,
+                    consumed INTEGER NOT NULL,
+                    prefix_hash TEXT NOT NULL,
+                    stats TEXT NOT NULL,
+                    computed_at REAL NOT NULL
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection, committed and closed on exit"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode(stats: Dict[Key, Dict]) -> str:
+        return json.dumps({'version': STATS_VERSION,
+                           'entries': [[level, problem_id, format_type, entry]
+                                       for (level, problem_id, format_type), entry in stats.items()]})
+
+    @staticmethod
+    def _decode(payload: str) -> Optional[Dict[Key, Dict]]:
+        """Statistics of a cached payload; None when it was written by another STATS_VERSION"""
+        payload = json.loads(payload)
+        if not isinstance(payload, dict) or payload.get('version') != STATS_VERSION:
+            return None
+        return {(level, problem_id, format_type): entry for level, problem_id, format_type, entry in payload['entries']}
+
+    def file_stats(self, path: str) -> Dict[Key, Dict]:
+        """Statistics of one result file, computed only for content not seen before"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._connect() as conn:
+            known = conn.execute("SELECT f.size, f.mtime, s.consumed, s.prefix_hash, s.stats FROM files f "
+                                 "JOIN file_stats s ON s.content_hash = f.content_hash WHERE f.path = ?",
+                                 (path,)).fetchone()
+        known_stats = self._decode(known[4]) if known is not None else None
+        if known_stats is None:
+            known = None
+        elif known[:2] == (stat.st_size, stat.st_mtime):
+            return known_stats
+
+        # One pass: full content hash, plus the hash of the previously parsed prefix
+        previous_consumed = known[2] if known is not None and not path.endswith('.json') else 0
+        hasher = hashlib.sha256()
+        prefix_hasher = None
+        position = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if position <= previous_consumed < position + len(chunk) or (not chunk and position == previous_consumed):
+                    prefix = hasher.copy()
+                    prefix.update(chunk[:previous_consumed - position])
+                    prefix_hasher = prefix
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                position += len(chunk)
+        content_hash = hasher.hexdigest()
+
+        with self._connect() as conn:
+            cached = conn.execute("SELECT consumed, prefix_hash, stats FROM file_stats WHERE content_hash = ?",
+                                  (content_hash,)).fetchone()
+        cached_stats = self._decode(cached[2]) if cached is not None else None
+        if cached_stats is not None:
+            stats, consumed, prefix_hash = cached_stats, cached[0], cached[1]
+        elif path.endswith('.json'):
+            records = list(TrialReader(path))
+            self.parsed_trials += len(records)
+            stats, consumed, prefix_hash = stats_from_records(records), stat.st_size, content_hash
+        else:
+            if known is not None and prefix_hasher is not None and prefix_hasher.hexdigest() == known[3]:
+                stats, start = known_stats, previous_consumed
+            else:
+                stats, start, prefix_hasher = {}, 0, hashlib.sha256()
+            records, consumed = self._read_lines(path, start, prefix_hasher)
+            self.parsed_trials += len(records)
+            add_records(stats, records)
+            prefix_hash = prefix_hasher.hexdigest()
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO file_stats (content_hash, consumed, prefix_hash, stats, computed_at) "
+                         "VALUES (?, ?, ?, ?, ?)", (content_hash, consumed, prefix_hash, self._encode(stats), time.time()))
+            conn.execute("INSERT OR REPLACE INTO files (path, size, mtime, content_hash) VALUES (?, ?, ?, ?)",
+                         (path, stat.st_size, stat.st_mtime, content_hash))
+        return stats
+
+    @staticmethod
+    def _read_lines(path: str, start: int, prefix_hasher) -> Tuple[List[Dict], int]:
+        """Trial records of the complete lines after byte ``start``; a partial last line is left for later"""
+        records = []
+        consumed = start
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                consumed += len(raw)
+                prefix_hasher.update(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    record = trial_from_line(json.loads(line), path)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping unreadable line in {path}")
+                    continue
+                if record is not None:
+                    records.append(record)
+        return records, consumed
+
+    def level_stats(self, files: Dict[str, Optional[str]]) -> Dict[str, Optional[Dict[Tuple[int, str], Dict]]]:
+        """{level: {(problem_id, format_type): entry}} for a {level: path} selection (None where no file)"""
+        per_file = {}
+        for path in set(path for path in files.values() if path):
+            per_file[path] = by_level(self.file_stats(path))
+        return {level: (per_file[path].get(level) if path else None) for level, path in files.items()}
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Cache at ANALYSIS_CACHE_PATH (default analysis_cache.sqlite)"""
+    return AnalysisCache(os.getenv('ANALYSIS_CACHE_PATH', 'analysis_cache.sqlite'))
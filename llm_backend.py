@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+模型後端介面：OpenAI 與本地模擬後端
+LLM Backends: pluggable ChatCompletion backends (OpenAI, or a local mock for offline load testing)
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+import openai
+from openai.openai_object import OpenAIObject
+
+from experiment_problems import load_problems
+from physics_problems_collection import challenging_problems, medium_problems, simple_problems
+from timing_spans import http_trace_config, record_span
+
+BACKEND_NAMES = ('openai', 'mock')
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StreamTimer:
+    """Collects streamed chunks with their arrival times (perf_counter_ns)"""
+
+    def __init__(self, start_ns: int):
+        self.start_ns = start_ns
+        self.arrivals = []
+        self.pieces = []
+        self.finish_reason = None
+        self.early_stopped = False
+
+    def add(self, chunk):
+        choice = chunk['choices'][0]
+        content = choice.get('delta', {}).get('content')
+        if content:
+            self.arrivals.append(time.perf_counter_ns())
+            self.pieces.append(content)
+        if choice.get('finish_reason'):
+            self.finish_reason = choice['finish_reason']
+
+    def text(self) -> str:
+        return ''.join(self.pieces)
+
+    def stop_early(self):
+        """Mark the stream as cancelled by the caller once the answer was found"""
+        self.early_stopped = True
+        self.finish_reason = 'early_stop'
+
+    def finish(self, request: Dict) -> OpenAIObject:
+        """Single ChatCompletion-shaped response with a ``stream_timing`` entry
+
+        Streamed responses carry no usage block, so token usage is estimated.
+        Time-to-first-token and generation are also recorded as timing spans.
+        """
+        end_ns = time.perf_counter_ns()
+        content = self.text()
+        arrivals = [(arrival - self.start_ns) / 1e9 for arrival in self.arrivals]
+        total_time = (end_ns - self.start_ns) / 1e9
+        if self.arrivals:
+            record_span('time_to_first_token', self.start_ns, self.arrivals[0])
+            record_span('generation', self.arrivals[0], self.arrivals[-1], chunks=len(self.arrivals))
+        prompt_tokens = sum(estimate_tokens(message.get('content', '')) for message in request.get('messages', []))
+        completion_tokens = estimate_tokens(content)
+        return OpenAIObject.construct_from({
+            'object': 'chat.completion',
+            'model': request.get('model'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': self.finish_reason
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            },
+            'stream_timing': {
+                'time_to_first_token': arrivals[0] if arrivals else total_time,
+                'generation_time': arrivals[-1] - arrivals[0] if arrivals else 0.0,
+                'total_time': total_time,
+                'inter_token_intervals': [later - earlier for earlier, later in zip(arrivals, arrivals[1:])],
+                'chunks': len(arrivals),
+                'early_stopped': self.early_stopped,
+                'usage_estimated': True
+            }
+        })
+
+
+class ChatBackend:
+    """ChatCompletion backend interface
+
+    ``create`` / ``acreate`` take the same keyword arguments as
+    ``openai.ChatCompletion.create`` and return an object exposing
+    ``choices[0].message.content`` and ``usage.total_tokens``; failures
+    are raised as ``openai.error`` exceptions so retry classification and
+    rate limiting behave the same for every backend.  The ``*_streamed``
+    variants request ``stream=True`` and collect the chunks into one
+    response whose ``stream_timing`` holds time-to-first-token and
+    inter-token intervals.  When ``stop_when(text)`` returns True the
+    stream is closed early and the response is truncated at that point.
+    ``session()`` wraps a whole dispatch so a backend can share (and
+    trace) its connections across requests; its ``on_headers`` callback,
+    when given, receives the headers of every successful response.
+    """
+
+    name = 'base'
+    api_base: Optional[str] = None
+
+    def create(self, **request):
+        raise NotImplementedError
+
+    async def acreate(self, **request):
+        raise NotImplementedError
+
+    @contextlib.asynccontextmanager
+    async def session(self, on_headers: Optional[Callable[[Dict], None]] = None):
+        yield
+
+    def create_streamed(self, stop_when: Optional[Callable[[str], bool]] = None, **request):
+        timer = StreamTimer(time.perf_counter_ns())
+        stream = self.create(stream=True, **request)
+        for chunk in stream:
+            timer.add(chunk)
+            if stop_when and stop_when(timer.text()):
+                timer.stop_early()
+                stream.close()
+                break
+        return timer.finish(request)
+
+    async def acreate_streamed(self, stop_when: Optional[Callable[[str], bool]] = None, **request):
+        timer = StreamTimer(time.perf_counter_ns())
+        stream = await self.acreate(stream=True, **request)
+        async for chunk in stream:
+            timer.add(chunk)
+            if stop_when and stop_when(timer.text()):
+                timer.stop_early()
+                await stream.aclose()
+                break
+        return timer.finish(request)
+
+
+def response_headers_trace_config(on_headers: Callable[[Dict], None]) -> aiohttp.TraceConfig:
+    """aiohttp hook passing the headers of every successful response to ``on_headers``
+
+    Rate-limited responses are left out: their headers reach the limiter
+    through the raised ``RateLimitError``.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_end(session, context, params):
+        if params.response.status < 400:
+            on_headers(dict(params.response.headers))
+
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+class OpenAIBackend(ChatBackend):
+    """The real OpenAI API (honours OPENAI_API_BASE, e.g. to target mock_llm_server.py)"""
+
+    name = 'openai'
+
+    @property
+    def api_base(self) -> str:
+        return openai.api_base
+
+    def create(self, **request):
+        return openai.ChatCompletion.create(**request)
+
+    async def acreate(self, **request):
+        return await openai.ChatCompletion.acreate(**request)
+
+    @contextlib.asynccontextmanager
+    async def session(self, on_headers: Optional[Callable[[Dict], None]] = None):
+        """One pooled aiohttp session for the dispatch, traced into DNS/connect/send/wait spans
+
+        The dispatcher's semaphore bounds concurrency, so the connector itself is unlimited.
+        ``on_headers`` (e.g. ``RateLimiter.update_from_headers``) sees the
+        x-ratelimit-* headers of every successful response.
+        """
+        trace_configs = [http_trace_config()]
+        if on_headers:
+            trace_configs.append(response_headers_trace_config(on_headers))
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0),
+                                         trace_configs=trace_configs) as client_session:
+            token = openai.aiosession.set(client_session)
+            try:
+                yield
+            finally:
+                openai.aiosession.reset(token)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Latency sampler from a spec such as 'fixed:0.5', 'uniform:0.2,1.0',
+    'normal:0.8,0.2', 'lognormal:0.8,0.4' (median, sigma) or 'exponential:0.5' (mean)"""
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',') if v]
+
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == 'exponential':
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def build_canned_answers() -> List[Dict]:
+    """Reference solutions from physics_problems_collection, with the prompt fragments that identify each problem"""
+    collection = {problem['id']: problem for problem in simple_problems + medium_problems + challenging_problems}
+    canned = []
+    for problem in load_problems():
+        reference = collection[problem['id']]
+        canned.append({
+            'problem_id': problem['id'],
+            'markers': [reference['problem'], problem['linear_text'], problem['given']],
+            'answer': f"Answer: {reference['answer']}",
+            'solution': f"{reference['solution']}\n\nAnswer: {reference['answer']}"
+        })
+    return canned
+
+
+def split_tokens(content: str) -> List[str]:
+    """Word-sized pieces used as streamed tokens"""
+    return re.findall(r'\s*\S+', content) or [content]
+
+
+class MockBackend(ChatBackend):
+    """Deterministic in-process stand-in for the ChatCompletion API
+
+    Each request draws a first-token latency from ``latency`` plus one
+    ``token_latency`` interval per generated piece, and may fail with one of
+    ``error_rates`` ({'rate_limit': p, 'server_error': p, 'timeout': p});
+    otherwise it answers with the reference solution of the matching
+    problem (or just the answer line when the solution would not fit in
+    ``max_tokens``).  Draws come from a generator seeded by ``seed`` and the
+    request content, so identical runs give identical results regardless
+    of scheduling.
+    """
+
+    name = 'mock'
+
+    def __init__(self, latency: str = 'lognormal:0.8,0.3', error_rates: Optional[Dict[str, float]] = None,
+                 seed: int = 0, time_scale: float = 1.0, fallback_answer: str = "I cannot determine the answer.",
+                 token_latency: str = 'fixed:0.0'):
+        self.sample_latency = parse_latency(latency)
+        self.sample_token_latency = parse_latency(token_latency)
+        self.latency_spec = latency
+        self.token_latency_spec = token_latency
+        self.error_rates = error_rates or {}
+        self.seed = seed
+        self.time_scale = time_scale
+        self.fallback_answer = fallback_answer
+        self.canned_answers = build_canned_answers()
+        self.request_counts = {}
+        self.requests_served = 0
+        self.errors_raised = 0
+
+    def _rng(self, request: Dict) -> random.Random:
+        """Generator for the n-th occurrence of this exact request"""
+        key = json.dumps({'messages': request.get('messages'), 'max_tokens': request.get('max_tokens'),
+                          'temperature': request.get('temperature')}, sort_keys=True, ensure_ascii=False)
+        occurrence = self.request_counts.get(key, 0)
+        self.request_counts[key] = occurrence + 1
+        digest = hashlib.sha256(f"{self.seed}:{occurrence}:{key}".encode('utf-8')).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def answer_for(self, request: Dict) -> str:
+        prompt = request['messages'][-1]['content']
+        max_tokens = request.get('max_tokens') or 256
+        for canned in self.canned_answers:
+            if any(marker in prompt for marker in canned['markers']):
+                if estimate_tokens(canned['solution']) <= max_tokens:
+                    return canned['solution']
+                return canned['answer']
+        return self.fallback_answer
+
+    def plan(self, request: Dict) -> Dict:
+        """Latency and outcome of a request: {'latency', 'error_class'} or
+        {'latency', 'pieces', 'token_intervals', 'response'} where ``latency`` is time to first token"""
+        rng = self._rng(request)
+        latency = self.sample_latency(rng) * self.time_scale
+        self.requests_served += 1
+
+        draw = rng.random()
+        for error_class, rate in sorted(self.error_rates.items()):
+            if draw < rate:
+                self.errors_raised += 1
+                return {'latency': latency, 'error_class': error_class}
+            draw -= rate
+
+        content = self.answer_for(request)
+        pieces = split_tokens(content)
+        token_intervals = [self.sample_token_latency(rng) * self.time_scale for _ in pieces[1:]]
+        prompt_tokens = sum(estimate_tokens(message.get('content', '')) for message in request.get('messages', []))
+        completion_tokens = estimate_tokens(content)
+        return {
+            'latency': latency,
+            'pieces': pieces,
+            'token_intervals': token_intervals,
+            'response': {
+                'id': f"chatcmpl-mock-{rng.getrandbits(48):012x}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'mock'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens
+                }
+            }
+        }
+
+    def _error(self, error_class: str) -> Exception:
+        if error_class == 'rate_limit':
+            return openai.error.RateLimitError("Mock rate limit reached", http_status=429,
+                                              headers={'retry-after': '0.1'})
+        if error_class == 'server_error':
+            return openai.error.ServiceUnavailableError("Mock server overloaded", http_status=503)
+        if error_class == 'timeout':
+            return openai.error.Timeout("Mock request timed out")
+        return openai.error.APIError(f"Mock {error_class} error", http_status=500)
+
+    def _finish(self, planned: Dict):
+        if 'error_class' in planned:
+            raise self._error(planned['error_class'])
+        return OpenAIObject.construct_from(planned['response'])
+
+    def stream_chunk(self, planned: Dict, content: str = None, finish_reason: str = None) -> Dict:
+        """One chat.completion.chunk payload"""
+        delta = {'content': content} if content is not None else {}
+        return {
+            'id': planned['response']['id'],
+            'object': 'chat.completion.chunk',
+            'created': planned['response']['created'],
+            'model': planned['response']['model'],
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+        }
+
+    def _stream(self, planned: Dict):
+        for piece, interval in zip(planned['pieces'], [0.0] + planned['token_intervals']):
+            time.sleep(interval)
+            yield OpenAIObject.construct_from(self.stream_chunk(planned, piece))
+        yield OpenAIObject.construct_from(self.stream_chunk(planned, finish_reason='stop'))
+
+    async def _astream(self, planned: Dict):
+        for piece, interval in zip(planned['pieces'], [0.0] + planned['token_intervals']):
+            await asyncio.sleep(interval)
+            yield OpenAIObject.construct_from(self.stream_chunk(planned, piece))
+        yield OpenAIObject.construct_from(self.stream_chunk(planned, finish_reason='stop'))
+
+    def create(self, request_timeout: float = None, stream: bool = False, **request):
+        planned = self.plan(request)
+        if request_timeout is not None and planned['latency'] > request_timeout:
+            time.sleep(request_timeout)
+            raise openai.error.Timeout("Mock request timed out")
+        time.sleep(planned['latency'])
+        if 'error_class' in planned:
+            raise self._error(planned['error_class'])
+        if stream:
+            return self._stream(planned)
+        time.sleep(sum(planned['token_intervals']))
+        return self._finish(planned)
+
+    async def acreate(self, request_timeout: float = None, stream: bool = False, **request):
+        planned = self.plan(request)
+        if request_timeout is not None and planned['latency'] > request_timeout:
+            await asyncio.sleep(request_timeout)
+            raise openai.error.Timeout("Mock request timed out")
+        await asyncio.sleep(planned['latency'])
+        if 'error_class' in planned:
+            raise self._error(planned['error_class'])
+        if stream:
+            return self._astream(planned)
+        await asyncio.sleep(sum(planned['token_intervals']))
+        return self._finish(planned)
+
+    def stats(self) -> Dict:
+        return {
+            'latency': self.latency_spec,
+            'token_latency': self.token_latency_spec,
+            'error_rates': self.error_rates,
+            'requests_served': self.requests_served,
+            'errors_raised': self.errors_raised
+        }
+
+
+def parse_error_rates(spec: str) -> Dict[str, float]:
+    """Parse 'rate_limit=0.02,server_error=0.01' into a dict"""
+    rates = {}
+    for part in (spec or '').split(','):
+        if part.strip():
+            error_class, _, rate = part.partition('=')
+            rates[error_class.strip()] = float(rate)
+    return rates
+
+
+def get_backend(name: str = None) -> ChatBackend:
+    """Backend named by ``name`` or LLM_BACKEND (default openai); the mock reads
+    MOCK_LATENCY, MOCK_TOKEN_LATENCY, MOCK_ERROR_RATES and MOCK_SEED"""
+    name = name or os.getenv('LLM_BACKEND', 'openai')
+    if name == 'openai':
+        return OpenAIBackend()
+    if name == 'mock':
+        return MockBackend(
+            latency=os.getenv('MOCK_LATENCY', 'lognormal:0.8,0.3'),
+            error_rates=parse_error_rates(os.getenv('MOCK_ERROR_RATES', '')),
+            token_latency=os.getenv('MOCK_TOKEN_LATENCY', 'fixed:0.0'),
+            seed=int(os.getenv('MOCK_SEED', '0'))
+        )
+    raise ValueError(f"Unknown backend: {name} (expected one of {BACKEND_NAMES})")
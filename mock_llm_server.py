@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+本地模擬 LLM 伺服器與分派器壓力測試
+Mock LLM Server: serves the ChatCompletion protocol locally and benchmarks the dispatcher offline
+
+    python mock_llm_server.py serve --port 8001 --latency lognormal:0.8,0.3 --error-rates rate_limit=0.02
+    OPENAI_API_BASE=http://127.0.0.1:8001/v1 OPENAI_API_KEY=mock python problem_11_20_experiment.py --cache-mode bypass
+
+    python mock_llm_server.py benchmark --requests 20000 --concurrency 2000 --latency fixed:0.05
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict
+
+from aiohttp import web
+
+from async_dispatcher import AsyncTrialDispatcher
+from experiment_engine import ExperimentEngine
+from experiment_problems import load_problems
+from llm_backend import MockBackend, parse_error_rates
+from rate_limiter import RateLimiter
+from retry_policy import RetryPolicy
+
+ERROR_RESPONSES = {
+    'rate_limit': (429, 'requests', "Rate limit reached for requests"),
+    'server_error': (503, 'server_error', "The server is overloaded or not ready yet."),
+}
+
+
+def create_app(backend: MockBackend, hang_seconds: float = 65.0) -> web.Application:
+    """aiohttp app exposing POST /v1/chat/completions backed by ``backend``
+
+    Simulated timeouts hang for ``hang_seconds`` so the client's own
+    request timeout fires, as it would against a stalled upstream.
+    """
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        planned = backend.plan(body)
+
+        if planned.get('error_class') == 'timeout':
+            await asyncio.sleep(hang_seconds)
+        await asyncio.sleep(planned['latency'])
+
+        if 'error_class' in planned:
+            status, error_type, message = ERROR_RESPONSES.get(planned['error_class'],
+                                                              (500, 'server_error', "Mock internal error"))
+            headers = {'retry-after': '0.1'} if status == 429 else {}
+            return web.json_response({'error': {'message': message, 'type': error_type, 'code': None}},
+                                     status=status, headers=headers)
+
+        if body.get('stream'):
+            # Server-sent events, one chat.completion.chunk per piece
+            stream = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await stream.prepare(request)
+            try:
+                for piece, interval in zip(planned['pieces'], [0.0] + planned['token_intervals']):
+                    await asyncio.sleep(interval)
+                    await stream.write(f"data: {json.dumps(backend.stream_chunk(planned, piece))}\n\n".encode('utf-8'))
+                await stream.write(f"data: {json.dumps(backend.stream_chunk(planned, finish_reason='stop'))}\n\n".encode('utf-8'))
+                await stream.write(b"data: [DONE]\n\n")
+                await stream.write_eof()
+            except ConnectionResetError:
+                pass  # client cancelled the stream (early stop)
+            return stream
+
+        await asyncio.sleep(sum(planned['token_intervals']))
+        return web.json_response(planned['response'])
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(backend.stats())
+
+    app = web.Application()
+    app.router.add_post('/v1/chat/completions', chat_completions)
+    app.router.add_get('/stats', stats)
+    return app
+
+
+def run_benchmark(backend: MockBackend, num_requests: int = 10000, max_concurrency: int = 1000) -> Dict:
+    """Push ``num_requests`` trials through AsyncTrialDispatcher against an in-process mock"""
+    # Rate limiting and backoff are what we measure around, not what we measure
+    rate_limiter = RateLimiter(requests_per_minute=1e9, tokens_per_minute=1e12)
+    retry_policy = RetryPolicy(base_delay=0.01, max_delay=0.1)
+    engine = ExperimentEngine(api_key='mock', rate_limiter=rate_limiter, retry_policy=retry_policy, backend=backend)
+
+    base_trials = engine.build_trials(load_problems())
+    trials = [base_trials[i % len(base_trials)] for i in range(num_requests)]
+    dispatcher = AsyncTrialDispatcher(max_concurrency=max_concurrency, rate_limiter=rate_limiter,
+                                      retry_policy=retry_policy, backend=backend)
+
+    start_time = time.perf_counter()
+    outcomes = dispatcher.run(trials)
+    wall_time = time.perf_counter() - start_time
+
+    latencies = sorted(outcome['raw_time'] for outcome in outcomes if outcome['error'] is None)
+    return {
+        'requests': num_requests,
+        'max_concurrency': max_concurrency,
+        'wall_time': wall_time,
+        'requests_per_second': num_requests / wall_time if wall_time > 0 else 0,
+        'successful': len(latencies),
+        'failed': num_requests - len(latencies),
+        'total_attempts': sum(outcome['attempts'] for outcome in outcomes),
+        'latency_mean': statistics.mean(latencies) if latencies else 0,
+        'latency_p50': latencies[len(latencies) // 2] if latencies else 0,
+        'latency_p99': latencies[int(len(latencies) * 0.99)] if latencies else 0
+    }
+
+
+def main():
+    """主執行函數"""
+    parser = argparse.ArgumentParser(description="Local mock ChatCompletion server and dispatcher benchmark")
+    parser.add_argument('command', choices=['serve', 'benchmark'])
+    parser.add_argument('--latency', default='lognormal:0.8,0.3', help="fixed:S, uniform:A,B, normal:MU,SIGMA, lognormal:MEDIAN,SIGMA or exponential:MEAN")
+    parser.add_argument('--token-latency', default='fixed:0.0', help="interval between streamed tokens, same syntax as --latency")
+    parser.add_argument('--error-rates', default='', help="e.g. rate_limit=0.02,server_error=0.01,timeout=0.001")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--requests', type=int, default=10000, help="benchmark: number of requests")
+    parser.add_argument('--concurrency', type=int, default=1000, help="benchmark: requests kept in flight")
+    args = parser.parse_args()
+
+    backend = MockBackend(latency=args.latency, error_rates=parse_error_rates(args.error_rates), seed=args.seed,
+                          token_latency=args.token_latency)
+
+    if args.command == 'serve':
+        print(f"🧪 Mock ChatCompletion server on http://{args.host}:{args.port}/v1 ({args.latency})")
+        web.run_app(create_app(backend), host=args.host, port=args.port, print=None)
+        return
+
+    print(f"🧪 Benchmarking dispatcher: {args.requests} requests, concurrency {args.concurrency}, latency {args.latency}")
+    report = run_benchmark(backend, args.requests, args.concurrency)
+    print(json.dumps(report, indent=2))
+    print(f"⚡ {report['requests_per_second']:.0f} requests/s")
+
+if __name__ == "__main__":
+    main()
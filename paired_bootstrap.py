@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+配對 bootstrap：速度、準確率與穩定性改進的信賴區間（NumPy 批次重抽樣）
+Paired Bootstrap: confidence intervals of per-problem and per-level improvements in one batched NumPy pass
+
+Linear and non-linear trials of the same run are paired, and a resample
+draws run indices with replacement, applying them to both formats.  All
+problems are resampled together as one (problems × resamples × runs)
+index array, so the metric arithmetic is a handful of masked reductions
+regardless of how many problems or resamples there are.  A level's
+interval is the distribution of the mean of its problems' resampled
+improvements, which is the same average the report tables show.
+
+``resample_indices`` and ``percentile_interval`` are the project's one
+bootstrap resampling and percentile-interval implementation; the
+baseline service's latency interval uses them too, so seeding and
+interval conventions stay the same everywhere.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+METRICS = ('speed_improvement', 'accuracy_improvement', 'stability_improvement')
+DEFAULT_RESAMPLES = 10000
+
+
+def paired_samples(level_stats: Dict[Tuple[int, str], Dict]) -> Dict[int, Dict[str, np.ndarray]]:
+    """{problem_id: {'linear_time', 'nonlinear_time', ...}} over the runs both formats completed
+
+    Each array is ordered by run number.  Entries without run numbers pair
+    their trials in the order they were recorded.
+    """
+    problems = {}
+    for problem_id in sorted({problem_id for problem_id, _ in level_stats}):
+        linear, nonlinear = level_stats.get((problem_id, 'linear')), level_stats.get((problem_id, 'nonlinear'))
+        if not linear or not nonlinear:
+            continue
+        by_run = []
+        for entry in (linear, nonlinear):
+            samples = entry['samples']
+            runs = [run if run is not None else index for index, run in enumerate(samples['run'])]
+            by_run.append({run: index for index, run in enumerate(runs)})
+        runs = sorted(set(by_run[0]) & set(by_run[1]))
+        if not runs:
+            continue
+        paired = {}
+        for format_type, entry, index in (('linear', linear, by_run[0]), ('nonlinear', nonlinear, by_run[1])):
+            rows = [index[run] for run in runs]
+            for field in ('time', 'accurate', 'answer'):
+                values = [entry['samples'][field][row] for row in rows]
+                paired[f'{format_type}_{field}'] = np.array([np.nan if value is None else value for value in values], dtype=float)
+        problems[problem_id] = paired
+    return problems
+
+
+def _stack(problems: Dict[int, Dict[str, np.ndarray]]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Pad every problem's arrays to the longest run count: {field: (problems × runs)}, run counts"""
+    counts = np.array([len(paired['linear_time']) for paired in problems.values()])
+    width = counts.max()
+    stacked = {}
+    for field in next(iter(problems.values())):
+        matrix = np.full((len(problems), width), np.nan)
+        for row, paired in enumerate(problems.values()):
+            matrix[row, :len(paired[field])] = paired[field]
+        stacked[field] = matrix
+    return stacked, counts
+
+
+def _masked_mean(values: np.ndarray) -> np.ndarray:
+    """Mean over the last axis ignoring NaN (NaN where every value is missing)"""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=-1)
+    total = np.where(valid, values, 0.0).sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _stability(answers: np.ndarray) -> np.ndarray:
+    """max(0, 1 − CV) over the last axis, NaN where it is undefined (as answer_consistency)"""
+    valid = ~np.isnan(answers)
+    count = valid.sum(axis=-1)
+    values = np.where(valid, answers, 0.0)
+    total = values.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / np.maximum(count, 1)
+        variance = ((values - mean[..., None]) ** 2 * valid).sum(axis=-1) / np.maximum(count - 1, 1)
+        cv = np.where(mean != 0, np.sqrt(variance) / np.abs(mean), np.where(variance == 0, 0.0, np.nan))
+    return np.where(count >= 2, np.maximum(0.0, 1 - cv), np.nan)
+
+
+def improvements(stacked: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Speed (%), accuracy (percentage points) and stability improvements over the last (runs) axis"""
+    linear_time, nonlinear_time = _masked_mean(stacked['linear_time']), _masked_mean(stacked['nonlinear_time'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        speed = np.where((linear_time > 0) & (nonlinear_time > 0), (linear_time - nonlinear_time) / linear_time * 100, 0.0)
+    accuracy = (_masked_mean(stacked['nonlinear_accurate']) - _masked_mean(stacked['linear_accurate'])) * 100
+    stability = _stability(stacked['nonlinear_answer']) - _stability(stacked['linear_answer'])
+    return {'speed_improvement': speed, 'accuracy_improvement': accuracy, 'stability_improvement': stability}
+
+
+def resample_indices(counts, resamples: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """With-replacement index draws for samples of the given sizes, all from one seeded generator
+
+    Returns indices (samples × resamples × largest size) and an in_range
+    mask broadcastable to them (samples × 1 × largest size); slots past a
+    sample's own size are out of range and must be masked.
+    """
+    counts = np.asarray(counts, dtype=np.intp)
+    width = int(counts.max())
+    rng = np.random.default_rng(seed)
+    indices = np.floor(rng.random((len(counts), resamples, width)) * counts[:, None, None]).astype(np.intp)
+    in_range = np.arange(width)[None, None, :] < counts[:, None, None]
+    return indices, in_range
+
+
+def percentile_interval(values: np.ndarray, confidence: float = 0.95):
+    """(low, high) percentile interval of the defined (non-NaN) values, None when none is defined"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(values, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def bootstrap_intervals(level_samples: Dict[str, Dict[int, Dict[str, np.ndarray]]], resamples: int = DEFAULT_RESAMPLES,
+                        confidence: float = 0.95, seed: int = 0) -> Dict[str, Dict]:
+    """Percentile intervals for every problem and level, from one batched resampling pass
+
+    ``level_samples`` maps each level to ``paired_samples`` output.  Returns
+    {level: {'problems': {problem_id: {metric: (low, high)}}, 'level': {metric: (low, high)}}};
+    an interval is None when the metric is undefined in every resample.
+    """
+    keys = [(level, problem_id) for level, problems in level_samples.items() for problem_id in problems]
+    if not keys:
+        return {}
+    stacked, counts = _stack({key: level_samples[key[0]][key[1]] for key in keys})
+
+    # Run indices for every (problem, resample, slot); slots past a problem's run count are masked out
+    indices, in_range = resample_indices(counts, resamples, seed)
+    resampled = {}
+    for field, matrix in stacked.items():
+        drawn = np.take_along_axis(matrix[:, None, :], indices, axis=2)
+        resampled[field] = np.where(in_range, drawn, np.nan)
+    metrics = improvements(resampled)   # each (problems × resamples)
+
+    intervals = {level: {'problems': {}, 'level': {}} for level in level_samples}
+    for row, (level, problem_id) in enumerate(keys):
+        intervals[level]['problems'][problem_id] = {metric: percentile_interval(metrics[metric][row], confidence)
+                                                    for metric in METRICS}
+    levels = np.array([level for level, _ in keys], dtype=object)
+    for level in intervals:
+        rows = levels == level
+        if rows.any():
+            for metric, values in metrics.items():
+                # Problems whose metric is undefined in a resample (no stability for symbolic answers) are left out of its mean
+                intervals[level]['level'][metric] = percentile_interval(_masked_mean(values[rows].T), confidence)
+    return intervals
+
+
+def format_interval(interval, digits: int = 1) -> str:
+    """Signed "[low, high]" text, or an empty string when there is no interval"""
+    if not interval:
+        return ""
+    return f"[{interval[0]:+.{digits}f}, {interval[1]:+.{digits}f}]"
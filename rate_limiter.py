@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+自適應速率限制器
+Adaptive Rate Limiter: shared requests-per-minute and tokens-per-minute token buckets
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+
+def estimate_request_tokens(request: Dict) -> int:
+    """Rough token estimate for a ChatCompletion request (prompt + completion budget)"""
+    prompt_chars = sum(len(message.get('content', '')) for message in request.get('messages', []))
+    return prompt_chars // 4 + request.get('max_tokens', 0) + 10
+
+
+def parse_reset_seconds(value: str) -> float:
+    """Parse reset durations such as '1s', '6m0s', '250ms' into seconds"""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    seconds = 0.0
+    for amount, unit in re.findall(r'([0-9.]+)(ms|h|m|s)', value):
+        seconds += float(amount) * {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}[unit]
+    return seconds
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``capacity`` units per minute"""
+
+    def __init__(self, capacity: float):
+        self.capacity = float(capacity)
+        self.available = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.available = min(self.capacity, self.available + elapsed * self.capacity / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if available now)"""
+        # A request larger than the whole bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60.0 / self.capacity
+
+    def set_capacity(self, capacity: float):
+        capacity = max(1.0, float(capacity))
+        self.available = min(self.available, capacity)
+        self.capacity = capacity
+
+
+class RateLimiter:
+    """Shared RPM/TPM limiter that adapts to rate-limit headers and 429 responses
+
+    Every request must ``acquire`` before it is sent.  Limits start at the
+    configured ceilings; a 429 halves both rates and pauses all callers for
+    the advertised ``retry-after``, and each success recovers a small step
+    back towards the ceiling (AIMD).  The x-ratelimit-* headers of
+    successful responses (passed in by the dispatcher's backend session)
+    and of 429s replace the ceilings with the live server quota and cap the
+    available capacity at what the server reports as remaining.
+    """
+
+    def __init__(self, requests_per_minute: float = 3500, tokens_per_minute: float = 90000,
+                 recovery_step: float = 0.05, min_fraction: float = 0.05):
+        self.max_requests_per_minute = float(requests_per_minute)
+        self.max_tokens_per_minute = float(tokens_per_minute)
+        self.recovery_step = recovery_step
+        self.min_fraction = min_fraction
+
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.rate_limit_hits = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Reserve capacity if available, otherwise return how long to wait"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            self.request_bucket.refill(now)
+            self.token_bucket.refill(now)
+            wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(estimated_tokens))
+            if wait > 0:
+                return wait
+
+            self.request_bucket.available -= 1
+            self.token_bucket.available -= estimated_tokens
+            return 0.0
+
+    def acquire_sync(self, estimated_tokens: int = 0):
+        """Block the calling thread until the request may be sent"""
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait (without blocking the event loop) until the request may be sent"""
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Reconcile the token bucket with the usage reported by the API"""
+        with self._lock:
+            self.token_bucket.available = min(self.token_bucket.capacity,
+                                              self.token_bucket.available + estimated_tokens - actual_tokens)
+            self._recover()
+
+    def _recover(self):
+        """Additive increase towards the configured ceilings"""
+        self.request_bucket.set_capacity(min(self.max_requests_per_minute,
+                                             self.request_bucket.capacity + self.recovery_step * self.max_requests_per_minute))
+        self.token_bucket.set_capacity(min(self.max_tokens_per_minute,
+                                           self.token_bucket.capacity + self.recovery_step * self.max_tokens_per_minute))
+
+    def on_rate_limited(self, headers: Optional[Dict] = None):
+        """Multiplicative decrease after a 429, honouring retry-after when given"""
+        if headers:
+            self.update_from_headers(headers)
+
+        with self._lock:
+            self.rate_limit_hits += 1
+            self.request_bucket.set_capacity(max(self.request_bucket.capacity / 2,
+                                                 self.min_fraction * self.max_requests_per_minute))
+            self.token_bucket.set_capacity(max(self.token_bucket.capacity / 2,
+                                               self.min_fraction * self.max_tokens_per_minute))
+
+            retry_after = 1.0
+            if headers:
+                headers = {key.lower(): value for key, value in headers.items()}
+                retry_after = parse_reset_seconds(headers.get('retry-after', '')) or retry_after
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def observe_error(self, error: Exception):
+        """Feed a failed request back into the limiter (only 429s change its state)"""
+        if getattr(error, 'http_status', None) == 429 or type(error).__name__ == 'RateLimitError':
+            self.on_rate_limited(getattr(error, 'headers', None))
+
+    def update_from_headers(self, headers: Dict):
+        """Adopt the server quota from x-ratelimit-* response headers
+
+        The limit becomes the ceiling that successes recover towards; a
+        bucket that is already below it (after a 429) keeps its reduced rate.
+        """
+        headers = {key.lower(): value for key, value in headers.items()}
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in [(self.request_bucket, 'requests'), (self.token_bucket, 'tokens')]:
+                limit = headers.get(f'x-ratelimit-limit-{kind}')
+                remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+                if limit:
+                    bucket.set_capacity(min(bucket.capacity, float(limit)))
+                    if kind == 'requests':
+                        self.max_requests_per_minute = float(limit)
+                    else:
+                        self.max_tokens_per_minute = float(limit)
+                if remaining:
+                    bucket.refill(now)
+                    bucket.available = min(bucket.available, float(remaining))
+
+    def stats(self) -> Dict:
+        """Current limiter state for experiment_info"""
+        return {
+            'requests_per_minute': self.request_bucket.capacity,
+            'tokens_per_minute': self.token_bucket.capacity,
+            'rate_limit_hits': self.rate_limit_hits
+        }
+
+
+_shared_limiter = None
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by every runner (limits from OPENAI_RPM / OPENAI_TPM)"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = RateLimiter(
+            requests_per_minute=float(os.getenv('OPENAI_RPM', '3500')),
+            tokens_per_minute=float(os.getenv('OPENAI_TPM', '90000'))
+        )
+    return _shared_limiter
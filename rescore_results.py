@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+離線重新評分：以新參數重算已存結果的提取與準確度
+Offline Re-scoring: re-apply extraction and accuracy to stored trial records with new parameters
+
+    python rescore_results.py problem_*_results_*.jsonl --tolerance simple=0.08 --tolerance challenging=0.2
+    python rescore_results.py experiment_journal_20250915_174331.jsonl --extractor medium=last_number
+"""
+
+import argparse
+import copy
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from answer_extraction import EXTRACTORS
+from experiment_engine import DIFFICULTY_PROFILES, ExperimentEngine
+from llm_backend import OpenAIBackend
+from response_cache import ResponseCache
+from trial_store import TrialReader, TrialWriter, schema_path, trial_line
+
+
+RESCORE_CHUNK = 500
+# Large per-trial fields the analysis never reads; dropped from the copies kept for it
+ANALYSIS_SKIPPED_FIELDS = ('response', 'timing_spans', 'attempt_errors')
+
+
+def parse_level_overrides(specs: List[str], convert=str) -> Dict:
+    """['simple=0.08', 'medium=0.12'] → {'simple': 0.08, 'medium': 0.12}"""
+    overrides = {}
+    for spec in specs or []:
+        level, _, value = spec.partition('=')
+        if level not in DIFFICULTY_PROFILES:
+            raise ValueError(f"Unknown difficulty level: {level}")
+        overrides[level] = convert(value)
+    return overrides
+
+
+def profiles_with_overrides(overrides: Dict) -> Dict:
+    """Copy of DIFFICULTY_PROFILES with per-level tolerance / extractor overrides applied"""
+    profiles = copy.deepcopy(DIFFICULTY_PROFILES)
+    for level, tolerance in overrides.get('tolerance', {}).items():
+        profiles[level]['tolerance'] = tolerance
+    for level, extractor in overrides.get('extractor', {}).items():
+        profiles[level]['extractor'] = EXTRACTORS[extractor]
+    return profiles
+
+
+def offline_engine(overrides: Dict) -> ExperimentEngine:
+    """Engine used only for scoring and analysis: no cache file, no API calls"""
+    return ExperimentEngine(api_key='offline', profiles=profiles_with_overrides(overrides),
+                            response_cache=ResponseCache(mode='bypass'), backend=OpenAIBackend())
+
+
+def rescored_chunks(records, engine: ExperimentEngine, size: int = RESCORE_CHUNK):
+    """(chunk, changed verdicts) of re-scored records, ``size`` at a time (each chunk's extraction runs as one batch)"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk, engine.rescore_records(chunk)
+            chunk = []
+    if chunk:
+        yield chunk, engine.rescore_records(chunk)
+
+
+def rescore_file(path: str, overrides: Dict, output_dir: str, in_place: bool = False) -> Dict:
+    """Re-score one stored result file and write it as a schema file (.jsonl) to ``output_dir``
+
+    Records are streamed: each re-scored chunk is appended to a staging
+    file, so memory does not grow with the file size (only the scalar
+    fields the analysis needs are kept when the file carries an analysis).
+    The finished file is written next to its destination and moved over
+    it atomically.  With ``in_place`` the destination is the source itself
+    (for legacy .json files, the .jsonl file beside it).
+    """
+    start_time = time.perf_counter()
+    engine = offline_engine(overrides)
+    output_path = schema_path(path) if in_place else os.path.join(output_dir, schema_path(os.path.basename(path)))
+
+    reader = TrialReader(path)
+    header = reader.header
+    keep_analysis = reader.analysis is not None
+    results = {'linear': [], 'nonlinear': []}
+    scored = {'linear': [0, 0], 'nonlinear': [0, 0]}   # successful, accurate
+    records = changed = 0
+    staging_path = output_path + '.records.tmp'
+    temp_path = output_path + '.tmp'
+    try:
+        with open(staging_path, 'w', encoding='utf-8') as staging:
+            for chunk, chunk_changed in rescored_chunks(reader, engine, RESCORE_CHUNK):
+                changed += chunk_changed
+                for record in chunk:
+                    staging.write(trial_line(record))
+                    records += 1
+                    if record.get('success') and record['format_type'] in scored:
+                        scored[record['format_type']][0] += 1
+                        scored[record['format_type']][1] += bool(record['accuracy_analysis']['accurate'])
+                    if keep_analysis and record['format_type'] in results:
+                        results[record['format_type']].append({field: value for field, value in record.items()
+                                                               if field not in ANALYSIS_SKIPPED_FIELDS})
+
+        experiment_info = dict(header.get('experiment_info', {}))
+        experiment_info['rescoring'] = {
+            'source': path,
+            'overrides': overrides,
+            'rescored_at': datetime.now().isoformat(),
+            'changed_verdicts': changed
+        }
+        with TrialWriter(temp_path, experiment_info) as writer, open(staging_path, 'r', encoding='utf-8') as staging:
+            writer.write_lines(staging)
+            if keep_analysis:
+                writer.write_analysis(engine.analyze_three_metrics(results))
+        os.replace(temp_path, output_path)
+    finally:
+        for leftover in (staging_path, temp_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    summary = {
+        'source': path,
+        'output': output_path,
+        'records': records,
+        'changed_verdicts': changed,
+        'elapsed': time.perf_counter() - start_time
+    }
+    for format_type, (successful, accurate) in scored.items():
+        summary[f'{format_type}_accuracy'] = accurate / successful if successful else None
+    return summary
+
+
+def rescore_files(paths: List[str], overrides: Dict, output_dir: Optional[str] = None,
+                  workers: Optional[int] = None, in_place: bool = False) -> List[Dict]:
+    """Re-score many files in parallel (one process per file)"""
+    if output_dir is None:
+        output_dir = f"rescored_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summaries = list(executor.map(rescore_file, paths, [overrides] * len(paths), [output_dir] * len(paths),
+                                      [in_place] * len(paths)))
+
+    with open(os.path.join(output_dir, 'rescoring_summary.json'), 'w', encoding='utf-8') as f:
+        json.dump({'overrides': overrides, 'files': summaries}, f, indent=2, ensure_ascii=False)
+    return summaries
+
+
+def main():
+    """主執行函數"""
+    parser = argparse.ArgumentParser(description="Re-score stored experiment results offline (no API calls)")
+    parser.add_argument('paths', nargs='+', help="result files (.jsonl, or legacy .json) or trial journals (globs allowed)")
+    parser.add_argument('--tolerance', action='append', metavar='LEVEL=VALUE', help="e.g. simple=0.08 (repeatable)")
+    parser.add_argument('--extractor', action='append', metavar='LEVEL=NAME',
+                        help=f"e.g. medium=last_number; names: {', '.join(EXTRACTORS)}")
+    parser.add_argument('--output-dir', help="directory for the re-scored dataset (default rescored_<timestamp>)")
+    parser.add_argument('--workers', type=int, help="parallel processes (default: CPU count)")
+    parser.add_argument('--in-place', action='store_true', help="replace each .jsonl source with its re-scored version (the summary still goes to --output-dir)")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.paths for path in (glob.glob(pattern) or [pattern])})
+    overrides = {
+        'tolerance': parse_level_overrides(args.tolerance, float),
+        'extractor': parse_level_overrides(args.extractor)
+    }
+
+    print(f"🔁 Re-scoring {len(paths)} files with {overrides}")
+    start_time = time.perf_counter()
+    summaries = rescore_files(paths, overrides, args.output_dir, args.workers, args.in_place)
+
+    for summary in summaries:
+        linear = f"{summary['linear_accuracy']:.1%}" if summary['linear_accuracy'] is not None else '-'
+        nonlinear = f"{summary['nonlinear_accuracy']:.1%}" if summary['nonlinear_accuracy'] is not None else '-'
+        print(f"   🔸 {summary['source']}: {summary['records']} records, {summary['changed_verdicts']} verdicts changed, "
+              f"accuracy linear {linear} / nonlinear {nonlinear}")
+    destination = os.path.dirname(summaries[0]['output']) if summaries else args.output_dir
+    print(f"✅ Re-scored dataset: {'in place' if args.in_place else destination} "
+          f"({time.perf_counter() - start_time:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+回應快取：以請求內容為鍵的本地 SQLite 快取
+Response Cache: content-addressed on-disk cache of ChatCompletion responses
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from openai.openai_object import OpenAIObject
+
+CACHE_MODES = ('use', 'refresh', 'bypass')
+CACHE_KEY_FIELDS = ('backend', 'api_base', 'model', 'messages', 'temperature', 'max_tokens')
+
+
+def cache_key(request: Dict, sample: int = 0, backend: str = 'openai', api_base: Optional[str] = None) -> str:
+    """SHA-256 of the backend, API base and (model, messages, temperature, max_tokens) of a request
+
+    ``sample`` separates repeated draws of the same request (the runs of a
+    problem), so cached re-runs keep their run-to-run variation.  The
+    backend and API base keep responses of a mock server or another
+    endpoint from being served as responses of the real API.
+    """
+    keyed = dict(request, backend=backend, api_base=api_base)
+    keyed = {field: keyed.get(field) for field in CACHE_KEY_FIELDS}
+    keyed['sample'] = sample
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with age and size eviction
+
+    Modes:
+      - ``use``: serve hits locally, store misses (re-scoring at zero API cost)
+      - ``refresh``: always call the API, overwrite stored entries
+      - ``bypass``: neither read nor write (timing-sensitive trials)
+
+    Entries older than ``max_age_seconds`` are dropped on read; once the
+    stored payloads exceed ``max_bytes`` the least recently used entries are
+    evicted.  Each entry keeps the ``raw_time`` measured when it was first
+    fetched so cached trials still carry their original latency.
+    """
+
+    def __init__(self, path: str = 'response_cache.sqlite', mode: str = 'use',
+                 max_bytes: int = 256 * 1024 * 1024, max_age_seconds: float = 30 * 24 * 3600):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"cache mode must be one of {CACHE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if self.mode != 'bypass':
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        model TEXT,
+                        payload TEXT NOT NULL,
+                        raw_time REAL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection, committed and closed on exit"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, request: Dict, sample: int = 0, backend: str = 'openai', api_base: Optional[str] = None) -> Optional[Dict]:
+        """Cached {'response', 'raw_time'} for a request, or None on a miss"""
+        if self.mode != 'use':
+            return None
+
+        key = cache_key(request, sample, backend, api_base)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT payload, raw_time, created_at FROM responses WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            payload, raw_time, created_at = row
+            if now - created_at > self.max_age_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return {'response': OpenAIObject.construct_from(json.loads(payload)), 'raw_time': raw_time}
+
+    def put(self, request: Dict, response, raw_time: float, sample: int = 0, backend: str = 'openai',
+            api_base: Optional[str] = None):
+        """Store a successful response (no-op in bypass mode)"""
+        if self.mode == 'bypass':
+            return
+
+        payload = json.dumps(response.to_dict_recursive(), ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO responses (key, model, payload, raw_time, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (cache_key(request, sample, backend, api_base), request.get('model'), payload, raw_time, len(payload.encode('utf-8')), now, now))
+            self.writes += 1
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        self.evictions += conn.execute("DELETE FROM responses WHERE created_at < ?",
+                                       (now - self.max_age_seconds,)).rowcount
+
+        total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            if total_size <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total_size -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Cache activity for experiment_info"""
+        return {
+            'mode': self.mode,
+            'path': self.path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions
+        }
+
+
+def get_response_cache(mode: str = None, backend: str = None) -> ResponseCache:
+    """Cache at RESPONSE_CACHE_PATH (default response_cache.sqlite), mode from RESPONSE_CACHE_MODE
+
+    The default mode is ``bypass``: experiment runs measure latency, and a
+    cached response would carry the time of its first fetch.  ``use`` is an
+    explicit opt-in (``--cache-mode use`` or RESPONSE_CACHE_MODE=use) for
+    runs that only re-score.  The mock backend always gets a ``bypass``
+    cache: canned answers must never end up in the shared cache.
+    """
+    return ResponseCache(
+        path=os.getenv('RESPONSE_CACHE_PATH', 'response_cache.sqlite'),
+        mode='bypass' if backend == 'mock' else mode or os.getenv('RESPONSE_CACHE_MODE', 'bypass')
+    )
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+重試策略：指數退避與錯誤分類
+Retry Policy: jittered exponential backoff with retryable / fatal error classification
+"""
+
+import asyncio
+import random
+import time
+from typing import Callable, Dict, Optional
+
+import openai
+
+from rate_limiter import parse_reset_seconds
+from timing_spans import record_span, span
+
+RETRYABLE_ERROR_CLASSES = {'timeout', 'rate_limit', 'server_error', 'connection'}
+
+
+def classify_error(error: Exception) -> str:
+    """Classify an API error as timeout / rate_limit / server_error / connection / fatal"""
+    if isinstance(error, (openai.error.Timeout, asyncio.TimeoutError, TimeoutError)):
+        return 'timeout'
+    if isinstance(error, openai.error.RateLimitError):
+        return 'rate_limit'
+    if isinstance(error, (openai.error.ServiceUnavailableError, openai.error.TryAgain)):
+        return 'server_error'
+    if isinstance(error, (openai.error.APIConnectionError, ConnectionError)):
+        return 'connection'
+    http_status = getattr(error, 'http_status', None)
+    if http_status is not None and (http_status == 429 or http_status >= 500):
+        return 'rate_limit' if http_status == 429 else 'server_error'
+    return 'fatal'
+
+
+class RetryPolicy:
+    """Retry transient failures with full-jitter exponential backoff
+
+    Only the final attempt is timed into ``raw_time``; time spent in failed
+    attempts and backoff is reported separately so retries never inflate
+    the measured latency.  Rate-limit waits, attempts and backoff sleeps are
+    recorded as timing spans of the active trial.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 20.0):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Delay before the next attempt, honouring retry-after on 429s"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        headers = getattr(error, 'headers', None) or {}
+        retry_after = {key.lower(): value for key, value in headers.items()}.get('retry-after')
+        if retry_after:
+            delay = max(delay, min(self.max_delay, parse_reset_seconds(retry_after)))
+        return delay
+
+    def _new_outcome(self) -> Dict:
+        return {
+            'response': None,
+            'raw_time': 0.0,
+            'request_time': None,
+            'attempts': 0,
+            'error': None,
+            'error_class': None,
+            'attempt_errors': [],
+            'retry_overhead_time': 0.0
+        }
+
+    def _record_failure(self, outcome: Dict, error: Exception) -> bool:
+        """Store the failure and return whether another attempt should be made"""
+        error_class = classify_error(error)
+        outcome['error'] = error
+        outcome['error_class'] = error_class
+        outcome['attempt_errors'].append(f"{error_class}: {error}")
+        return error_class in RETRYABLE_ERROR_CLASSES and outcome['attempts'] < self.max_attempts
+
+    def run(self, request_fn: Callable, before_attempt: Optional[Callable] = None,
+            on_error: Optional[Callable[[Exception], None]] = None) -> Dict:
+        """Call ``request_fn`` until it succeeds, fails fatally or runs out of attempts"""
+        outcome = self._new_outcome()
+        while True:
+            if before_attempt:
+                with span('rate_limit_wait'):
+                    before_attempt()
+            outcome['attempts'] += 1
+            outcome['request_time'] = time.time()  # wall-clock position, for baseline alignment
+            start_ns = time.perf_counter_ns()
+            try:
+                outcome['response'] = request_fn()
+                end_ns = time.perf_counter_ns()
+                record_span('http_attempt', start_ns, end_ns, attempt=outcome['attempts'])
+                outcome['raw_time'] = (end_ns - start_ns) / 1e9
+                outcome['error'] = None
+                outcome['error_class'] = None
+                return outcome
+            except Exception as e:
+                end_ns = time.perf_counter_ns()
+                outcome['raw_time'] = (end_ns - start_ns) / 1e9
+                if on_error:
+                    on_error(e)
+                retry = self._record_failure(outcome, e)
+                record_span('http_attempt', start_ns, end_ns, attempt=outcome['attempts'],
+                            error_class=outcome['error_class'])
+                if not retry:
+                    return outcome
+                delay = self.backoff_delay(outcome['attempts'], e)
+                outcome['retry_overhead_time'] += outcome['raw_time'] + delay
+                with span('backoff', attempt=outcome['attempts']):
+                    time.sleep(delay)
+
+    async def arun(self, request_fn: Callable, before_attempt: Optional[Callable] = None,
+                   on_error: Optional[Callable[[Exception], None]] = None) -> Dict:
+        """Async variant of ``run``; ``request_fn`` and ``before_attempt`` are coroutine functions"""
+        outcome = self._new_outcome()
+        while True:
+            if before_attempt:
+                with span('rate_limit_wait'):
+                    await before_attempt()
+            outcome['attempts'] += 1
+            outcome['request_time'] = time.time()  # wall-clock position, for baseline alignment
+            start_ns = time.perf_counter_ns()
+            try:
+                outcome['response'] = await request_fn()
+                end_ns = time.perf_counter_ns()
+                record_span('http_attempt', start_ns, end_ns, attempt=outcome['attempts'])
+                outcome['raw_time'] = (end_ns - start_ns) / 1e9
+                outcome['error'] = None
+                outcome['error_class'] = None
+                return outcome
+            except Exception as e:
+                end_ns = time.perf_counter_ns()
+                outcome['raw_time'] = (end_ns - start_ns) / 1e9
+                if on_error:
+                    on_error(e)
+                retry = self._record_failure(outcome, e)
+                record_span('http_attempt', start_ns, end_ns, attempt=outcome['attempts'],
+                            error_class=outcome['error_class'])
+                if not retry:
+                    return outcome
+                delay = self.backoff_delay(outcome['attempts'], e)
+                outcome['retry_overhead_time'] += outcome['raw_time'] + delay
+                with span('backoff', attempt=outcome['attempts']):
+                    await asyncio.sleep(delay)
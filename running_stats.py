@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+即時統計：逐筆更新的 Welford 平均/變異數、準確率計數與分位數估計
+Running Stats: streaming accumulators updated as each trial completes, and a live progress view
+
+Every accumulator takes one value at a time in O(1) time and memory, so
+per-format latency and accuracy (with confidence intervals) are known
+mid-run, and the same accumulators produce the end-of-run summaries.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FORMATS = ('linear', 'nonlinear')
+PROGRESS_QUANTILES = (0.5, 0.9)
+
+
+def z_quantile(confidence: float) -> float:
+    """Two-sided standard normal critical value"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def t_quantile(confidence: float, df: int) -> float:
+    """Two-sided Student t critical value (Cornish-Fisher expansion of the normal quantile)"""
+    z = z_quantile(confidence)
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+class RunningStats:
+    """Welford mean / variance: numerically stable, one pass, mergeable (Chan et al.)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> 'RunningStats':
+        stats = cls()
+        for value in values:
+            stats.push(value)
+        return stats
+
+    def push(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Combine two accumulators as if every value had been pushed into one"""
+        merged = RunningStats()
+        merged.count = self.count + other.count
+        if merged.count:
+            delta = other.mean - self.mean
+            merged.mean = self.mean + delta * other.count / merged.count
+            merged.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / merged.count
+        merged.min, merged.max = min(self.min, other.min), max(self.max, other.max)
+        return merged
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two values)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def mean_ci(self, confidence: float = 0.95) -> Optional[Tuple[float, float]]:
+        """Student t interval of the mean; None with fewer than two values"""
+        if self.count < 2:
+            return None
+        half = t_quantile(confidence, self.count - 1) * self.stdev / math.sqrt(self.count)
+        return self.mean - half, self.mean + half
+
+
+class AccuracyCounter:
+    """Hit / trial counts with a Wilson score interval"""
+
+    def __init__(self):
+        self.hits = 0
+        self.trials = 0
+
+    def push(self, hit: bool):
+        self.trials += 1
+        self.hits += bool(hit)
+
+    @property
+    def rate(self) -> float:
+        return self.hits / self.trials if self.trials else 0.0
+
+    def wilson_ci(self, confidence: float = 0.95) -> Optional[Tuple[float, float]]:
+        if not self.trials:
+            return None
+        z = z_quantile(confidence)
+        n, p = self.trials, self.rate
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class P2Quantile:
+    """P² streaming quantile estimate (Jain & Chlamtac, 1985): five markers, no stored samples"""
+
+    def __init__(self, p: float):
+        self.p = p
+        self.initial: List[float] = []
+        self.heights: Optional[List[float]] = None
+
+    def push(self, value: float):
+        if self.heights is None:
+            self.initial.append(value)
+            if len(self.initial) == 5:
+                p = self.p
+                self.heights = sorted(self.initial)
+                self.positions = [1, 2, 3, 4, 5]
+                self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+                self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+            return
+
+        heights, positions = self.heights, self.positions
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = max(i for i in range(4) if heights[i] <= value)
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.heights is not None:
+            return self.heights[2]
+        if not self.initial:
+            return None
+        ordered = sorted(self.initial)
+        return ordered[min(len(ordered) - 1, int(round(self.p * (len(ordered) - 1))))]
+
+
+class FormatProgress:
+    """Running latency, TTFT and accuracy of one prompt format"""
+
+    def __init__(self, quantiles=PROGRESS_QUANTILES):
+        self.trials = 0
+        self.failed = 0
+        self.thinking_time = RunningStats()
+        self.ttft = RunningStats()
+        self.accuracy = AccuracyCounter()
+        self.quantiles = {q: P2Quantile(q) for q in quantiles}
+
+    def push(self, result: Dict):
+        self.trials += 1
+        if not result['success']:
+            self.failed += 1
+            return
+        self.thinking_time.push(result['thinking_time'])
+        for quantile in self.quantiles.values():
+            quantile.push(result['thinking_time'])
+        if result.get('time_to_first_token') is not None:
+            self.ttft.push(result['time_to_first_token'])
+        self.accuracy.push((result.get('accuracy_analysis') or {}).get('accurate'))
+
+    def snapshot(self, confidence: float = 0.95) -> Dict:
+        snapshot = {
+            'trials': self.trials,
+            'failed': self.failed,
+            'mean_thinking_time': self.thinking_time.mean,
+            'thinking_time_std': self.thinking_time.stdev,
+            'thinking_time_ci': self.thinking_time.mean_ci(confidence),
+            'thinking_time_quantiles': {f'p{round(q * 100)}': quantile.value for q, quantile in self.quantiles.items()},
+            'accuracy': self.accuracy.rate,
+            'accuracy_ci': self.accuracy.wilson_ci(confidence)
+        }
+        if self.ttft.count:
+            snapshot['mean_ttft'] = self.ttft.mean
+            snapshot['ttft_ci'] = self.ttft.mean_ci(confidence)
+        return snapshot
+
+
+class LiveProgress:
+    """Per-format running statistics of an experiment in progress"""
+
+    def __init__(self, confidence: float = 0.95):
+        self.confidence = confidence
+        self.formats = {format_type: FormatProgress() for format_type in FORMATS}
+
+    def push(self, result: Dict):
+        self.formats[result['format_type']].push(result)
+
+    def snapshot(self) -> Dict:
+        return {format_type: progress.snapshot(self.confidence) for format_type, progress in self.formats.items()}
+
+    def render(self) -> str:
+        """One line per format: mean thinking time ± CI half-width, quantiles, accuracy with Wilson CI"""
+        lines = []
+        for format_type, snapshot in self.snapshot().items():
+            if not snapshot['trials']:
+                continue
+            line = f"   📈 {format_type:<9} {snapshot['trials']:>3} trials"
+            if snapshot['failed']:
+                line += f" ({snapshot['failed']} failed)"
+            if snapshot['trials'] > snapshot['failed']:
+                ci = snapshot['thinking_time_ci']
+                line += f"  time {snapshot['mean_thinking_time']:.3f}s"
+                if ci:
+                    line += f" ±{(ci[1] - ci[0]) / 2:.3f}"
+                line += " (" + ", ".join(f"{name} {value:.3f}" for name, value in snapshot['thinking_time_quantiles'].items()) + ")"
+                low, high = snapshot['accuracy_ci']
+                line += f"  accuracy {snapshot['accuracy']:.1%} [{low:.1%}, {high:.1%}]"
+                if 'mean_ttft' in snapshot:
+                    line += f"  TTFT {snapshot['mean_ttft']:.3f}s"
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+符號答案驗證：Unicode 數學式解析與隨機點數值等價檢查
+Symbolic Verification: parse Unicode math answers into expression trees and check them
+against the reference answers by numeric evaluation at random points
+"""
+
+import math
+import random
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from physics_problems_collection import challenging_problems
+from unit_registry import parse_unit
+
+SYMBOLIC_PROBLEM_IDS = (21, 22, 25, 27, 28, 30)
+TRAILING_PUNCTUATION = '.。!！'
+
+VULGAR_FRACTIONS = {'½': 1 / 2, '⅓': 1 / 3, '⅔': 2 / 3, '¼': 1 / 4, '¾': 3 / 4, '⅕': 1 / 5, '⅙': 1 / 6, '⅛': 1 / 8}
+SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻', '0123456789-')
+SUBSCRIPTS = str.maketrans('₀₁₂₃₄₅₆₇₈₉ₑₒₓₐ', '0123456789eoxa')
+FUNCTIONS = {
+    'sqrt': math.sqrt, 'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'ln': math.log, 'log': math.log, 'exp': math.exp
+}
+OPERATORS = {'+': '+', '-': '-', '−': '-', '*': '*', '×': '*', '·': '*', '⋅': '*', '/': '/', '÷': '/', '^': '^',
+             '(': '(', ')': ')', '[': '(', ']': ')'}
+
+TOKEN_PATTERNS = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>[0-9]+(?:\.[0-9]+)?|\.[0-9]+)
+  | (?P<fraction>[½⅓⅔¼¾⅕⅙⅛])
+  | (?P<power>\*\*|[⁰¹²³⁴⁵⁶⁷⁸⁹⁻]+)
+  | (?P<sqrt>√)
+  | (?P<function>(?:sqrt|sin|cos|tan|ln|log|exp)(?![A-Za-z_]))
+  | (?P<identifier>[A-Za-zΑ-Ωα-ωẍẋ][̀-ͯ]*(?:_[A-Za-z0-9]+|[₀-₉ₑₒₓₐ]+)?)
+  | (?P<operator>[-+−*×·⋅/÷^()\[\]])
+""", re.VERBOSE)
+
+
+# ==================== PARSING ====================
+
+def tokenize(text: str) -> List[Tuple[str, object]]:
+    """Split a Unicode math expression into (kind, value) tokens; ValueError on anything else"""
+    text = unicodedata.normalize('NFC', text)
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN_PATTERNS.match(text, position)
+        if match is None:
+            raise ValueError(f"Unexpected character {text[position]!r} in {text!r}")
+        kind = match.lastgroup
+        value = match.group()
+        position = match.end()
+        if kind == 'space':
+            continue
+        if kind == 'number':
+            tokens.append(('number', float(value)))
+        elif kind == 'fraction':
+            tokens.append(('number', VULGAR_FRACTIONS[value]))
+        elif kind == 'power':
+            tokens.append(('op', '^'))
+            if value != '**':
+                tokens.append(('number', float(value.translate(SUPERSCRIPTS))))
+        elif kind == 'sqrt':
+            tokens.append(('function', 'sqrt'))
+        elif kind == 'identifier':
+            tokens.append(('identifier', value.translate(SUBSCRIPTS)))
+        else:
+            tokens.append((kind if kind == 'function' else 'op', OPERATORS.get(value, value)))
+    return tokens
+
+
+class ExpressionParser:
+    """Recursive-descent parser producing tuple trees
+
+    Juxtaposition binds tighter than an explicit '/' or '*', following the
+    physics convention that g/2a means g/(2a) and 2kd²/mL² means
+    (2kd²)/(mL²).
+    """
+
+    def __init__(self, tokens: List[Tuple[str, object]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[Tuple[str, object]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, object]:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def parse(self):
+        tree = self.expression()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected token {self.peek()}")
+        return tree
+
+    def expression(self):
+        tree = self.term()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            operator = 'add' if self.take()[1] == '+' else 'sub'
+            tree = (operator, tree, self.term())
+        return tree
+
+    def term(self):
+        tree = self.juxtaposition()
+        while self.peek() in (('op', '*'), ('op', '/')):
+            operator = 'mul' if self.take()[1] == '*' else 'div'
+            tree = (operator, tree, self.juxtaposition())
+        return tree
+
+    def juxtaposition(self):
+        if self.peek() in (('op', '-'), ('op', '+')):
+            sign = self.take()[1]
+            tree = self.juxtaposition()
+            return ('neg', tree) if sign == '-' else tree
+        tree = self.power()
+        while self.starts_atom():
+            tree = ('mul', tree, self.power())
+        return tree
+
+    def starts_atom(self) -> bool:
+        token = self.peek()
+        return token is not None and (token[0] in ('number', 'identifier', 'function') or token == ('op', '('))
+
+    def power(self):
+        base = self.atom()
+        if self.peek() == ('op', '^'):
+            self.take()
+            if self.peek() == ('op', '-'):
+                self.take()
+                return ('pow', base, ('neg', self.atom()))
+            return ('pow', base, self.atom())
+        return base
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == 'number':
+            return ('num', value)
+        if kind == 'identifier':
+            return ('var', value)
+        if kind == 'function':
+            return ('call', value, self.power())
+        if (kind, value) == ('op', '('):
+            tree = self.expression()
+            if self.take() != ('op', ')'):
+                raise ValueError("Unbalanced parenthesis")
+            return tree
+        raise ValueError(f"Unexpected token {(kind, value)}")
+
+
+@lru_cache(maxsize=4096)
+def parse_expression(text: str):
+    """Expression tree of a Unicode math string (cached; trees are immutable tuples)"""
+    return ExpressionParser(tokenize(text.strip())).parse()
+
+
+def variables(tree) -> frozenset:
+    kind = tree[0]
+    if kind == 'var':
+        return frozenset([tree[1]])
+    if kind == 'num':
+        return frozenset()
+    if kind == 'call':
+        return variables(tree[2])
+    return frozenset().union(*(variables(child) for child in tree[1:]))
+
+
+def evaluate(tree, values: Dict[str, float]) -> float:
+    """Numeric value of a tree; raises ValueError / ZeroDivisionError / OverflowError outside its domain"""
+    kind = tree[0]
+    if kind == 'num':
+        return tree[1]
+    if kind == 'var':
+        return values[tree[1]]
+    if kind == 'neg':
+        return -evaluate(tree[1], values)
+    if kind == 'call':
+        return FUNCTIONS[tree[1]](evaluate(tree[2], values))
+    left, right = evaluate(tree[1], values), evaluate(tree[2], values)
+    if kind == 'add':
+        return left + right
+    if kind == 'sub':
+        return left - right
+    if kind == 'mul':
+        return left * right
+    if kind == 'div':
+        return left / right
+    result = left ** right
+    if isinstance(result, complex):
+        raise ValueError("Complex result")
+    return result
+
+
+# ==================== EQUIVALENCE ====================
+
+def sample_points(names: frozenset, count: int = 6, seed: int = 0) -> List[Dict[str, float]]:
+    """Random positive values for every variable (seeded, so verdicts are reproducible)"""
+    rng = random.Random(seed)
+    ordered = sorted(names)
+    return [{name: rng.uniform(0.5, 2.5) for name in ordered} for _ in range(count)]
+
+
+def paired_values(first, second, count: int = 6) -> List[Tuple[float, float]]:
+    pairs = []
+    for point in sample_points(variables(first) | variables(second), count):
+        try:
+            pairs.append((evaluate(first, point), evaluate(second, point)))
+        except (ValueError, ZeroDivisionError, OverflowError, KeyError):
+            continue
+    return pairs
+
+
+def equivalent(first, second, rel_tol: float = 1e-6, min_points: int = 3) -> bool:
+    """Whether two trees agree at random points"""
+    pairs = paired_values(first, second)
+    return len(pairs) >= min_points and all(math.isclose(a, b, rel_tol=rel_tol, abs_tol=1e-12) for a, b in pairs)
+
+
+def proportional(first, second, rel_tol: float = 1e-6, min_points: int = 3) -> bool:
+    """Whether two trees differ only by a constant non-zero factor (equivalent equations)"""
+    ratios = [a / b for a, b in paired_values(first, second) if abs(b) > 1e-12]
+    return (len(ratios) >= min_points and abs(ratios[0]) > 1e-12
+            and all(math.isclose(ratio, ratios[0], rel_tol=rel_tol) for ratio in ratios))
+
+
+# ==================== ANSWERS ====================
+
+def split_parts(text: str) -> List[str]:
+    """Separate answers such as 'ω₁ = …, ω₂ = …' at top-level commas, semicolons and 'and'"""
+    parts, depth, current = [], 0, ''
+    for char in text:
+        depth += char in '(['
+        depth -= char in ')]'
+        if depth == 0 and char in ',;':
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    parts.append(current)
+    return [piece.strip() for part in parts for piece in re.split(r'\band\b', part) if piece.strip()]
+
+
+def parse_sides(text: str) -> List:
+    """Parsed sides of 'a = b = c' (sides that do not parse are skipped)"""
+    sides = []
+    for side in re.split(r'[=≈]', text):
+        try:
+            sides.append(parse_expression(side))
+        except ValueError:
+            continue
+    return sides
+
+
+@lru_cache(maxsize=None)
+def reference_answer(problem_id: int) -> Tuple[Dict, ...]:
+    """Parsed reference parts for a symbolic problem (parsed once per process)
+
+    'ω = √(3g/L)' becomes a value part (the right-hand side); an equation
+    such as 'ẍ + (g/2a)x = 0' becomes an equation part (its residual).
+    """
+    answer = next(problem['answer'] for problem in challenging_problems if problem['id'] == problem_id)
+    parts = []
+    for part in split_parts(answer):
+        sides = part.split('=')
+        if len(sides) == 1:
+            parts.append({'kind': 'value', 'tree': parse_expression(part)})
+        elif parse_expression(sides[0])[0] == 'var':
+            parts.append({'kind': 'value', 'tree': parse_expression(sides[-1])})
+        else:
+            parts.append({'kind': 'equation', 'tree': ('sub', parse_expression(sides[0]), parse_expression(sides[-1]))})
+    return tuple(parts)
+
+
+def strip_answer_tail(segment: str) -> str:
+    """Segment without trailing sentence punctuation or a trailing unit: 'ω = √(3g/L) rad/s.' → 'ω = √(3g/L)'
+
+    The longest run of trailing words that the unit registry reads as a
+    unit is dropped, but only when what is left still parses, so a final
+    variable that happens to be a unit symbol (the g in 'αv_e/M - g') stays.
+    """
+    segment = segment.strip().rstrip(TRAILING_PUNCTUATION).rstrip()
+    words = segment.split()
+    for start in range(1, len(words)):
+        if parse_unit(' '.join(words[start:])) is None:
+            continue
+        remainder = ' '.join(words[:start])
+        try:
+            parse_expression(re.split(r'[=≈]', remainder)[-1])
+        except ValueError:
+            continue
+        return remainder
+    return segment
+
+
+def candidate_segments(response_text: str, tail_lines: int = 6) -> List[str]:
+    """Answer candidates: the last "Answer:" line, or else the last few lines of the derivation"""
+    if 'Answer:' in response_text:
+        lines = [response_text[response_text.rindex('Answer:') + len('Answer:'):].split('\n')[0]]
+    else:
+        lines = [line for line in response_text.strip().split('\n') if line.strip()][-tail_lines:]
+    segments = []
+    for line in lines:
+        line = re.sub(r'^[^:=]*:\s*', '', line) if ':' in line.split('=')[0] else line  # "Therefore: …"
+        segments.extend(strip_answer_tail(segment) for segment in split_parts(line))
+    return [segment for segment in segments if segment]
+
+
+def part_matches(part: Dict, segment_sides: List) -> bool:
+    if part['kind'] == 'value':
+        return any(equivalent(side, part['tree']) for side in segment_sides)
+    if len(segment_sides) < 2:
+        return False
+    return proportional(('sub', segment_sides[0], segment_sides[-1]), part['tree'])
+
+
+def verify_symbolic(response_text: str, problem_id: int) -> Dict:
+    """Check a response against the parsed reference answer of a symbolic problem
+
+    Every reference part (e.g. both ω₁ and ω₂ for problem 25) must be
+    matched by some candidate segment.
+    """
+    reference = reference_answer(problem_id)
+    candidates = [(segment, parse_sides(segment)) for segment in candidate_segments(response_text)]
+    candidates = [(segment, sides) for segment, sides in candidates if sides]
+
+    matched = []
+    for part in reference:
+        segment = next((segment for segment, sides in candidates if part_matches(part, sides)), None)
+        if segment is not None:
+            matched.append(segment)
+
+    return {
+        'parsed': bool(candidates),
+        'symbolic_match': len(matched) == len(reference),
+        'parts_matched': len(matched),
+        'parts_total': len(reference),
+        'expression': ', '.join(matched) if matched else (candidates[-1][0] if candidates else None)
+    }
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+適應性抽樣測試
+Adaptive Sampling tests: stopping decisions of the sequential linear vs non-linear comparison
+"""
+
+from adaptive_sampling import AdaptiveSampler
+
+
+def push_runs(sampler: AdaptiveSampler, problem_id: int, linear_times, nonlinear_times, accurate: bool = True,
+              first_run: int = 1):
+    for run, (linear, nonlinear) in enumerate(zip(linear_times, nonlinear_times), start=first_run):
+        for format_type, time in (('linear', linear), ('nonlinear', nonlinear)):
+            sampler.push({'problem_id': problem_id, 'format_type': format_type, 'run': run, 'success': True,
+                          'thinking_time': time, 'accuracy_analysis': {'accurate': accurate}})
+
+
+def test_clear_difference_stops():
+    sampler = AdaptiveSampler()
+    push_runs(sampler, 1, [1.00, 1.02, 0.98], [0.50, 0.52, 0.49])
+    decision = sampler.decision(1, min_runs=3)
+    assert decision['state'] == 'nonlinear_faster'
+    assert decision['p_nonlinear_faster'] > 0.95
+
+    push_runs(sampler, 2, [0.50, 0.52, 0.49], [1.00, 1.02, 0.98])
+    assert sampler.decision(2, min_runs=3)['state'] == 'linear_faster'
+
+
+def test_equivalent_times_stop():
+    sampler = AdaptiveSampler(equivalence=0.05)
+    push_runs(sampler, 1, [1.000, 1.002, 0.999, 1.001], [1.001, 0.999, 1.000, 1.002])
+    assert sampler.decision(1, min_runs=3)['state'] == 'equivalent'
+
+
+def test_uncertain_problem_keeps_sampling_until_the_limit():
+    sampler = AdaptiveSampler(max_runs=5, futility_z=0.0)
+    push_runs(sampler, 1, [1.0, 0.6, 1.4], [0.9, 1.3, 0.7])
+    assert sampler.decision(1, min_runs=3)['state'] == 'sampling'
+    assert sampler.next_runs([{'id': 1}], {1: 3}) == [({'id': 1}, 4)]
+
+    push_runs(sampler, 1, [1.1, 0.8], [1.2, 0.9], first_run=4)
+    assert sampler.decision(1, min_runs=3)['state'] == 'exhausted'
+    assert sampler.next_runs([{'id': 1}], {1: 3}) == []
+
+
+def test_futile_problem_stops_early():
+    sampler = AdaptiveSampler(max_runs=10, futility_z=1.0)
+    push_runs(sampler, 1, [1.0, 0.5, 1.5], [1.02, 1.5, 0.5])
+    assert sampler.decision(1, min_runs=3)['state'] == 'futile'
+
+
+def test_minimum_runs_and_summary():
+    sampler = AdaptiveSampler()
+    push_runs(sampler, 1, [1.0, 1.0], [0.5, 0.5])
+    assert sampler.decision(1, min_runs=3)['state'] == 'sampling'
+
+    push_runs(sampler, 2, [1.0, 1.0, 1.0], [0.5, 0.5, 0.5], accurate=False)
+    summary = sampler.summary({1: 3, 2: 3})
+    assert summary['total_runs'] == 5
+    assert set(summary['decisions']) == {1, 2}
+    assert 0.0 <= summary['decisions'][2]['p_nonlinear_more_accurate'] <= 1.0
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+答案一致性測試
+Answer Consistency tests: CV / stability, exact match and entropy against hand-computed values
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from answer_consistency import answer_codes, answer_fields, consistency_table
+
+
+def test_answer_fields_prefer_converted_value():
+    record = {'extracted_answer': {'success': True, 'value': 500.0}, 'accuracy_analysis': {'converted_value': 0.5}}
+    assert answer_fields(record) == (0.5, None)
+    assert answer_fields({'extracted_answer': {'success': True, 'value': 'v = g t'}}) == (None, 'v=gt')
+    assert answer_fields({'extracted_answer': {'success': False}}) == (None, None)
+
+
+def test_answer_codes_compare_numbers_at_exact_digits():
+    values = np.array([9.8, 9.80001, 9.9, np.nan, np.nan])
+    texts = np.array([None, None, None, 'v=gt', None], dtype=object)
+    codes = answer_codes(values, texts)
+    assert codes[0] == codes[1] != codes[2]
+    assert codes[3] not in codes[:3]
+    assert codes[4] == -1
+
+
+def test_numerical_group_measures():
+    table = consistency_table({'p': ([4.0, 6.0, 6.0], [None, None, None])})['p']
+    assert table['answers'] == 3 and table['numeric'] == 3 and table['distinct'] == 2
+    assert table['cv'] == pytest.approx(np.std([4, 6, 6], ddof=1) / (16 / 3))
+    assert table['stability'] == pytest.approx(1 - table['cv'])
+    assert table['exact_match'] == pytest.approx(2 / 3)
+    assert table['entropy'] == pytest.approx(-(2 / 3) * math.log2(2 / 3) - (1 / 3) * math.log2(1 / 3))
+
+
+def test_symbolic_group_has_no_stability_but_full_agreement():
+    table = consistency_table({'symbolic': ([None, None, None], ['v=gt', 'v=gt', 'v=gt'])})['symbolic']
+    assert table['cv'] is None
+    assert table['stability'] is None
+    assert table['exact_match'] == 1.0
+    assert table['entropy'] == 0.0
+
+
+def test_all_zero_answers_are_perfectly_stable():
+    table = consistency_table({'zero': ([0.0, 0.0], [None, None]), 'spread': ([-1.0, 1.0], [None, None])})
+    assert table['zero']['stability'] == 1.0
+    assert table['spread']['stability'] is None
+
+
+def test_groups_without_answers():
+    table = consistency_table({'empty': ([None], [None]), 'one': ([3.0], [None])})
+    assert table['empty']['exact_match'] is None and table['empty']['stability'] is None
+    assert table['one']['exact_match'] == 1.0 and table['one']['stability'] is None
+    assert consistency_table({}) == {}
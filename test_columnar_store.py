@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+欄式試驗資料庫測試
+Columnar Store tests: JSON Lines → Parquet export and filtered reads that match the source records
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from columnar_store import export_file, problem_summary, read_records, read_table, trial_dataset
+from trial_store import TrialReader, write_results
+
+
+def trial(problem_id, format_type, run, level, accurate, thinking_time, timestamp, ttft=None):
+    record = {'problem_id': problem_id, 'format_type': format_type, 'run_number': run, 'difficulty_level': level,
+              'success': True, 'raw_time': thinking_time + 0.2, 'baseline_time': 0.2, 'thinking_time': thinking_time,
+              'tokens_used': 40 + run, 'timestamp': timestamp, 'response': f'Answer: {problem_id} m',
+              'accuracy_analysis': {'accurate': accurate, 'unit_match': True, 'relative_error': 0.01,
+                                    'extracted_value': float(problem_id), 'expected_value': float(problem_id)}}
+    if ttft is not None:
+        record['time_to_first_token'] = ttft
+    return record
+
+
+def write_run(path, records):
+    write_results(str(path), {'experiment_info': {}, 'linear': [r for r in records if r['format_type'] == 'linear'],
+                              'nonlinear': [r for r in records if r['format_type'] == 'nonlinear']})
+    return str(path)
+
+
+def test_round_trip_with_filtered_reads(tmp_path):
+    medium = [trial(11, 'linear', 1, 'medium', True, 1.5, '2025-09-15T17:43:31'),
+              trial(11, 'nonlinear', 1, 'medium', False, 1.1, '2025-09-15T17:43:35', ttft=0.3),
+              trial(12, 'linear', 2, 'medium', True, 1.7, '2025-09-16T09:00:00')]
+    simple = [trial(1, 'linear', 1, 'simple', True, 0.9, '2025-09-15T18:20:47')]
+    root = str(tmp_path / 'parquet')
+    medium_path = write_run(tmp_path / 'problem_11_20_results_a.jsonl', medium)
+    assert export_file(medium_path, root) == 3
+    assert export_file(write_run(tmp_path / 'new_problem_1_10_results_b.jsonl', simple), root) == 1
+    assert export_file(medium_path, root) == 3   # re-export overwrites instead of duplicating
+    assert trial_dataset(root).count_rows() == 4
+
+    columns = ['problem_id', 'format_type', 'run', 'thinking_time', 'time_to_first_token', 'accurate', 'extracted_value']
+    read = sorted(read_records(root, columns, level='medium'), key=lambda r: (r['problem_id'], r['format_type']))
+    source = sorted(TrialReader(medium_path), key=lambda r: (r['problem_id'], r['format_type']))
+    assert len(read) == len(source)
+    for row, record in zip(read, source):
+        assert row['problem_id'] == record['problem_id'] and row['format_type'] == record['format_type']
+        assert row['run'] == record['run_number']
+        assert row['thinking_time'] == record['thinking_time']
+        assert row.get('time_to_first_token') == record.get('time_to_first_token')
+        assert row['accuracy_analysis']['accurate'] == record['accuracy_analysis']['accurate']
+        assert row['extracted_answer'] == {'success': True, 'value': record['accuracy_analysis']['extracted_value']}
+
+    assert [r['problem_id'] for r in read_records(root, ['problem_id'], level='medium', format_type='nonlinear')] == [11]
+    assert [r['problem_id'] for r in read_records(root, ['problem_id'], since='2025-09-16')] == [12]
+    assert read_table(root, ['problem_id'], run_id='new_problem_1_10_results_b').num_rows == 1
+
+
+def test_partition_pruning_and_summary(tmp_path):
+    root = str(tmp_path / 'parquet')
+    export_file(write_run(tmp_path / 'problem_21_30_results_c.jsonl',
+                          [trial(21, 'linear', run, 'challenging', run % 2 == 0, 2.0 + run, '2025-09-15T17:56:37')
+                           for run in range(1, 5)]), root)
+    partitions = sorted(os.listdir(os.path.join(root, 'difficulty_level=challenging')))
+    assert partitions == ['format_type=linear']
+    assert read_table(root, level='simple').num_rows == 0
+
+    summary = problem_summary(read_table(root, level='challenging'))
+    row = summary[(21, 'linear')]
+    assert row['trials'] == 4
+    assert row['thinking_time_mean'] == pytest.approx(4.5)
+    assert row['accurate_rate_mean'] == pytest.approx(0.5)
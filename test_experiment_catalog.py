@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+實驗目錄測試
+Experiment Catalog tests: deterministic latest-run choice, pins and configurable result directories
+"""
+
+import os
+
+import pytest
+
+from experiment_catalog import ExperimentCatalog, get_experiment_catalog, parse_pins
+from trial_store import write_results
+
+START = '2025-09-15T17:43:31'
+
+
+def write_run(directory, name, mtime, start_time=START):
+    path = str(directory / name)
+    trial = {'problem_id': 11, 'format_type': 'linear', 'difficulty_level': 'medium', 'success': True, 'thinking_time': 0.5}
+    write_results(path, {'experiment_info': {'start_time': start_time, 'model': 'gpt-3.5-turbo'}, 'linear': [trial], 'nonlinear': []})
+    os.utime(path, (mtime, mtime))
+    return os.path.abspath(path)
+
+
+def test_same_start_time_prefers_corrected_then_newer_file(tmp_path):
+    results = tmp_path / 'results'
+    results.mkdir()
+    corrected = write_run(results, 'problem_11_20_results_20250915_174331_THINKING_FIXED_20250915_182744.jsonl', 1000)
+    raw = write_run(results, 'problem_11_20_results_20250915_174331.jsonl', 2000)
+    catalog = ExperimentCatalog(str(tmp_path / 'catalog.sqlite'))
+    assert len(catalog.index_paths(directories=[str(results)])) == 2
+
+    assert catalog.latest_runs_by_level(levels=('medium',)) == {'medium': corrected}
+    assert [run['path'] for run in catalog.runs('medium')] == [corrected, raw]
+
+    rerun = write_run(results, 'problem_11_20_results_rerun.jsonl', 3000)
+    older = write_run(results, 'problem_11_20_results_copy.jsonl', 2500)
+    catalog.index_paths(directories=[str(results)])
+    assert [run['path'] for run in catalog.runs('medium')] == [corrected, rerun, older, raw]
+
+    newer = write_run(results, 'problem_11_20_results_20250916.jsonl', 500, start_time='2025-09-16T09:00:00')
+    catalog.index_paths(directories=[str(results)])
+    assert catalog.latest_run('medium')['path'] == newer
+
+
+def test_pins_and_result_directories(tmp_path, monkeypatch):
+    results = tmp_path / 'results'
+    results.mkdir()
+    raw = write_run(results, 'problem_11_20_results_20250915_174331.jsonl', 1000)
+    write_run(results, 'problem_11_20_results_20250915_174331_THINKING_FIXED_20250915_182744.jsonl', 1000)
+    monkeypatch.setenv('EXPERIMENT_CATALOG_PATH', str(tmp_path / 'catalog.sqlite'))
+    monkeypatch.setenv('EXPERIMENT_RESULTS_DIRS', str(results))
+    monkeypatch.chdir(tmp_path)
+    catalog = get_experiment_catalog()
+
+    pins = parse_pins(['medium=problem_11_20_results_20250915_174331'])
+    assert catalog.latest_runs_by_level(levels=('medium',), pins=pins) == {'medium': raw}
+    assert catalog.latest_runs_by_level(levels=('medium',), pins={'medium': raw}) == {'medium': raw}
+    with pytest.raises(ValueError):
+        catalog.resolve_run('no_such_run')
+    with pytest.raises(ValueError):
+        parse_pins(['medium'])
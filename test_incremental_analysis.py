@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+增量分析測試
+Incremental Analysis tests: statistics match a direct computation, and the cache only parses new content
+"""
+
+import json
+
+import pytest
+
+from incremental_analysis import (AnalysisCache, by_level, format_totals, level_curves, mean, merge_stats,
+                                  stats_from_records, stdev)
+from trial_store import header_record, trial_line
+
+
+def trial(problem_id: int, format_type: str, run: int, time: float, value: float, accurate: bool = True) -> dict:
+    return {
+        'problem_id': problem_id, 'format_type': format_type, 'run': run, 'success': True,
+        'difficulty_level': 'simple', 'thinking_time': time, 'time_to_first_token': time / 4,
+        'response': f"Given 12 m ... Answer: {value} m",
+        'extracted_answer': {'success': True, 'value': value, 'unit': 'm'},
+        'accuracy_analysis': {'accurate': accurate, 'expected_value': 10.0, 'unit_match': True}
+    }
+
+
+TRIALS = [trial(1, format_type, run, 0.5 + 0.1 * run + (format_type == 'linear') * 0.2, 10.0 + run * 0.5, run != 2)
+          for run in (1, 2, 3) for format_type in ('linear', 'nonlinear')]
+
+
+def write_jsonl(path, trials, header: bool = True):
+    with open(path, 'a', encoding='utf-8') as f:
+        if header:
+            f.write(json.dumps(header_record()) + '\n')
+        for record in trials:
+            f.write(trial_line(record))
+
+
+def test_statistics_match_direct_computation():
+    level = by_level(stats_from_records(TRIALS))['simple']
+    linear = level[(1, 'linear')]
+    times = [record['thinking_time'] for record in TRIALS if record['format_type'] == 'linear']
+    assert linear['trials'] == 3 and linear['accurate'] == 2
+    assert mean(linear, 'time') == pytest.approx(sum(times) / 3)
+    assert stdev(linear, 'time') == pytest.approx(0.1)
+    assert linear['samples']['run'] == [1, 2, 3]
+    assert linear['samples']['answer'] == [10.5, 11.0, 11.5]
+    assert format_totals(level, 'nonlinear')['trials'] == 3
+    assert level_curves(level)['linear']['trials'] == 3
+
+
+def test_merge_equals_single_pass():
+    merged = merge_stats([stats_from_records(TRIALS[:3]), stats_from_records(TRIALS[3:])])
+    direct = stats_from_records(TRIALS)
+    assert merged.keys() == direct.keys()
+    for key, entry in direct.items():
+        for field, value in entry.items():
+            assert merged[key][field] == (pytest.approx(value) if isinstance(value, float) else value)
+
+
+def test_cache_parses_only_new_lines(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    write_jsonl(path, TRIALS[:4])
+    cache = AnalysisCache(str(tmp_path / 'cache.sqlite'))
+
+    first = cache.file_stats(path)
+    assert cache.parsed_trials == 4
+    assert cache.file_stats(path) == first
+    assert cache.parsed_trials == 4
+
+    write_jsonl(path, TRIALS[4:], header=False)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"record_type": "trial", "problem_id"')   # partial line of a trial still being written
+    grown = cache.file_stats(path)
+    assert cache.parsed_trials == 6
+    assert grown == stats_from_records(TRIALS)
+
+    # A fresh cache object on the same database reuses the stored statistics
+    reopened = AnalysisCache(str(tmp_path / 'cache.sqlite'))
+    assert reopened.file_stats(path) == grown
+    assert reopened.parsed_trials == 0
+
+
+def test_rewritten_file_is_parsed_again(tmp_path):
+    path = tmp_path / 'run.jsonl'
+    write_jsonl(str(path), TRIALS)
+    cache = AnalysisCache(str(tmp_path / 'cache.sqlite'))
+    cache.file_stats(str(path))
+    path.write_text('')
+    write_jsonl(str(path), TRIALS[:2])
+    assert cache.file_stats(str(path)) == stats_from_records(TRIALS[:2])
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+配對 bootstrap 測試
+Paired Bootstrap tests: run alignment, degenerate intervals and agreement with a plain resampling loop
+"""
+
+import numpy as np
+import pytest
+
+from baseline_service import bootstrap_ci
+from paired_bootstrap import (bootstrap_intervals, format_interval, improvements, paired_samples, percentile_interval,
+                              resample_indices)
+
+
+def entry(runs, times, accurate, answers):
+    return {'samples': {'run': runs, 'time': times, 'accurate': accurate, 'answer': answers,
+                        'answer_text': [None] * len(runs)}}
+
+
+def test_paired_samples_align_by_run():
+    level = {
+        (1, 'linear'): entry([3, 1, 2], [1.3, 1.1, 1.2], [True, False, True], [5.0, 5.0, None]),
+        (1, 'nonlinear'): entry([1, 2], [0.6, 0.7], [True, True], [5.0, 5.1]),
+        (2, 'linear'): entry([1], [1.0], [True], [1.0])
+    }
+    problems = paired_samples(level)
+    assert list(problems) == [1]
+    assert problems[1]['linear_time'].tolist() == [1.1, 1.2]
+    assert problems[1]['nonlinear_time'].tolist() == [0.6, 0.7]
+    assert problems[1]['linear_accurate'].tolist() == [0.0, 1.0]
+    assert np.isnan(problems[1]['linear_answer'][1])
+
+
+def test_improvements_point_values():
+    stacked = {
+        'linear_time': np.array([[1.0, 1.0]]), 'nonlinear_time': np.array([[0.5, 0.5]]),
+        'linear_accurate': np.array([[0.0, 1.0]]), 'nonlinear_accurate': np.array([[1.0, 1.0]]),
+        'linear_answer': np.array([[4.0, 6.0]]), 'nonlinear_answer': np.array([[5.0, 5.0]])
+    }
+    metrics = improvements(stacked)
+    assert metrics['speed_improvement'][0] == pytest.approx(50.0)
+    assert metrics['accuracy_improvement'][0] == pytest.approx(50.0)
+    assert metrics['stability_improvement'][0] == pytest.approx(np.sqrt(2) / 5)
+
+
+def test_constant_runs_give_zero_width_intervals():
+    samples = {'simple': {1: {'linear_time': np.full(3, 1.0), 'nonlinear_time': np.full(3, 0.8),
+                              'linear_accurate': np.ones(3), 'nonlinear_accurate': np.ones(3),
+                              'linear_answer': np.full(3, 5.0), 'nonlinear_answer': np.full(3, 5.0)}}}
+    intervals = bootstrap_intervals(samples, resamples=200)
+    assert intervals['simple']['problems'][1]['speed_improvement'] == pytest.approx((20.0, 20.0))
+    assert intervals['simple']['level']['accuracy_improvement'] == (0.0, 0.0)
+
+
+def test_matches_a_plain_resampling_loop():
+    rng = np.random.default_rng(7)
+    problem = {'linear_time': rng.lognormal(0, 0.3, 8), 'nonlinear_time': rng.lognormal(-0.2, 0.3, 8),
+               'linear_accurate': rng.integers(0, 2, 8).astype(float), 'nonlinear_accurate': np.ones(8),
+               'linear_answer': rng.normal(5, 0.5, 8), 'nonlinear_answer': rng.normal(5, 0.2, 8)}
+    low, high = bootstrap_intervals({'medium': {11: problem}}, resamples=20000, seed=1)['medium']['problems'][11]['speed_improvement']
+
+    speeds = []
+    for _ in range(20000):
+        index = rng.integers(0, 8, 8)
+        linear, nonlinear = problem['linear_time'][index].mean(), problem['nonlinear_time'][index].mean()
+        speeds.append((linear - nonlinear) / linear * 100)
+    expected_low, expected_high = np.quantile(speeds, [0.025, 0.975])
+    assert low == pytest.approx(expected_low, abs=1.5)
+    assert high == pytest.approx(expected_high, abs=1.5)
+
+
+def test_format_interval():
+    assert format_interval(None) == ""
+    assert format_interval((-1.26, 3.0)) == "[-1.3, +3.0]"
+    assert format_interval((0.0126, 0.5), 3) == "[+0.013, +0.500]"
+
+
+def test_stability_is_undefined_without_two_numerical_answers():
+    stacked = {
+        'linear_time': np.ones((2, 2)), 'nonlinear_time': np.ones((2, 2)),
+        'linear_accurate': np.ones((2, 2)), 'nonlinear_accurate': np.ones((2, 2)),
+        'linear_answer': np.array([[np.nan, np.nan], [0.0, 0.0]]), 'nonlinear_answer': np.array([[np.nan, np.nan], [0.0, 0.0]])
+    }
+    stability = improvements(stacked)['stability_improvement']
+    assert np.isnan(stability[0])
+    assert stability[1] == 0.0
+
+    symbolic = {'linear_time': np.ones(3), 'nonlinear_time': np.full(3, 0.5),
+                'linear_accurate': np.ones(3), 'nonlinear_accurate': np.ones(3),
+                'linear_answer': np.full(3, np.nan), 'nonlinear_answer': np.full(3, np.nan)}
+    numeric = {'linear_time': np.ones(3), 'nonlinear_time': np.ones(3),
+               'linear_accurate': np.ones(3), 'nonlinear_accurate': np.ones(3),
+               'linear_answer': np.full(3, 4.0), 'nonlinear_answer': np.full(3, 4.0)}
+    intervals = bootstrap_intervals({'challenging': {21: symbolic, 22: numeric}}, resamples=200)['challenging']
+    assert intervals['problems'][21]['stability_improvement'] is None
+    assert intervals['problems'][21]['speed_improvement'] == pytest.approx((50.0, 50.0))
+    assert intervals['level']['stability_improvement'] == (0.0, 0.0)
+
+
+def test_shared_resampling_helpers():
+    indices, in_range = resample_indices([3, 1], resamples=50, seed=4)
+    assert indices.shape == (2, 50, 3) and in_range.shape == (2, 1, 3)
+    assert indices[0].max() == 2 and (indices[1] == 0).all()
+    assert in_range[0].all() and in_range[1].tolist() == [[True, False, False]]
+    assert (resample_indices([3, 1], resamples=50, seed=4)[0] == indices).all()
+
+    assert percentile_interval(np.array([np.nan, np.nan])) is None
+    assert percentile_interval(np.arange(101.0), confidence=0.9) == pytest.approx((5.0, 95.0))
+
+
+def test_baseline_interval_uses_the_shared_helpers():
+    latencies = [0.9, 1.0, 1.1, 1.2, 1.6]
+    indices, _ = resample_indices([5], resamples=500, seed=2)
+    expected = percentile_interval(np.median(np.array(latencies)[indices[0]], axis=1))
+    assert bootstrap_ci(latencies, resamples=500, seed=2) == pytest.approx(expected)
+    assert bootstrap_ci([1.3]) == (1.3, 1.3)
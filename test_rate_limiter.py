@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+速率限制器測試
+Rate Limiter tests: 429 back-off and quota updates from the headers of successful responses
+"""
+
+import asyncio
+
+import openai
+from aiohttp import web
+
+from async_dispatcher import AsyncTrialDispatcher
+from llm_backend import OpenAIBackend
+from rate_limiter import RateLimiter, parse_reset_seconds
+from retry_policy import RetryPolicy
+
+
+def test_parse_reset_seconds():
+    assert parse_reset_seconds('6m0s') == 360.0
+    assert parse_reset_seconds('250ms') == 0.25
+    assert parse_reset_seconds('1.5') == 1.5
+    assert parse_reset_seconds('') == 0.0
+
+
+def test_rate_limited_halves_capacity_and_pauses():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000)
+    limiter.on_rate_limited({'Retry-After': '2'})
+    assert limiter.request_bucket.capacity == 50
+    assert limiter.token_bucket.capacity == 500
+    assert limiter._reserve(0) > 1.5
+
+
+def test_headers_set_ceiling_without_undoing_backoff():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000)
+    limiter.on_rate_limited()
+    limiter.update_from_headers({'x-ratelimit-limit-requests': '400', 'x-ratelimit-remaining-requests': '3'})
+    assert limiter.max_requests_per_minute == 400
+    assert limiter.request_bucket.capacity == 50
+    assert limiter.request_bucket.available <= 3
+
+    limiter.update_from_headers({'X-RateLimit-Limit-Tokens': '200'})
+    assert limiter.token_bucket.capacity == 200
+
+
+def test_dispatcher_reads_headers_of_successful_responses():
+    completion = {
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-3.5-turbo',
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': 'Answer: 1 m'}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 5, 'completion_tokens': 5, 'total_tokens': 10}
+    }
+
+    async def chat_completions(request):
+        return web.json_response(completion, headers={'x-ratelimit-limit-requests': '60',
+                                                      'x-ratelimit-remaining-requests': '7',
+                                                      'x-ratelimit-limit-tokens': '5000'})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', chat_completions)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        api_base, api_key = openai.api_base, openai.api_key
+        openai.api_base, openai.api_key = f'http://127.0.0.1:{port}/v1', 'test'
+        limiter = RateLimiter(requests_per_minute=3500, tokens_per_minute=90000)
+        try:
+            dispatcher = AsyncTrialDispatcher(max_concurrency=2, rate_limiter=limiter, backend=OpenAIBackend(),
+                                              retry_policy=RetryPolicy(max_attempts=1))
+            request = {'model': 'gpt-3.5-turbo', 'messages': [{'role': 'user', 'content': 'hi'}], 'max_tokens': 10}
+            outcomes = await dispatcher.dispatch_all([{'request': request}, {'request': request}])
+        finally:
+            openai.api_base, openai.api_key = api_base, api_key
+            await runner.cleanup()
+        return limiter, outcomes
+
+    limiter, outcomes = asyncio.run(scenario())
+    assert all(outcome['error'] is None for outcome in outcomes)
+    assert limiter.max_requests_per_minute == 60
+    assert limiter.request_bucket.capacity == 60
+    assert limiter.request_bucket.available <= 7
+    assert limiter.max_tokens_per_minute == 5000
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+離線重新評分測試
+Offline Re-scoring tests: streamed rewrite, atomic replacement and recomputed analysis
+"""
+
+import os
+
+from rescore_results import rescore_file
+from trial_store import TrialReader, write_results
+
+
+def trial(problem_id, format_type, run, response):
+    return {'problem_id': problem_id, 'format_type': format_type, 'run_number': run, 'difficulty_level': 'simple',
+            'success': True, 'thinking_time': 0.5 + run / 10, 'response': response,
+            'extracted_answer': {'success': False}, 'accuracy_analysis': {'accurate': False}}
+
+
+def test_rescore_in_place_streams_and_replaces(tmp_path, monkeypatch):
+    monkeypatch.setattr('rescore_results.RESCORE_CHUNK', 2)
+    records = [trial(1, format_type, run, 'The answer is 2 m/s.') for format_type in ('linear', 'nonlinear')
+               for run in range(1, 4)]
+    path = str(tmp_path / 'new_problem_1_10_results_a.jsonl')
+    write_results(path, {'experiment_info': {'model': 'gpt-3.5-turbo'},
+                         'linear': records[:3], 'nonlinear': records[3:]}, analysis={'stale': True})
+
+    summary = rescore_file(path, {'tolerance': {}, 'extractor': {}}, str(tmp_path), in_place=True)
+    assert summary['output'] == path
+    assert summary['records'] == 6
+    assert sorted(os.listdir(tmp_path)) == ['new_problem_1_10_results_a.jsonl']
+
+    reader = TrialReader(path)
+    assert reader.header['experiment_info']['rescoring']['changed_verdicts'] == summary['changed_verdicts']
+    assert reader.header['experiment_info']['model'] == 'gpt-3.5-turbo'
+    rescored = list(reader)
+    assert [record['run_number'] for record in rescored] == [1, 2, 3, 1, 2, 3]
+    assert all(record['response'] == 'The answer is 2 m/s.' for record in rescored)
+    assert all(record['extracted_answer'] != {'success': False} for record in rescored)
+    assert 'stale' not in reader.analysis
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+回應快取測試
+Response Cache tests: key scope, cache modes and the mock-backend bypass
+"""
+
+from openai.openai_object import OpenAIObject
+
+from experiment_engine import ExperimentEngine
+from experiment_problems import load_problems
+from llm_backend import MockBackend
+from response_cache import ResponseCache, cache_key, get_response_cache
+
+REQUEST = {'model': 'gpt-3.5-turbo', 'messages': [{'role': 'user', 'content': 'hello'}],
+           'temperature': 0.1, 'max_tokens': 50, 'request_timeout': 30}
+RESPONSE = OpenAIObject.construct_from({'choices': [{'message': {'content': 'Answer: 3 m/s'}}],
+                                        'usage': {'total_tokens': 12}})
+
+
+def test_cache_key_scope():
+    key = cache_key(REQUEST)
+    assert key == cache_key(dict(REQUEST, request_timeout=60))
+    assert key != cache_key(REQUEST, sample=1)
+    assert key != cache_key(REQUEST, backend='mock')
+    assert key != cache_key(REQUEST, api_base='http://127.0.0.1:8001/v1')
+    assert key != cache_key(dict(REQUEST, max_tokens=100))
+
+
+def test_use_mode_round_trip(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), mode='use')
+    assert cache.get(REQUEST) is None
+    cache.put(REQUEST, RESPONSE, raw_time=0.8)
+    hit = cache.get(REQUEST)
+    assert hit['raw_time'] == 0.8
+    assert hit['response'].choices[0].message.content == 'Answer: 3 m/s'
+    assert cache.get(REQUEST, api_base='http://127.0.0.1:8001/v1') is None
+    assert (cache.hits, cache.misses, cache.writes) == (1, 2, 1)
+
+
+def test_refresh_and_bypass_modes(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    ResponseCache(path, mode='use').put(REQUEST, RESPONSE, raw_time=0.8)
+    assert ResponseCache(path, mode='refresh').get(REQUEST) is None
+    bypass = ResponseCache(path, mode='bypass')
+    bypass.put(dict(REQUEST, max_tokens=1), RESPONSE, raw_time=0.1)
+    assert bypass.get(REQUEST) is None
+    assert ResponseCache(path, mode='use').get(dict(REQUEST, max_tokens=1)) is None
+
+
+def test_mock_backend_never_uses_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('RESPONSE_CACHE_PATH', str(tmp_path / 'cache.sqlite'))
+    assert get_response_cache('use', backend='mock').mode == 'bypass'
+    assert get_response_cache('use', backend='openai').mode == 'use'
+
+    engine = ExperimentEngine(backend=MockBackend(), response_cache=ResponseCache(str(tmp_path / 'shared.sqlite'), mode='use'))
+    assert engine.response_cache.mode == 'bypass'
+
+
+def test_default_engine_does_not_read_the_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.sqlite')
+    monkeypatch.setenv('RESPONSE_CACHE_PATH', path)
+    monkeypatch.delenv('RESPONSE_CACHE_MODE', raising=False)
+    engine = ExperimentEngine()
+    trial = engine.build_trial(load_problems([1])[0], 'linear', 1)
+    ResponseCache(path, mode='use').put(trial['request'], RESPONSE, raw_time=0.8, sample=1,
+                                        backend=engine.backend.name, api_base=engine.backend.api_base)
+
+    assert engine.response_cache.mode == 'bypass'
+    assert engine.cached_outcome(trial) is None
+    assert get_response_cache().mode == 'bypass'
+    assert get_response_cache('use').get(trial['request'], sample=1, backend=engine.backend.name,
+                                         api_base=engine.backend.api_base) is not None
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+即時統計測試
+Running Stats tests: streaming accumulators against direct computations
+"""
+
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+from running_stats import AccuracyCounter, LiveProgress, P2Quantile, RunningStats, t_quantile
+
+
+def test_welford_matches_statistics_and_merges():
+    rng = random.Random(1)
+    values = [1e6 + rng.gauss(0, 1) for _ in range(500)]   # large offset: the naive sum-of-squares formula loses precision
+    stats = RunningStats.of(values)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values), rel=1e-9)
+    assert (stats.min, stats.max) == (min(values), max(values))
+
+    merged = RunningStats.of(values[:123]).merge(RunningStats.of(values[123:]))
+    assert merged.count == 500
+    assert merged.mean == pytest.approx(stats.mean)
+    assert merged.variance == pytest.approx(stats.variance, rel=1e-9)
+
+
+def test_small_samples():
+    assert RunningStats().mean_ci() is None
+    assert RunningStats.of([2.0]).variance == 0.0
+    assert RunningStats.of([2.0]).mean_ci() is None
+
+
+def test_t_quantile():
+    # Reference values of the two-sided 95% Student t critical value
+    assert t_quantile(0.95, 2) == pytest.approx(4.303, rel=0.05)
+    assert t_quantile(0.95, 10) == pytest.approx(2.228, rel=0.005)
+    assert t_quantile(0.95, 100) == pytest.approx(1.984, rel=0.001)
+
+
+def test_wilson_interval():
+    counter = AccuracyCounter()
+    assert counter.wilson_ci() is None
+    for hit in [True] * 8 + [False] * 2:
+        counter.push(hit)
+    low, high = counter.wilson_ci()
+    assert counter.rate == 0.8
+    assert low == pytest.approx(0.4902, abs=1e-3) and high == pytest.approx(0.9433, abs=1e-3)
+
+    perfect = AccuracyCounter()
+    for _ in range(5):
+        perfect.push(True)
+    assert perfect.wilson_ci()[1] == 1.0
+
+
+@pytest.mark.parametrize('p', [0.5, 0.9])
+def test_p2_quantile_tracks_the_sample_quantile(p):
+    rng = np.random.default_rng(3)
+    values = rng.lognormal(0, 0.5, 5000)
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.push(float(value))
+    assert estimator.value == pytest.approx(np.quantile(values, p), rel=0.03)
+
+    few = P2Quantile(p)
+    assert few.value is None
+    for value in (3.0, 1.0, 2.0):
+        few.push(value)
+    assert few.value in (1.0, 2.0, 3.0)
+
+
+def test_live_progress_snapshot():
+    progress = LiveProgress()
+    for index in range(6):
+        progress.push({'format_type': 'linear', 'success': True, 'thinking_time': 0.5 + index * 0.1,
+                       'accuracy_analysis': {'accurate': index % 2 == 0}})
+    progress.push({'format_type': 'nonlinear', 'success': False})
+    snapshot = progress.snapshot()
+    assert snapshot['linear']['trials'] == 6 and snapshot['linear']['accuracy'] == 0.5
+    assert snapshot['nonlinear']['failed'] == 1
+    assert 'linear' in progress.render()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+符號答案驗證測試
+Symbolic Verification tests: parsing, equivalence and the answer lines models actually write
+"""
+
+import pytest
+
+from symbolic_verification import equivalent, parse_expression, strip_answer_tail, verify_symbolic
+
+
+def test_parser_conventions():
+    assert equivalent(parse_expression('g/2a'), parse_expression('g/(2*a)'))
+    assert equivalent(parse_expression('2kd²/mL²'), parse_expression('(2*k*d^2)/(m*L^2)'))
+    assert equivalent(parse_expression('½(⅓ML² + md²)ω²'), parse_expression('0.5*(M*L^2/3 + m*d^2)*ω^2'))
+    assert not equivalent(parse_expression('√(3g/L)'), parse_expression('√(2g/L)'))
+    with pytest.raises(ValueError):
+        parse_expression('√(3g/L) @')
+
+
+@pytest.mark.parametrize('response, problem_id', [
+    ('Answer: ω = √(3g/L)', 30),
+    ('Answer: ω = √(3g/L).', 30),
+    ('Answer: ω = √(3g/L) rad/s', 30),
+    ('Answer: ω = √(3g/L) rad/s.', 30),
+    ('Answer: a = (2/3)g sin θ m/s²', 22),
+    ('Answer: a = (2/3)g sin θ。', 22),
+    ('Answer: a = αv_e/M - g', 27),
+    ('Answer: ω₁ = √(g/L) rad/s, ω₂ = √(g/L + 2kd²/mL²) rad/s.', 25),
+    ('Answer: ẍ + (g/2a)x = 0.', 28),
+    ('Answer: 2ẍ + (g/a)x = 0', 28),
+    ('Answer: ½(⅓ML² + md²)ω² J', 21),
+])
+def test_correct_answers_match(response, problem_id):
+    assert verify_symbolic(response, problem_id)['symbolic_match']
+
+
+@pytest.mark.parametrize('response, problem_id', [
+    ('Answer: ω = √(2g/L) rad/s', 30),
+    ('Answer: a = g sin θ m/s²', 22),
+    ('Answer: ω₁ = √(g/L) rad/s', 25),
+])
+def test_wrong_answers_do_not_match(response, problem_id):
+    assert not verify_symbolic(response, problem_id)['symbolic_match']
+
+
+def test_strip_answer_tail_keeps_variables_named_like_units():
+    assert strip_answer_tail('ω = √(3g/L) rad/s.') == 'ω = √(3g/L)'
+    assert strip_answer_tail('a = αv_e/M - g') == 'a = αv_e/M - g'
+    assert strip_answer_tail('a = αv_e/M - g m/s²') == 'a = αv_e/M - g'
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+試驗結果格式測試
+Trial Store tests: schema round trip, legacy layouts and rejection of newer schema versions
+"""
+
+import json
+
+import pytest
+
+from trial_store import SCHEMA_VERSION, TrialReader, load_results, read_trials, validate_trial, write_results
+
+TRIALS = [
+    {'problem_id': 1, 'format_type': 'linear', 'success': True, 'thinking_time': 0.5},
+    {'problem_id': 1, 'format_type': 'nonlinear', 'success': True, 'thinking_time': 0.4},
+    {'problem_id': 2, 'format_type': 'linear', 'success': False, 'thinking_time': 0.0}
+]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    results = {'experiment_info': {'runs': 1}, 'linear': TRIALS[::2], 'nonlinear': TRIALS[1:2]}
+    assert write_results(path, results, analysis={'summary': 'ok'}) == 3
+    reader = TrialReader(path)
+    assert reader.header['schema_version'] == SCHEMA_VERSION
+    assert reader.header['experiment_info'] == {'runs': 1}
+    assert reader.analysis == {'summary': 'ok'}
+    assert sorted(list(reader), key=lambda r: (r['problem_id'], r['format_type'])) == TRIALS
+    assert load_results(path)['linear'] == TRIALS[::2]
+
+
+def test_legacy_json_and_journal(tmp_path):
+    legacy = tmp_path / 'results.json'
+    legacy.write_text(json.dumps({'results': {'experiment_info': {}, 'linear': TRIALS[::2], 'nonlinear': TRIALS[1:2]}}))
+    assert len(list(read_trials(str(legacy)))) == 3
+    assert TrialReader(str(legacy)).header['schema_version'] == 0
+
+    journal = tmp_path / 'journal.jsonl'
+    journal.write_text(''.join(json.dumps(trial) + '\n' for trial in TRIALS) + '{broken\n')
+    assert list(read_trials(str(journal))) == TRIALS
+
+
+def test_newer_schema_is_rejected_by_every_reader(tmp_path):
+    path = tmp_path / 'future.jsonl'
+    header = {'record_type': 'header', 'schema': 'phiscript.trials', 'schema_version': SCHEMA_VERSION + 1}
+    path.write_text(json.dumps(header) + '\n' + json.dumps(dict(TRIALS[0], record_type='trial')) + '\n')
+    with pytest.raises(ValueError):
+        TrialReader(str(path)).header
+    with pytest.raises(ValueError):
+        list(read_trials(str(path)))
+    with pytest.raises(ValueError):
+        load_results(str(path))
+
+
+def test_validate_trial():
+    with pytest.raises(ValueError):
+        validate_trial({'problem_id': 1, 'format_type': 'linear'})
+    with pytest.raises(ValueError):
+        validate_trial({'problem_id': 1, 'format_type': 'circular', 'success': True})
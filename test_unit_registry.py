@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+單位登錄表測試
+Unit Registry tests: compound unit parsing, prefixes and commensurability
+"""
+
+import pytest
+
+from answer_extraction import unit_alias_table, unit_conversion
+from unit_registry import conversion_factor, convert, parse_unit
+
+
+@pytest.mark.parametrize('text', ['m/s²', 'm/s/s', 'm/s^2', 'm·s⁻²', 'm s^-2', 'm/s2'])
+def test_acceleration_spellings(text):
+    assert parse_unit(text) == parse_unit('m/s²')
+
+
+def test_prefixes_and_names():
+    assert convert(7.5, 'kN', 'N') == pytest.approx(7500)
+    assert convert(36, 'km/h', 'm/s') == pytest.approx(10)
+    assert convert(2, 'kilojoules', 'J') == pytest.approx(2000)
+    assert convert(1, 'atm', 'kPa') == pytest.approx(101.325)
+    assert parse_unit('furlongs') is None
+    assert parse_unit('') is None
+
+
+def test_incommensurable_units_are_refused():
+    assert conversion_factor('m', 's') is None
+    assert conversion_factor('J', 'N') is None
+
+
+def test_dimensionless_kinds_stay_apart():
+    assert convert(180, '°', 'rad') == pytest.approx(3.141592653589793)
+    assert convert(47.9, '%', 'ratio') == pytest.approx(0.479)
+    assert conversion_factor('%', 'rad') is None
+    assert conversion_factor('°', '%') is None
+    assert conversion_factor('rad', 'ratio') is None
+
+
+def test_unit_conversion_rejects_percent_for_an_angle():
+    aliases = unit_alias_table({'%': ['%', 'percent']})
+    assert unit_conversion('percent', '%', aliases) == 1.0
+    assert unit_conversion('%', 'rad', aliases) is None
+    assert unit_conversion('deg', 'rad', aliases) == pytest.approx(0.017453292519943295)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+高解析度計時區段
+Timing Spans: perf_counter_ns spans for every phase of a trial, exportable as a Chrome trace
+
+    python timing_spans.py problem_11_20_results_20250915_174331.jsonl trace.json
+    (open trace.json in chrome://tracing or https://ui.perfetto.dev)
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from trial_store import load_results
+
+_current_recorder: ContextVar[Optional['SpanRecorder']] = ContextVar('current_span_recorder', default=None)
+
+
+class SpanRecorder:
+    """Named spans of one trial, on the monotonic perf_counter_ns clock
+
+    Code deeper in the stack (retry policy, backends, HTTP tracing,
+    extraction) records through the module-level ``span`` helpers into
+    whichever recorder is ``active`` in the current thread or task.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def add(self, name: str, start_ns: int, end_ns: int, **attrs):
+        entry = {'name': name, 'start_ns': start_ns, 'duration_ns': end_ns - start_ns}
+        entry.update(attrs)
+        self.spans.append(entry)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start_ns, time.perf_counter_ns(), **attrs)
+
+    @contextmanager
+    def active(self):
+        """Make this recorder the target of module-level ``span`` calls"""
+        token = _current_recorder.set(self)
+        try:
+            yield self
+        finally:
+            _current_recorder.reset(token)
+
+    def export(self) -> List[Dict]:
+        """Spans in start order, as stored in the trial record"""
+        return sorted((dict(entry) for entry in self.spans), key=lambda entry: entry['start_ns'])
+
+
+def current_recorder() -> Optional[SpanRecorder]:
+    return _current_recorder.get()
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attrs):
+    """Record a span into the active recorder (no-op when none is active)"""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add(name, start_ns, end_ns, **attrs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block into the active recorder (no-op when none is active)"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.span(name, **attrs):
+        yield
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp hooks splitting each request into connection queue, DNS, connect, send and wait spans
+
+    aiohttp reports TCP connect and TLS handshake as one ``http_connect``
+    phase; body download shows up as ``generation`` on streamed requests.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def mark(name):
+        async def handler(session, context, params):
+            context.marks = getattr(context, 'marks', {})
+            context.marks[name] = time.perf_counter_ns()
+        return handler
+
+    def close(name, start_mark):
+        async def handler(session, context, params):
+            marks = getattr(context, 'marks', {})
+            now = time.perf_counter_ns()
+            if start_mark in marks:
+                record_span(name, marks[start_mark], now)
+            marks[name + '_end'] = now
+        return handler
+
+    async def on_request_end(session, context, params):
+        # Response headers received: everything after sending is server wait
+        marks = getattr(context, 'marks', {})
+        now = time.perf_counter_ns()
+        sent = marks.get('request_headers_sent_end', marks.get('request_start'))
+        if sent is not None:
+            record_span('http_response_wait', sent, now)
+        marks['response_headers'] = now
+        context.marks = marks
+
+    trace_config.on_request_start.append(mark('request_start'))
+    trace_config.on_connection_queued_start.append(mark('connection_queued'))
+    trace_config.on_connection_queued_end.append(close('http_connection_queue', 'connection_queued'))
+    trace_config.on_dns_resolvehost_start.append(mark('dns'))
+    trace_config.on_dns_resolvehost_end.append(close('http_dns', 'dns'))
+    trace_config.on_connection_create_start.append(mark('connect'))
+    trace_config.on_connection_create_end.append(close('http_connect', 'connect'))
+    trace_config.on_request_headers_sent.append(close('http_request_send', 'request_start'))
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def to_chrome_trace(records: List[Dict]) -> Dict:
+    """Chrome trace-event document: one track per trial, one complete event per span"""
+    starts = [entry['start_ns'] for record in records for entry in record.get('timing_spans', [])]
+    origin_ns = min(starts) if starts else 0
+
+    events = []
+    for track, record in enumerate(records, start=1):
+        label = f"P{record.get('problem_id')} {record.get('format_type')} run {record.get('run', record.get('run_number'))}"
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': track, 'args': {'name': label}})
+        for entry in record.get('timing_spans', []):
+            args = {key: value for key, value in entry.items() if key not in ('name', 'start_ns', 'duration_ns')}
+            events.append({
+                'name': entry['name'],
+                'ph': 'X',
+                'pid': 1,
+                'tid': track,
+                'ts': (entry['start_ns'] - origin_ns) / 1000.0,
+                'dur': entry['duration_ns'] / 1000.0,
+                'args': args
+            })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def trial_records(results: Dict) -> List[Dict]:
+    """Trial records of an in-memory results dict"""
+    return results.get('linear', []) + results.get('nonlinear', [])
+
+
+def export_trace(results: Dict, path: str):
+    """Write the spans of every trial in ``results`` as a Chrome trace"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(to_chrome_trace(trial_records(results)), f)
+    print(f"✅ Trace exported: {path}")
+
+
+def summarize_spans(records: List[Dict]) -> Dict[str, Dict]:
+    """Total and mean duration (seconds) per span name across trials"""
+    totals = {}
+    for record in records:
+        for entry in record.get('timing_spans', []):
+            summary = totals.setdefault(entry['name'], {'count': 0, 'total_time': 0.0})
+            summary['count'] += 1
+            summary['total_time'] += entry['duration_ns'] / 1e9
+    for summary in totals.values():
+        summary['mean_time'] = summary['total_time'] / summary['count']
+    return totals
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python timing_spans.py RESULTS TRACE_JSON")
+        sys.exit(1)
+
+    results = load_results(sys.argv[1])
+    export_trace(results, sys.argv[2])
+
+    for name, summary in sorted(summarize_spans(trial_records(results)).items(), key=lambda item: -item[1]['total_time']):
+        print(f"   {name:<24} {summary['count']:>6} spans  total {summary['total_time']:.3f}s  mean {summary['mean_time'] * 1000:.2f}ms")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+試驗日誌：逐筆寫入並支援中斷續跑
+Trial Journal: append-only JSON Lines log of completed trials, used to resume crashed runs
+"""
+
+import json
+import os
+from typing import Dict, List, Tuple
+
+from trial_store import TrialReader, header_record, trial_line
+
+
+def trial_cell(problem_id: int, format_type: str, run: int) -> Tuple[int, str, int]:
+    """Key identifying one (problem_id, format, run) cell of the sweep"""
+    return (int(problem_id), format_type, int(run))
+
+
+def record_cell(record: Dict) -> Tuple[int, str, int]:
+    """Cell key of a trial record (runners name the run field 'run_number' or 'run')"""
+    run = record['run_number'] if 'run_number' in record else record['run']
+    return trial_cell(record['problem_id'], record['format_type'], run)
+
+
+class TrialJournal:
+    """Append-only journal with one trial record per line (``trial_store`` schema)
+
+    Every record is flushed and fsynced as soon as it is written, so a
+    crash loses at most the trial that was in flight.  A truncated final
+    line (from a crash mid-write) is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, record: Dict):
+        new_file = not os.path.exists(self.path)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if new_file:
+                f.write(json.dumps(header_record(), ensure_ascii=False) + '\n')
+            f.write(trial_line(record))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        return list(TrialReader(self.path))
+
+    def completed_records(self) -> Dict[Tuple[int, str, int], Dict]:
+        """Latest successful record per cell; failed cells are left to be re-run"""
+        completed = {}
+        for record in self.load():
+            if record.get('success'):
+                completed[record_cell(record)] = record
+        return completed
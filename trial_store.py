@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+試驗結果格式：具版本的 JSON Lines 結構與串流讀寫
+Trial Store: versioned one-record-per-line result schema with a streaming writer and reader
+
+File layout (one JSON object per line):
+
+    {"record_type": "header", "schema": "phiscript.trials", "schema_version": 1, "experiment_info": {...}}
+    {"record_type": "trial", "problem_id": 3, "format_type": "linear", "success": true, ...}
+    ...
+    {"record_type": "analysis", "analysis": {...}}              (optional, last line)
+
+Legacy pretty-printed .json result files (top-level linear/nonlinear or
+nested under "results") and header-less trial journals are read through
+the same reader, so analysis code never has to sniff layouts.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+SCHEMA_NAME = 'phiscript.trials'
+SCHEMA_VERSION = 1
+REQUIRED_TRIAL_FIELDS = ('problem_id', 'format_type', 'success')
+FORMAT_TYPES = ('linear', 'nonlinear')
+
+
+def header_record(experiment_info: Optional[Dict] = None) -> Dict:
+    return {
+        'record_type': 'header',
+        'schema': SCHEMA_NAME,
+        'schema_version': SCHEMA_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'experiment_info': experiment_info or {}
+    }
+
+
+def validate_trial(record: Dict) -> Dict:
+    """Raise ValueError when a trial record misses a required field"""
+    missing = [field for field in REQUIRED_TRIAL_FIELDS if field not in record]
+    if missing:
+        raise ValueError(f"Trial record is missing {', '.join(missing)}")
+    if record['format_type'] not in FORMAT_TYPES:
+        raise ValueError(f"Unknown format_type: {record['format_type']}")
+    return record
+
+
+def check_schema_version(header: Dict, path: str = '') -> Dict:
+    """Raise ValueError when a header was written with a newer schema than this reader supports"""
+    if header.get('schema_version', 0) > SCHEMA_VERSION:
+        raise ValueError(f"{path}: schema version {header['schema_version']} is newer than "
+                         f"supported version {SCHEMA_VERSION}")
+    return header
+
+
+def trial_from_line(line: Dict, path: str = '') -> Optional[Dict]:
+    """Trial record of one decoded line; None for header and analysis lines
+
+    A header line of a newer schema raises ValueError, so every reader
+    (streaming, incremental) rejects such files the same way.
+    """
+    record_type = line.pop('record_type', 'trial')   # journals written before the schema carry no tag
+    if record_type == 'header':
+        check_schema_version(line, path)
+    return line if record_type == 'trial' else None
+
+
+def trial_line(record: Dict) -> str:
+    return json.dumps(dict({'record_type': 'trial'}, **validate_trial(record)), ensure_ascii=False) + '\n'
+
+
+class TrialWriter:
+    """Streaming writer: header first, then one line per trial, optional analysis last
+
+    Records go straight to disk, so memory use does not grow with the
+    number of trials.  Use as a context manager.
+    """
+
+    def __init__(self, path: str, experiment_info: Optional[Dict] = None):
+        self.path = path
+        self.trials_written = 0
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(json.dumps(header_record(experiment_info), ensure_ascii=False) + '\n')
+
+    def write(self, record: Dict):
+        self.file.write(trial_line(record))
+        self.trials_written += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def write_lines(self, lines):
+        """Trial lines already encoded by ``trial_line`` (e.g. from a staging file)"""
+        for line in lines:
+            self.file.write(line)
+            self.trials_written += 1
+
+    def write_analysis(self, analysis: Dict):
+        self.file.write(json.dumps({'record_type': 'analysis', 'analysis': analysis}, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrialReader:
+    """Streaming reader over schema files, trial journals and legacy .json result files
+
+    Iterating yields trial records (without the ``record_type`` tag) one
+    at a time; ``header`` and ``analysis`` are read on demand.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.legacy = path.endswith('.json')
+
+    def _legacy_document(self) -> Dict:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _lines(self) -> Iterator[Dict]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping unreadable line in {self.path}")
+
+    @property
+    def header(self) -> Dict:
+        """Header record; legacy files and journals get a synthesized version-0 header"""
+        if self.legacy:
+            document = self._legacy_document()
+            results = document['results'] if 'results' in document else document
+            return {'schema': SCHEMA_NAME, 'schema_version': 0, 'experiment_info': results.get('experiment_info', {})}
+        first = next(self._lines(), None)
+        if first is None or first.get('record_type') != 'header':
+            return {'schema': SCHEMA_NAME, 'schema_version': 0, 'experiment_info': {}}
+        return check_schema_version(first, self.path)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self.legacy:
+            document = self._legacy_document()
+            results = document['results'] if 'results' in document else document
+            for format_type in FORMAT_TYPES:
+                yield from results.get(format_type, [])
+            return
+        for line in self._lines():
+            record = trial_from_line(line, self.path)
+            if record is not None:
+                yield record
+
+    @property
+    def analysis(self) -> Optional[Dict]:
+        if self.legacy:
+            return self._legacy_document().get('analysis')
+        analysis = None
+        for line in self._lines():
+            if line.get('record_type') == 'analysis':
+                analysis = line['analysis']
+        return analysis
+
+
+def read_trials(path: str) -> Iterator[Dict]:
+    """Stream the trial records of any result file"""
+    return iter(TrialReader(path))
+
+
+def load_results(path: str) -> Dict:
+    """Trials grouped into the in-memory {'experiment_info', 'linear', 'nonlinear'} layout used by the engine"""
+    reader = TrialReader(path)
+    results = {'experiment_info': reader.header.get('experiment_info', {}), 'linear': [], 'nonlinear': []}
+    for record in reader:
+        results[record['format_type']].append(record)
+    return results
+
+
+def write_results(path: str, results: Dict, analysis: Optional[Dict] = None) -> int:
+    """Write an in-memory results dict (and its analysis) as a schema file; returns the trial count"""
+    with TrialWriter(path, results.get('experiment_info')) as writer:
+        for format_type in FORMAT_TYPES:
+            writer.write_many(results.get(format_type, []))
+        if analysis is not None:
+            writer.write_analysis(analysis)
+        return writer.trials_written
+
+
+def schema_path(path: str) -> str:
+    """Output path with the schema file extension (.jsonl)"""
+    return os.path.splitext(path)[0] + '.jsonl'
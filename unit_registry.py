@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+單位登錄表：SI 前綴、因次向量與單位換算
+Unit Registry: SI prefixes, dimension vectors and memoized unit parsing / conversion
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Dimension vector order: length, mass, time, current, temperature, amount, luminous intensity, angle
+# Angle is a pseudo-dimension: rad and ° convert into each other but never into % or a plain ratio
+DIMENSIONS = ('m', 'kg', 's', 'A', 'K', 'mol', 'cd', 'rad')
+DIMENSIONLESS = (0, 0, 0, 0, 0, 0, 0, 0)
+
+Unit = Tuple[float, Tuple[int, ...]]   # (factor to SI, dimension vector)
+
+
+def _dims(**exponents) -> Tuple[int, ...]:
+    return tuple(exponents.get(name, 0) for name in ('L', 'M', 'T', 'I', 'Θ', 'N', 'J', 'angle'))
+
+
+UNITS: Dict[str, Unit] = {
+    # SI base and derived units (accept SI prefixes)
+    'm': (1.0, _dims(L=1)),
+    'g': (1e-3, _dims(M=1)),
+    's': (1.0, _dims(T=1)),
+    'A': (1.0, _dims(I=1)),
+    'K': (1.0, _dims(Θ=1)),
+    'mol': (1.0, _dims(N=1)),
+    'cd': (1.0, _dims(J=1)),
+    'N': (1.0, _dims(M=1, L=1, T=-2)),
+    'J': (1.0, _dims(M=1, L=2, T=-2)),
+    'W': (1.0, _dims(M=1, L=2, T=-3)),
+    'Pa': (1.0, _dims(M=1, L=-1, T=-2)),
+    'Hz': (1.0, _dims(T=-1)),
+    'C': (1.0, _dims(I=1, T=1)),
+    'V': (1.0, _dims(M=1, L=2, T=-3, I=-1)),
+    'Ω': (1.0, _dims(M=1, L=2, T=-3, I=-2)),
+    'L': (1e-3, _dims(L=3)),
+    'l': (1e-3, _dims(L=3)),
+    'eV': (1.602176634e-19, _dims(M=1, L=2, T=-2)),
+    'bar': (1e5, _dims(M=1, L=-1, T=-2)),
+    'rad': (1.0, _dims(angle=1)),
+}
+
+# Units that take no SI prefix
+PLAIN_UNITS: Dict[str, Unit] = {
+    'min': (60.0, _dims(T=1)),
+    'h': (3600.0, _dims(T=1)),
+    'hr': (3600.0, _dims(T=1)),
+    'atm': (101325.0, _dims(M=1, L=-1, T=-2)),
+    'cal': (4.184, _dims(M=1, L=2, T=-2)),
+    'kcal': (4184.0, _dims(M=1, L=2, T=-2)),
+    '°': (0.017453292519943295, _dims(angle=1)),
+    'deg': (0.017453292519943295, _dims(angle=1)),
+    '%': (0.01, DIMENSIONLESS),
+    'ratio': (1.0, DIMENSIONLESS),
+}
+
+PREFIXES = {
+    'Y': 1e24, 'Z': 1e21, 'E': 1e18, 'P': 1e15, 'T': 1e12, 'G': 1e9, 'M': 1e6, 'k': 1e3, 'h': 1e2, 'da': 1e1,
+    'd': 1e-1, 'c': 1e-2, 'm': 1e-3, 'µ': 1e-6, 'μ': 1e-6, 'u': 1e-6, 'n': 1e-9, 'p': 1e-12, 'f': 1e-15
+}
+
+# Spelled-out names (singular; plurals are handled by dropping a trailing "s")
+UNIT_NAMES = {
+    'meter': 'm', 'metre': 'm', 'gram': 'g', 'second': 's', 'sec': 's', 'newton': 'N', 'joule': 'J',
+    'watt': 'W', 'pascal': 'Pa', 'hertz': 'Hz', 'liter': 'L', 'litre': 'L', 'minute': 'min', 'hour': 'h',
+    'atmosphere': 'atm', 'calorie': 'cal', 'degree': '°', 'radian': 'rad', 'percent': '%', 'kelvin': 'K',
+    'ampere': 'A', 'coulomb': 'C', 'volt': 'V', 'ohm': 'Ω'
+}
+PREFIX_NAMES = {
+    'giga': 'G', 'mega': 'M', 'kilo': 'k', 'hecto': 'h', 'centi': 'c', 'milli': 'm', 'micro': 'µ', 'nano': 'n'
+}
+
+SUPERSCRIPT_EXPONENTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻', '0123456789-')
+FACTOR_PATTERN = re.compile(r'^(?P<symbol>[^\d^⁰¹²³⁴⁵⁶⁷⁸⁹⁻+-]+)(?:\^?\(?(?P<exponent>[+-]?\d+)\)?|(?P<superscript>[⁻]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+))?$')
+SEPARATORS = re.compile(r'\s*([/·⋅*×]|\s)\s*')
+
+
+@lru_cache(maxsize=None)
+def unit_symbol(symbol: str) -> Optional[Unit]:
+    """Factor and dimensions of one unit symbol or name, with an optional SI prefix"""
+    if symbol in UNITS:
+        return UNITS[symbol]
+    if symbol in PLAIN_UNITS:
+        return PLAIN_UNITS[symbol]
+    name = symbol.lower()
+    for candidate in (name, name[:-1] if name.endswith('s') else None):
+        if candidate in UNIT_NAMES:
+            return unit_symbol(UNIT_NAMES[candidate])
+        for prefix_name, prefix in PREFIX_NAMES.items():
+            if candidate and candidate.startswith(prefix_name) and candidate[len(prefix_name):] in UNIT_NAMES:
+                factor, dims = unit_symbol(UNIT_NAMES[candidate[len(prefix_name):]])
+                return PREFIXES[prefix] * factor, dims
+    for prefix in sorted(PREFIXES, key=len, reverse=True):
+        if symbol.startswith(prefix) and symbol[len(prefix):] in UNITS:
+            factor, dims = UNITS[symbol[len(prefix):]]
+            return PREFIXES[prefix] * factor, dims
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse_unit(text: str) -> Optional[Unit]:
+    """Parse a compound unit ("km/h", "m/s²", "m/s/s", "kg·m/s^2", "m·s⁻¹") into (factor, dimensions)
+
+    Every factor after a "/" is in the denominator.  A bare trailing digit
+    is read as an exponent ("m/s2").  Returns None for an empty or unknown
+    unit.
+    """
+    text = (text or '').strip()
+    if not text:
+        return None
+    factor, dims = 1.0, [0] * len(DIMENSIONS)
+    denominator = False
+    for part in SEPARATORS.split(text):
+        if not part or part.isspace() or part in '·⋅*×':
+            continue
+        if part == '/':
+            denominator = True
+            continue
+        match = FACTOR_PATTERN.match(part)
+        if match is None:
+            return None
+        unit = unit_symbol(match.group('symbol'))
+        if unit is None:
+            return None
+        exponent = match.group('exponent') or (match.group('superscript') or '').translate(SUPERSCRIPT_EXPONENTS)
+        power = int(exponent) if exponent else 1
+        if denominator:
+            power = -power
+        factor *= unit[0] ** power
+        dims = [total + power * dim for total, dim in zip(dims, unit[1])]
+    return factor, tuple(dims)
+
+
+@lru_cache(maxsize=4096)
+def conversion_factor(from_unit: str, to_unit: str) -> Optional[float]:
+    """Multiplier taking a value in ``from_unit`` to ``to_unit``; None if either is unknown or the dimensions differ"""
+    source, target = parse_unit(from_unit), parse_unit(to_unit)
+    if source is None or target is None or source[1] != target[1]:
+        return None
+    return source[0] / target[0]
+
+
+def convert(value: float, from_unit: str, to_unit: str) -> Optional[float]:
+    """``value`` expressed in ``to_unit`` (None when the units are not commensurable)"""
+    factor = conversion_factor(from_unit, to_unit)
+    return None if factor is None else value * factor